@@ -0,0 +1,293 @@
+"""
+Call-setup throughput and latency benchmark, run entirely against local stand-ins.
+
+The LiveKit, Twilio and Retell servers from fake_servers.py run on a separate
+event loop thread, and the managers are pointed at them through LIVEKIT_URL,
+TWILIO_API_BASE_URL and RETELL_BASE_URL. For each target the benchmark places
+--calls outbound calls with --concurrency in flight, then tears them down, and
+reports calls/sec, p50/p99 latency of every instrumented phase (see
+intellema_vdk.instrumentation) and peak memory:
+
+    python benchmarks/bench_call_setup.py --calls 500 --concurrency 50 --latency-ms 20 --jitter-ms 5
+
+Targets:
+    livekit       LiveKitManager.dial_campaign (create_room, create_dispatch, create_sip_participant)
+    retell        RetellManager from a thread pool (create_phone_call, then a Twilio media stream and end)
+    retell_async  AsyncRetellManager with asyncio.gather
+
+Exits with status 1 if any target falls below --min-cps or any phase p99
+exceeds --max-p99-ms, so it can gate performance regressions in CI.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from fake_servers import Faults, FakeLiveKit, FakeRetell, FakeServers, FakeTwilio  # noqa: E402
+from intellema_vdk.instrumentation import OUTCOME_OK, PHASE_TOTAL, Instrumentation, PhaseEvent, Sink  # noqa: E402
+
+TARGETS = ("livekit", "retell", "retell_async")
+STREAM_URL = "wss://stream.example.invalid/media"
+
+
+class PhaseTimer(Sink):
+    """Instrumentation sink collecting per-phase latencies of successful steps."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    def record(self, event: PhaseEvent):
+        if event.outcome != OUTCOME_OK:
+            return
+        name = event.operation if event.phase == PHASE_TOTAL else f"{event.operation}.{event.phase}"
+        self.samples.setdefault(name, []).append(event.duration * 1000)
+
+    def summary(self) -> Dict[str, dict]:
+        return {
+            phase: {"count": len(values), "p50_ms": percentile(values, 50), "p99_ms": percentile(values, 99)}
+            for phase, values in self.samples.items()
+        }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class _ServerThread:
+    """Runs the fake servers on their own event loop so they do not share the client's loop."""
+
+    def __init__(self, servers: FakeServers):
+        self.servers = servers
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def __enter__(self) -> FakeServers:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.servers.start(), self.loop).result()
+        return self.servers
+
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self.servers.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+def _phone_number(i: int) -> str:
+    return f"+1555{i:07d}"
+
+
+async def bench_livekit(calls: int, concurrency: int, timer: PhaseTimer) -> dict:
+    from intellema_vdk.livekit_lib.campaign import STATUS_ANSWERED, STATUS_BUSY
+    from intellema_vdk.livekit_lib.client import LiveKitManager
+
+    manager = LiveKitManager(max_calls_per_trunk=concurrency, instrumentation=Instrumentation([timer]))
+
+    counts = {"ok": 0, "busy": 0, "failed": 0, "teardown_failed": 0}
+    answered = []
+    try:
+        started = time.perf_counter()
+        jobs = ((_phone_number(i), "benchmark prompt") for i in range(calls))
+        async for result in manager.dial_campaign(jobs):
+            if result.status == STATUS_ANSWERED:
+                counts["ok"] += 1
+                answered.append(result.call_id)
+            elif result.status == STATUS_BUSY:
+                counts["busy"] += 1
+            else:
+                counts["failed"] += 1
+        elapsed = time.perf_counter() - started
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def teardown(call_id: str):
+            async with semaphore:
+                try:
+                    await manager.delete_room(call_id)
+                except Exception:
+                    counts["teardown_failed"] += 1
+
+        await asyncio.gather(*(teardown(call_id) for call_id in answered))
+    finally:
+        await manager.close()
+    return {"elapsed_s": elapsed, **counts}
+
+
+def bench_retell(calls: int, concurrency: int, timer: PhaseTimer) -> dict:
+    from intellema_vdk.retell_lib.retell_client import RetellManager
+
+    manager = RetellManager(instrumentation=Instrumentation([timer]))
+
+    counts = {"ok": 0, "busy": 0, "failed": 0, "teardown_failed": 0}
+    lock = threading.Lock()
+
+    def setup(i: int) -> Optional[str]:
+        try:
+            call_id = manager.start_outbound_call(_phone_number(i), "benchmark prompt")
+        except Exception:
+            with lock:
+                counts["failed"] += 1
+            return None
+        with lock:
+            counts["ok"] += 1
+        return call_id
+
+    def teardown(call_id: str):
+        try:
+            manager.start_stream(call_id, [STREAM_URL])
+            manager.delete_room(call_id)
+        except Exception:
+            with lock:
+                counts["teardown_failed"] += 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            started = time.perf_counter()
+            call_ids = [c for c in pool.map(setup, range(calls)) if c]
+            elapsed = time.perf_counter() - started
+            list(pool.map(teardown, call_ids))
+    finally:
+        manager.close()
+    return {"elapsed_s": elapsed, **counts}
+
+
+async def bench_retell_async(calls: int, concurrency: int, timer: PhaseTimer) -> dict:
+    from intellema_vdk.retell_lib.async_retell_client import AsyncRetellManager
+
+    manager = AsyncRetellManager(max_connections=concurrency, instrumentation=Instrumentation([timer]))
+
+    counts = {"ok": 0, "busy": 0, "failed": 0, "teardown_failed": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def setup(i: int) -> Optional[str]:
+        async with semaphore:
+            try:
+                call_id = await manager.start_outbound_call(_phone_number(i), "benchmark prompt")
+            except Exception:
+                counts["failed"] += 1
+                return None
+            counts["ok"] += 1
+            return call_id
+
+    async def teardown(call_id: str):
+        async with semaphore:
+            try:
+                await manager.start_stream(call_id, [STREAM_URL])
+                await manager.delete_room(call_id)
+            except Exception:
+                counts["teardown_failed"] += 1
+
+    try:
+        started = time.perf_counter()
+        call_ids = [c for c in await asyncio.gather(*(setup(i) for i in range(calls))) if c]
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*(teardown(call_id) for call_id in call_ids))
+    finally:
+        await manager.close()
+    return {"elapsed_s": elapsed, **counts}
+
+
+def run_target(target: str, calls: int, concurrency: int, trace_memory: bool) -> dict:
+    timer = PhaseTimer()
+    if trace_memory:
+        tracemalloc.start()
+    # The managers print a line or two per call; keep the report readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        if target == "livekit":
+            outcome = asyncio.run(bench_livekit(calls, concurrency, timer))
+        elif target == "retell":
+            outcome = bench_retell(calls, concurrency, timer)
+        else:
+            outcome = asyncio.run(bench_retell_async(calls, concurrency, timer))
+
+    result = {
+        "target": target,
+        "calls": calls,
+        "concurrency": concurrency,
+        **outcome,
+        "calls_per_sec": outcome["ok"] / outcome["elapsed_s"] if outcome["elapsed_s"] else 0.0,
+        "phases": timer.summary(),
+    }
+    if trace_memory:
+        result["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return result
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency added to every fake API request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter around --latency-ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--busy-rate", type=float, default=0.0, help="Fraction of SIP dials answered with 486 Busy Here")
+    parser.add_argument("--ring-ms", type=float, default=0.0, help="Time before a SIP dial is answered")
+    parser.add_argument("--trace-memory", action="store_true", help="Report tracemalloc peak per target (slows the run)")
+    parser.add_argument("--min-cps", type=float, default=None, help="Fail if any target places fewer calls/sec")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="Fail if any phase p99 exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    faults = Faults(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    servers = FakeServers(
+        FakeLiveKit(faults, ring_ms=args.ring_ms, busy_rate=args.busy_rate),
+        FakeTwilio(faults),
+        FakeRetell(faults),
+    )
+
+    with _ServerThread(servers) as running:
+        os.environ.update(running.env())
+        results = [run_target(target, args.calls, args.concurrency, args.trace_memory) for target in args.targets]
+
+    report = {"results": results, "max_rss_mb": _max_rss_mb()}
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for result in results:
+            print(f"{result['target']}: {result['calls_per_sec']:.1f} calls/sec "
+                  f"({result['ok']} ok, {result['busy']} busy, {result['failed']} failed in {result['elapsed_s']:.2f}s, "
+                  f"{result['teardown_failed']} teardown errors)")
+            for phase, stats in result["phases"].items():
+                print(f"  {phase:<44} n={stats['count']:<6} p50={stats['p50_ms']:.2f}ms  p99={stats['p99_ms']:.2f}ms")
+            if "peak_traced_mb" in result:
+                print(f"  peak traced memory: {result['peak_traced_mb']:.1f} MiB")
+        print(f"max RSS: {report['max_rss_mb']:.1f} MiB")
+
+    failed = False
+    for result in results:
+        if args.min_cps is not None and result["calls_per_sec"] < args.min_cps:
+            print(f"FAIL: {result['target']} placed {result['calls_per_sec']:.1f} calls/sec, below {args.min_cps}", file=sys.stderr)
+            failed = True
+        if args.max_p99_ms is not None:
+            for phase, stats in result["phases"].items():
+                if stats["p99_ms"] > args.max_p99_ms:
+                    print(f"FAIL: {result['target']} {phase} p99 {stats['p99_ms']:.2f}ms exceeds {args.max_p99_ms}ms", file=sys.stderr)
+                    failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
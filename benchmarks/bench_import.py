@@ -0,0 +1,87 @@
+"""
+Startup-time benchmark for `import intellema_vdk`.
+
+Each sample runs in a fresh interpreter, so nothing is cached between runs.
+Exits with status 1 if the median import time exceeds --max-ms or if the bare
+package import pulls in any provider SDK, which makes it usable as a CI gate:
+
+    python benchmarks/bench_import.py --runs 15 --max-ms 150
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("livekit", "boto3", "botocore", "twilio", "retell", "requests", "httpx", "aiohttp", "dotenv")
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{"ms": elapsed * 1000, "heavy": heavy}}))
+"""
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str, runs: int) -> dict:
+    samples = []
+    heavy = []
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=env,
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        heavy = result["heavy"]
+    return {
+        "module": module,
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "max_ms": max(samples),
+        "heavy_modules": heavy,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=150.0, help="Fail if the median package import exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = [
+        measure("intellema_vdk", args.runs),
+        # First use of each provider, for reference only.
+        measure("intellema_vdk.livekit_lib.client", args.runs),
+        measure("intellema_vdk.retell_lib.async_retell_client", args.runs),
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            print(f"{r['module']:<48} median {r['median_ms']:8.1f} ms  (min {r['min_ms']:.1f}, max {r['max_ms']:.1f})")
+
+    package = results[0]
+    failed = False
+    if package["heavy_modules"]:
+        print(f"FAIL: `import intellema_vdk` loaded provider SDKs: {', '.join(package['heavy_modules'])}")
+        failed = True
+    if package["median_ms"] > args.max_ms:
+        print(f"FAIL: median import time {package['median_ms']:.1f} ms exceeds {args.max_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
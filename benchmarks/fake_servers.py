@@ -0,0 +1,455 @@
+"""
+In-process stand-ins for the LiveKit, Twilio and Retell APIs used by the benchmarks.
+
+Each server is a small aiohttp application that speaks just enough of the real
+wire protocol for the SDKs used by intellema_vdk: LiveKit Twirp (protobuf) for
+the room, agent_dispatch, sip and egress services, and the Twilio and Retell
+REST endpoints. Every request passes through a Faults middleware that can add
+latency, jitter and random errors, so call-setup throughput can be measured on
+a plain Linux box without real carriers.
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+
+from aiohttp import web
+from livekit import api
+
+
+@dataclass
+class Faults:
+    """Latency and error injection applied to every request a server receives."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+
+    async def delay(self):
+        delay = self.latency_ms + (random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+
+def _fault_middleware(faults: Faults, error_body: dict, stats: Dict[str, int]):
+    @web.middleware
+    async def middleware(request: web.Request, handler):
+        stats["requests"] = stats.get("requests", 0) + 1
+        await faults.delay()
+        if faults.should_fail():
+            stats["injected_errors"] = stats.get("injected_errors", 0) + 1
+            return web.json_response(error_body, status=503)
+        return await handler(request)
+    return middleware
+
+
+class FakeLiveKit:
+    """
+    Twirp server for RoomService, AgentDispatchService, SIP and Egress.
+
+    `ring_ms` is how long CreateSIPParticipant takes to "answer" when
+    wait_until_answered is set, `busy_rate` the fraction of dials rejected
+    with 486 Busy Here, and `egress_ms` how long an egress stays active. Dials
+    through a trunk in `failing_trunks` fail with 503 Service Unavailable.
+    """
+
+    def __init__(self, faults: Optional[Faults] = None, ring_ms: float = 0.0, busy_rate: float = 0.0, egress_ms: float = 0.0, failing_trunks: Optional[Set[str]] = None):
+        self.faults = faults or Faults()
+        self.ring_ms = ring_ms
+        self.busy_rate = busy_rate
+        self.egress_ms = egress_ms
+        self.failing_trunks = set(failing_trunks or ())
+        self.dials_by_trunk: Dict[str, int] = {}
+        self.stats: Dict[str, int] = {}
+        self.rooms: Dict[str, api.Room] = {}
+        self.participants: Dict[str, Dict[str, api.ParticipantInfo]] = {}
+        self.egresses: Dict[str, api.EgressInfo] = {}
+        self._egress_started: Dict[str, float] = {}
+        self._streaming: Set[str] = set()
+        self._handlers = {
+            "livekit.RoomService/CreateRoom": (api.CreateRoomRequest, self.create_room),
+            "livekit.RoomService/DeleteRoom": (api.DeleteRoomRequest, self.delete_room),
+            "livekit.RoomService/ListRooms": (api.ListRoomsRequest, self.list_rooms),
+            "livekit.RoomService/ListParticipants": (api.ListParticipantsRequest, self.list_participants),
+            "livekit.RoomService/GetParticipant": (api.RoomParticipantIdentity, self.get_participant),
+            "livekit.RoomService/RemoveParticipant": (api.RoomParticipantIdentity, self.remove_participant),
+            "livekit.RoomService/MutePublishedTrack": (api.MuteRoomTrackRequest, lambda r: api.MuteRoomTrackResponse()),
+            "livekit.RoomService/SendData": (api.SendDataRequest, lambda r: api.SendDataResponse()),
+            "livekit.RoomService/UpdateRoomMetadata": (api.UpdateRoomMetadataRequest, self.update_room_metadata),
+            "livekit.AgentDispatchService/CreateDispatch": (api.CreateAgentDispatchRequest, self.create_dispatch),
+            "livekit.SIP/CreateSIPParticipant": (api.CreateSIPParticipantRequest, self.create_sip_participant),
+            "livekit.Egress/StartRoomCompositeEgress": (api.RoomCompositeEgressRequest, self.start_room_composite_egress),
+            "livekit.Egress/UpdateStream": (api.UpdateStreamRequest, self.update_stream),
+            "livekit.Egress/ListEgress": (api.ListEgressRequest, self.list_egress),
+            "livekit.Egress/StopEgress": (api.StopEgressRequest, self.stop_egress),
+        }
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[_fault_middleware(self.faults, {"code": "unavailable", "msg": "injected fault"}, self.stats)])
+        app.router.add_post("/twirp/{service}/{method}", self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        key = f"{request.match_info['service']}/{request.match_info['method']}"
+        if key not in self._handlers:
+            return web.json_response({"code": "bad_route", "msg": f"no handler for {key}"}, status=404)
+        request_class, handler = self._handlers[key]
+        message = request_class.FromString(await request.read())
+        try:
+            result = handler(message)
+            if asyncio.iscoroutine(result):
+                result = await result
+        except _TwirpFailure as e:
+            return web.json_response(e.body, status=e.status)
+        return web.Response(body=result.SerializeToString(), content_type="application/protobuf")
+
+    def create_room(self, req: api.CreateRoomRequest) -> api.Room:
+        room = self.rooms.get(req.name)
+        if room is None:
+            room = api.Room(sid=f"RM_{uuid.uuid4().hex[:12]}", name=req.name, metadata=req.metadata, empty_timeout=req.empty_timeout)
+            self.rooms[req.name] = room
+            self.participants[req.name] = {}
+        return room
+
+    def delete_room(self, req: api.DeleteRoomRequest) -> api.DeleteRoomResponse:
+        self.rooms.pop(req.room, None)
+        self.participants.pop(req.room, None)
+        return api.DeleteRoomResponse()
+
+    def list_rooms(self, req: api.ListRoomsRequest) -> api.ListRoomsResponse:
+        names = list(req.names) or list(self.rooms)
+        return api.ListRoomsResponse(rooms=[self.rooms[n] for n in names if n in self.rooms])
+
+    def update_room_metadata(self, req: api.UpdateRoomMetadataRequest) -> api.Room:
+        room = self._room(req.room)
+        room.metadata = req.metadata
+        return room
+
+    def list_participants(self, req: api.ListParticipantsRequest) -> api.ListParticipantsResponse:
+        self._room(req.room)
+        return api.ListParticipantsResponse(participants=list(self.participants[req.room].values()))
+
+    def get_participant(self, req: api.RoomParticipantIdentity) -> api.ParticipantInfo:
+        self._room(req.room)
+        participant = self.participants[req.room].get(req.identity)
+        if participant is None:
+            raise _TwirpFailure(404, {"code": "not_found", "msg": "participant not found"})
+        return participant
+
+    def remove_participant(self, req: api.RoomParticipantIdentity) -> api.RemoveParticipantResponse:
+        self.participants.get(req.room, {}).pop(req.identity, None)
+        return api.RemoveParticipantResponse()
+
+    def create_dispatch(self, req: api.CreateAgentDispatchRequest) -> api.AgentDispatch:
+        self._room(req.room)
+        identity = f"agent-{uuid.uuid4().hex[:8]}"
+        self.participants[req.room][identity] = api.ParticipantInfo(sid=f"PA_{uuid.uuid4().hex[:12]}", identity=identity, name=req.agent_name, state=api.ParticipantInfo.State.ACTIVE, kind=api.ParticipantInfo.Kind.AGENT)
+        return api.AgentDispatch(id=f"AD_{uuid.uuid4().hex[:12]}", agent_name=req.agent_name, room=req.room, metadata=req.metadata)
+
+    async def create_sip_participant(self, req: api.CreateSIPParticipantRequest) -> api.SIPParticipantInfo:
+        self._room(req.room_name)
+        self.dials_by_trunk[req.sip_trunk_id] = self.dials_by_trunk.get(req.sip_trunk_id, 0) + 1
+        if req.sip_trunk_id in self.failing_trunks:
+            raise _TwirpFailure(500, {"code": "internal", "msg": "twirp error unknown: INVITE failed: sip status: 503: Service Unavailable"})
+        busy = bool(self.busy_rate) and random.random() < self.busy_rate
+        participant = api.ParticipantInfo(
+            sid=f"PA_{uuid.uuid4().hex[:12]}",
+            identity=req.participant_identity,
+            state=api.ParticipantInfo.State.ACTIVE,
+            kind=api.ParticipantInfo.Kind.SIP,
+            attributes={"sip.callStatus": "dialing", "sip.phoneNumber": req.sip_call_to},
+        )
+        if req.wait_until_answered:
+            if self.ring_ms:
+                await asyncio.sleep(self.ring_ms / 1000)
+            if busy:
+                raise _TwirpFailure(429, {
+                    "code": "resource_exhausted",
+                    "msg": "twirp error unknown: INVITE failed: sip status: 486: Busy Here",
+                    "meta": {"sip_status_code": "486", "sip_status": "Busy Here"},
+                })
+            participant.attributes["sip.callStatus"] = "active"
+        else:
+            # Answer (or reject) in the background; the caller follows sip.callStatus.
+            asyncio.ensure_future(self._ring(req.room_name, participant, busy))
+        self.participants.setdefault(req.room_name, {})[req.participant_identity] = participant
+        return api.SIPParticipantInfo(participant_id=participant.sid, participant_identity=req.participant_identity, room_name=req.room_name, sip_call_id=f"SCL_{uuid.uuid4().hex[:12]}")
+
+    async def _ring(self, room: str, participant: api.ParticipantInfo, busy: bool):
+        participant.attributes["sip.callStatus"] = "ringing"
+        await asyncio.sleep(self.ring_ms / 1000)
+        if busy:
+            self.participants.get(room, {}).pop(participant.identity, None)
+        else:
+            participant.attributes["sip.callStatus"] = "active"
+
+    def start_room_composite_egress(self, req: api.RoomCompositeEgressRequest) -> api.EgressInfo:
+        egress_id = f"EG_{uuid.uuid4().hex[:12]}"
+        info = api.EgressInfo(egress_id=egress_id, room_name=req.room_name, status=api.EgressStatus.EGRESS_ACTIVE)
+        if req.stream_outputs:
+            self._streaming.add(egress_id)
+        for output in req.stream_outputs:
+            for url in output.urls:
+                info.stream_results.add(url=url)
+        self.egresses[egress_id] = info
+        self._egress_started[egress_id] = time.monotonic()
+        return info
+
+    def update_stream(self, req: api.UpdateStreamRequest) -> api.EgressInfo:
+        info = self._egress(req.egress_id)
+        if req.egress_id not in self._streaming or info.status != api.EgressStatus.EGRESS_ACTIVE:
+            raise _TwirpFailure(412, {"code": "failed_precondition", "msg": f"egress {req.egress_id} is not streaming"})
+        urls = [s.url for s in info.stream_results if s.url not in req.remove_output_urls] + list(req.add_output_urls)
+        del info.stream_results[:]
+        for url in urls:
+            info.stream_results.add(url=url)
+        return info
+
+    def list_egress(self, req: api.ListEgressRequest) -> api.ListEgressResponse:
+        now = time.monotonic()
+        for egress_id, started in list(self._egress_started.items()):
+            if (now - started) * 1000 >= self.egress_ms:
+                self.egresses[egress_id].status = api.EgressStatus.EGRESS_COMPLETE
+                del self._egress_started[egress_id]
+        items = list(self.egresses.values())
+        if req.egress_id:
+            items = [i for i in items if i.egress_id == req.egress_id]
+        if req.room_name:
+            items = [i for i in items if i.room_name == req.room_name]
+        if req.active:
+            items = [i for i in items if i.status in (api.EgressStatus.EGRESS_STARTING, api.EgressStatus.EGRESS_ACTIVE)]
+        return api.ListEgressResponse(items=items)
+
+    def stop_egress(self, req: api.StopEgressRequest) -> api.EgressInfo:
+        info = self._egress(req.egress_id)
+        info.status = api.EgressStatus.EGRESS_COMPLETE
+        self._egress_started.pop(req.egress_id, None)
+        return info
+
+    def _room(self, name: str) -> api.Room:
+        room = self.rooms.get(name)
+        if room is None:
+            raise _TwirpFailure(404, {"code": "not_found", "msg": f"room {name} not found"})
+        return room
+
+    def _egress(self, egress_id: str) -> api.EgressInfo:
+        info = self.egresses.get(egress_id)
+        if info is None:
+            raise _TwirpFailure(404, {"code": "not_found", "msg": f"egress {egress_id} not found"})
+        return info
+
+
+class _TwirpFailure(Exception):
+    def __init__(self, status: int, body: dict):
+        super().__init__(body.get("msg"))
+        self.status = status
+        self.body = body
+
+
+class FakeTwilio:
+    """
+    Twilio REST stand-in for call updates, media streams and recordings.
+
+    Recordings complete `recording_ms` after they are created and their MP3
+    download returns `recording_bytes` bytes, streamed in 64 KiB chunks.
+    """
+
+    def __init__(self, faults: Optional[Faults] = None, recording_ms: float = 0.0, recording_bytes: int = 1024 * 1024):
+        self.faults = faults or Faults()
+        self.recording_ms = recording_ms
+        self.recording_bytes = recording_bytes
+        self.stats: Dict[str, int] = {}
+        self.recordings: Dict[str, dict] = {}
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[_fault_middleware(self.faults, {"code": 20500, "message": "injected fault", "status": 503}, self.stats)])
+        base = "/2010-04-01/Accounts/{account}"
+        app.router.add_post(base + "/Calls/{call}.json", self.update_call)
+        app.router.add_post(base + "/Calls/{call}/Streams.json", self.create_stream)
+        app.router.add_post(base + "/Calls/{call}/Streams/{stream}.json", self.update_stream)
+        app.router.add_post(base + "/Calls/{call}/Recordings.json", self.create_recording)
+        app.router.add_get(base + "/Recordings/{recording}.json", self.fetch_recording)
+        app.router.add_get(base + "/Recordings/{recording}.mp3", self.download_recording)
+        return app
+
+    async def update_call(self, request: web.Request) -> web.Response:
+        return web.json_response({"sid": request.match_info["call"], "account_sid": request.match_info["account"], "status": "in-progress"})
+
+    async def create_stream(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        return web.json_response({"sid": f"MZ{uuid.uuid4().hex}", "call_sid": request.match_info["call"], "name": form.get("Name"), "status": "in-progress"})
+
+    async def update_stream(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        return web.json_response({"sid": request.match_info["stream"], "call_sid": request.match_info["call"], "status": form.get("Status")})
+
+    async def create_recording(self, request: web.Request) -> web.Response:
+        sid = f"RE{uuid.uuid4().hex}"
+        self.recordings[sid] = {"created": time.monotonic(), "call_sid": request.match_info["call"]}
+        return web.json_response({"sid": sid, "call_sid": request.match_info["call"], "account_sid": request.match_info["account"], "status": "in-progress"}, status=201)
+
+    async def fetch_recording(self, request: web.Request) -> web.Response:
+        sid = request.match_info["recording"]
+        recording = self.recordings.get(sid)
+        if recording is None:
+            return web.json_response({"code": 20404, "message": "not found", "status": 404}, status=404)
+        done = (time.monotonic() - recording["created"]) * 1000 >= self.recording_ms
+        return web.json_response({"sid": sid, "call_sid": recording["call_sid"], "status": "completed" if done else "in-progress"})
+
+    async def download_recording(self, request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "audio/mpeg", "Content-Length": str(self.recording_bytes)})
+        await response.prepare(request)
+        chunk = b"\0" * 65536
+        remaining = self.recording_bytes
+        while remaining > 0:
+            await response.write(chunk[:remaining])
+            remaining -= len(chunk)
+        await response.write_eof()
+        return response
+
+
+class FakeRetell:
+    """Retell REST stand-in for phone calls and phone-number management."""
+
+    def __init__(self, faults: Optional[Faults] = None):
+        self.faults = faults or Faults()
+        self.stats: Dict[str, int] = {}
+        self.calls: Dict[str, dict] = {}
+        self.phone_numbers: Dict[str, dict] = {}
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[_fault_middleware(self.faults, {"error_message": "injected fault"}, self.stats)])
+        app.router.add_post("/v2/create-phone-call", self.create_phone_call)
+        app.router.add_get("/v2/get-call/{call_id}", self.get_call)
+        app.router.add_patch("/v2/update-call/{call_id}", self.update_call)
+        app.router.add_post("/v3/list-calls", self.list_calls)
+        app.router.add_post("/import-phone-number", self.import_phone_number)
+        app.router.add_get("/v2/list-phone-numbers", self.list_phone_numbers)
+        return app
+
+    async def create_phone_call(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        call_id = f"call_{uuid.uuid4().hex}"
+        call = {
+            "call_id": call_id,
+            "call_type": "phone_call",
+            "call_status": "registered",
+            "agent_id": body.get("override_agent_id") or "agent_fake",
+            "from_number": body.get("from_number"),
+            "to_number": body.get("to_number"),
+            "direction": "outbound",
+            "metadata": body.get("metadata"),
+            "retell_llm_dynamic_variables": body.get("retell_llm_dynamic_variables"),
+        }
+        self.calls[call_id] = call
+        return web.json_response(call, status=201)
+
+    async def get_call(self, request: web.Request) -> web.Response:
+        call = self.calls.get(request.match_info["call_id"])
+        if call is None:
+            return web.json_response({"error_message": "call not found"}, status=404)
+        return web.json_response(call)
+
+    async def update_call(self, request: web.Request) -> web.Response:
+        call = self.calls.get(request.match_info["call_id"])
+        if call is None:
+            return web.json_response({"error_message": "call not found"}, status=404)
+        body = await request.json()
+        if (body.get("override_dynamic_variables") or {}).get("force_end") == "true":
+            call["call_status"] = "ended"
+        return web.json_response(call)
+
+    async def list_calls(self, request: web.Request) -> web.Response:
+        body = await request.json() if request.can_read_body else {}
+        call_ids = ((body.get("filter_criteria") or {}).get("call_id") or {}).get("value")
+        calls = [self.calls[c] for c in call_ids if c in self.calls] if call_ids else list(self.calls.values())
+        limit = int(body.get("limit") or 1000)
+        start = 0
+        if body.get("pagination_key"):
+            ids = [c["call_id"] for c in calls]
+            start = ids.index(body["pagination_key"]) + 1 if body["pagination_key"] in ids else len(ids)
+        page = calls[start:start + limit]
+        has_more = start + limit < len(calls)
+        return web.json_response({"items": page, "has_more": has_more, "pagination_key": page[-1]["call_id"] if has_more and page else None})
+
+    async def import_phone_number(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        number = {
+            "phone_number": body["phone_number"],
+            "phone_number_type": "custom",
+            "nickname": body.get("nickname"),
+            "outbound_agent_id": body.get("outbound_agent_id"),
+            "inbound_agent_id": body.get("inbound_agent_id"),
+        }
+        self.phone_numbers[body["phone_number"]] = number
+        return web.json_response(number, status=201)
+
+    async def list_phone_numbers(self, request: web.Request) -> web.Response:
+        numbers = list(self.phone_numbers.values())
+        limit = int(request.query.get("limit") or 1000)
+        start = 0
+        if request.query.get("pagination_key"):
+            keys = [n["phone_number"] for n in numbers]
+            key = request.query["pagination_key"]
+            start = keys.index(key) + 1 if key in keys else len(keys)
+        page = numbers[start:start + limit]
+        has_more = start + limit < len(numbers)
+        return web.json_response({"items": page, "has_more": has_more, "pagination_key": page[-1]["phone_number"] if has_more and page else None})
+
+
+class FakeServers:
+    """Starts the three stand-in servers on ephemeral localhost ports."""
+
+    def __init__(self, livekit: FakeLiveKit, twilio: FakeTwilio, retell: FakeRetell):
+        self.livekit = livekit
+        self.twilio = twilio
+        self.retell = retell
+        self.urls: Dict[str, str] = {}
+        self._runners = []
+
+    async def start(self) -> "FakeServers":
+        for name, server in (("livekit", self.livekit), ("twilio", self.twilio), ("retell", self.retell)):
+            runner = web.AppRunner(server.app(), access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self.urls[name] = f"http://127.0.0.1:{port}"
+            self._runners.append(runner)
+        return self
+
+    async def stop(self):
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners = []
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point the managers at these servers."""
+        return {
+            "LIVEKIT_URL": self.urls["livekit"],
+            "LIVEKIT_API_KEY": "bench-key",
+            "LIVEKIT_API_SECRET": "bench-secret-bench-secret-bench-secret",
+            "SIP_OUTBOUND_TRUNK_ID": "ST_bench",
+            "TWILIO_ACCOUNT_SID": "ACbench",
+            "TWILIO_AUTH_TOKEN": "bench-token",
+            "TWILIO_PHONE_NUMBER": "+15550000000",
+            "TWILIO_API_BASE_URL": self.urls["twilio"],
+            "RETELL_API_KEY": "bench-retell-key",
+            "RETELL_AGENT_ID": "agent_bench",
+            "RETELL_BASE_URL": self.urls["retell"],
+        }
+
+    async def __aenter__(self) -> "FakeServers":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+
+def dump_stats(servers: FakeServers) -> str:
+    return json.dumps({name: getattr(servers, name).stats for name in ("livekit", "twilio", "retell")})
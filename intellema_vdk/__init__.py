@@ -1,33 +1,85 @@
 from typing import Optional, List, Any
 
-from .livekit_lib.client import LiveKitManager
-from .retell_lib.retell_client import RetellManager
+# Provider managers are imported on first use (see __getattr__) so that
+# `import intellema_vdk` does not pull in livekit, twilio, retell or boto3.
+from .registry import ClientRegistry, _create_client, aclose_all, default_registry, get_client
+from .instrumentation import (
+    CallbackSink,
+    Instrumentation,
+    OpenTelemetrySink,
+    PhaseEvent,
+    PrometheusSink,
+    Sink,
+    add_sink,
+    default_instrumentation,
+    remove_sink,
+)
+from .rate_limit import RateLimit, RateLimiter, RateLimitExceeded
+from .resilience import CircuitBreaker, CircuitOpenError, Resilience, RetryPolicy
 
-def VoiceClient(provider: str, **kwargs) -> Any:
+_LAZY_EXPORTS = {
+    "LiveKitManager": (".livekit_lib.client", "LiveKitManager"),
+    "RetellManager": (".retell_lib.retell_client", "RetellManager"),
+    "AsyncRetellManager": (".retell_lib.async_retell_client", "AsyncRetellManager"),
+    # Also importable as `python -m intellema_vdk.suppression`, so not imported eagerly
+    "SuppressedNumberError": (".suppression", "SuppressedNumberError"),
+    "SuppressionList": (".suppression", "SuppressionList"),
+    "build_index": (".suppression", "build_index"),
+    "normalize_e164": (".suppression", "normalize_e164"),
+    "RecordingJob": (".recording_queue", "RecordingJob"),
+    "RecordingQueue": (".recording_queue", "RecordingQueue"),
+    "PromptStore": (".prompt_store", "PromptStore"),
+    "PromptNotFoundError": (".prompt_store", "PromptNotFoundError"),
+    "prompt_ref": (".prompt_store", "prompt_ref"),
+    "EventBus": (".events", "EventBus"),
+    "LiveKitEvent": (".events", "LiveKitEvent"),
+    "RetellCallEvent": (".events", "RetellCallEvent"),
+    "TwilioStatusEvent": (".events", "TwilioStatusEvent"),
+    "WebhookServer": (".webhooks", "WebhookServer"),
+    "LiveKitWebhookVerifier": (".webhooks", "LiveKitWebhookVerifier"),
+    "WebhookAuthError": (".webhooks", "WebhookAuthError"),
+}
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_EXPORTS:
+        import importlib
+
+        module_name, attr = _LAZY_EXPORTS[name]
+        value = getattr(importlib.import_module(module_name, __name__), attr)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
+
+def VoiceClient(provider: str, shared: bool = False, **kwargs) -> Any:
     """
     Factory function that returns a specific provider client.
+    Only the requested provider's SDK is imported.
     
     Args:
-        provider: "livekit" or "retell"
+        provider: "livekit", "retell" or "retell_async"
+        shared: If True, return the process-wide pooled manager from the client
+                registry instead of building a new one. Shared managers are closed
+                with `aclose_all()`, not with their own `close()`.
         **kwargs: Arguments passed to the manager's constructor
     
     Returns:
-        An instance of LiveKitManager or RetellManager
+        An instance of LiveKitManager, RetellManager or AsyncRetellManager
     """
-    if provider == "livekit":
-        return LiveKitManager(**kwargs)
-    elif provider == "retell":
-        return RetellManager(**kwargs)
-    else:
-        raise ValueError(f"Unknown provider: {provider}. Supported providers: 'livekit', 'retell'")
+    if shared:
+        return get_client(provider, **kwargs)
+    return _create_client(provider, **kwargs)
 
 async def start_outbound_call(provider: str, *args, **kwargs):
     """
     Convenience wrapper to start an outbound call.
+    Uses the shared client registry, so repeated calls reuse the same manager and
+    its keep-alive connections. Call `aclose_all()` at shutdown.
+    Retell calls go through AsyncRetellManager so they never block the event loop.
     """
-    client = VoiceClient(provider)
-    # Check if the method is async (LiveKit) or sync (Retell)
-    if provider == "livekit":
-        return await client.start_outbound_call(*args, **kwargs)
-    else:
-        return client.start_outbound_call(*args, **kwargs)
+    if provider == "retell":
+        provider = "retell_async"
+    client = VoiceClient(provider, shared=True)
+    return await client.start_outbound_call(*args, **kwargs)
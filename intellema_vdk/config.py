@@ -0,0 +1,24 @@
+import threading
+
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+def load_env():
+    """
+    Load `.env.local` and `.env` into the process environment, once.
+
+    Called by each manager's constructor rather than at import time, so
+    importing the package stays cheap and has no side effects.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _env_lock:
+        if _env_loaded:
+            return
+        from dotenv import load_dotenv
+
+        load_dotenv(dotenv_path=".env.local")
+        load_dotenv()
+        _env_loaded = True
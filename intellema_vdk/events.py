@@ -0,0 +1,96 @@
+import asyncio
+import inspect
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+
+@dataclass
+class LiveKitEvent:
+    """A verified LiveKit webhook. `event` is the livekit.api.WebhookEvent."""
+    type: str
+    event: Any
+
+    @property
+    def room_name(self) -> str:
+        return self.event.room.name
+
+    @property
+    def participant(self) -> Any:
+        return self.event.participant if self.event.HasField("participant") else None
+
+    @property
+    def egress_info(self) -> Any:
+        return self.event.egress_info if self.event.HasField("egress_info") else None
+
+
+@dataclass
+class TwilioStatusEvent:
+    """A verified Twilio status callback for a call or a recording."""
+    call_sid: Optional[str]
+    call_status: Optional[str] = None
+    recording_sid: Optional[str] = None
+    recording_status: Optional[str] = None
+    params: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class RetellCallEvent:
+    """A verified Retell webhook such as call_started, call_ended or call_analyzed."""
+    type: str
+    call_id: str
+    call_status: Optional[str]
+    call: Dict[str, Any] = field(default_factory=dict)
+
+
+Handler = Callable[[Any], Any]
+
+
+class EventBus:
+    """
+    In-process publish/subscribe for provider events.
+
+    Handlers subscribe to an event class and receive every published instance
+    of it, in subscription order. A handler may be a plain function or a
+    coroutine function. An exception in one handler is printed and does not
+    stop the others.
+    """
+
+    def __init__(self):
+        self._handlers: List[Tuple[Type, Handler]] = []
+
+    def subscribe(self, event_type: Type, handler: Handler) -> Callable[[], None]:
+        """
+        Call `handler(event)` for every published `event_type`.
+
+        Returns:
+            A function that removes the subscription.
+        """
+        entry = (event_type, handler)
+        self._handlers = self._handlers + [entry]
+
+        def unsubscribe():
+            self._handlers = [h for h in self._handlers if h is not entry]
+
+        return unsubscribe
+
+    async def publish(self, event: Any) -> int:
+        """
+        Deliver `event` to its subscribers.
+
+        Returns:
+            The number of handlers that ran without raising.
+        """
+        delivered = 0
+        for event_type, handler in self._handlers:
+            if not isinstance(event, event_type):
+                continue
+            try:
+                result = handler(event)
+                if inspect.isawaitable(result):
+                    await result
+                delivered += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error handling {type(event).__name__} in {getattr(handler, '__qualname__', handler)}: {e}")
+        return delivered
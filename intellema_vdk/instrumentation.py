@@ -0,0 +1,266 @@
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+OUTCOME_OK = "ok"
+OUTCOME_ERROR = "error"
+OUTCOME_CANCELLED = "cancelled"
+
+# Phase name used for the event covering a whole manager method.
+PHASE_TOTAL = "total"
+
+
+@dataclass
+class PhaseEvent:
+    """Timing and outcome of one step of a manager operation."""
+    provider: str
+    operation: str
+    phase: str
+    duration: float
+    outcome: str = OUTCOME_OK
+    call_id: Optional[str] = None
+    error_type: Optional[str] = None
+    sip_status_code: Optional[str] = None
+
+
+class Sink:
+    """Receives a PhaseEvent for every instrumented step. Subclass and override `record`."""
+
+    def record(self, event: PhaseEvent):
+        raise NotImplementedError
+
+
+class CallbackSink(Sink):
+    """Passes every event to `callback`."""
+
+    def __init__(self, callback: Callable[[PhaseEvent], None]):
+        self.callback = callback
+
+    def record(self, event: PhaseEvent):
+        self.callback(event)
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class PrometheusSink(Sink):
+    """
+    Aggregates events in memory and renders them in the Prometheus text
+    exposition format, ready to be served from a /metrics endpoint.
+
+    Exposes `<namespace>_phase_duration_seconds` (histogram, labelled by
+    provider, operation, phase and outcome) and `<namespace>_sip_errors_total`
+    (counter, labelled by provider, operation, phase and sip_status_code).
+    """
+
+    def __init__(self, namespace: str = "intellema_vdk", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self._histograms: Dict[Tuple[str, str, str, str], List] = {}
+        self._sip_errors: Dict[Tuple[str, str, str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, event: PhaseEvent):
+        key = (event.provider, event.operation, event.phase, event.outcome)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # Per-bucket counts, then total sum and count.
+                histogram = [[0] * len(self.buckets), 0.0, 0]
+                self._histograms[key] = histogram
+            index = bisect.bisect_left(self.buckets, event.duration)
+            if index < len(self.buckets):
+                histogram[0][index] += 1
+            histogram[1] += event.duration
+            histogram[2] += 1
+
+            if event.sip_status_code:
+                sip_key = (event.provider, event.operation, event.phase, event.sip_status_code)
+                self._sip_errors[sip_key] = self._sip_errors.get(sip_key, 0) + 1
+
+    def render(self) -> str:
+        duration = f"{self.namespace}_phase_duration_seconds"
+        sip_errors = f"{self.namespace}_sip_errors_total"
+        lines = [
+            f"# HELP {duration} Duration of each manager operation phase.",
+            f"# TYPE {duration} histogram",
+        ]
+        with self._lock:
+            for (provider, operation, phase, outcome), (counts, total, count) in sorted(self._histograms.items()):
+                labels = f'provider="{provider}",operation="{operation}",phase="{phase}",outcome="{outcome}"'
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{duration}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{duration}_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f"{duration}_sum{{{labels}}} {total}")
+                lines.append(f"{duration}_count{{{labels}}} {count}")
+
+            lines.append(f"# HELP {sip_errors} SIP failures by status code.")
+            lines.append(f"# TYPE {sip_errors} counter")
+            for (provider, operation, phase, code), count in sorted(self._sip_errors.items()):
+                lines.append(f'{sip_errors}{{provider="{provider}",operation="{operation}",phase="{phase}",sip_status_code="{code}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+class OpenTelemetrySink(Sink):
+    """
+    Forwards events to OpenTelemetry metrics.
+
+    Records `intellema_vdk.phase.duration` (histogram, seconds) and
+    `intellema_vdk.sip.errors` (counter). Requires the `opentelemetry-api`
+    package; `meter` defaults to the global meter provider's meter.
+    """
+
+    def __init__(self, meter=None):
+        if meter is None:
+            try:
+                from opentelemetry import metrics
+            except ImportError as e:
+                raise ImportError("OpenTelemetrySink requires the 'opentelemetry-api' package.") from e
+            meter = metrics.get_meter("intellema_vdk")
+        self._duration = meter.create_histogram("intellema_vdk.phase.duration", unit="s", description="Duration of each manager operation phase.")
+        self._sip_errors = meter.create_counter("intellema_vdk.sip.errors", description="SIP failures by status code.")
+
+    def record(self, event: PhaseEvent):
+        attributes = {"provider": event.provider, "operation": event.operation, "phase": event.phase, "outcome": event.outcome}
+        if event.error_type:
+            attributes["error_type"] = event.error_type
+        self._duration.record(event.duration, attributes)
+        if event.sip_status_code:
+            self._sip_errors.add(1, {**attributes, "sip_status_code": event.sip_status_code})
+
+
+def sip_status_code(error: BaseException) -> Optional[str]:
+    """Return the SIP status code carried by a LiveKit error or anything it was raised from."""
+    seen = 0
+    while error is not None and seen < 10:
+        metadata = getattr(error, "metadata", None)
+        if isinstance(metadata, dict) and metadata.get("sip_status_code"):
+            return str(metadata["sip_status_code"])
+        error = error.__cause__ or error.__context__
+        seen += 1
+    return None
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ("instrumentation", "provider", "operation", "phase", "call_id", "started")
+
+    def __init__(self, instrumentation: "Instrumentation", provider: str, operation: str, phase: str, call_id: Optional[str]):
+        self.instrumentation = instrumentation
+        self.provider = provider
+        self.operation = operation
+        self.phase = phase
+        self.call_id = call_id
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event = PhaseEvent(self.provider, self.operation, self.phase, time.perf_counter() - self.started, call_id=self.call_id)
+        if exc is not None:
+            event.outcome = OUTCOME_CANCELLED if isinstance(exc, asyncio.CancelledError) else OUTCOME_ERROR
+            event.error_type = exc_type.__name__
+            event.sip_status_code = sip_status_code(exc)
+        self.instrumentation.emit(event)
+        return False
+
+
+class Instrumentation:
+    """
+    Fans PhaseEvents out to the attached sinks.
+
+    With no sinks attached, `phase()` returns a shared no-op context manager and
+    instrumented methods skip timing entirely, so the cost is one attribute check.
+    A sink that raises is reported and skipped; it never fails the call.
+    """
+
+    def __init__(self, sinks: Optional[Sequence[Sink]] = None):
+        self.sinks: List[Sink] = list(sinks or [])
+
+    def add_sink(self, sink: Sink) -> Sink:
+        self.sinks.append(sink)
+        return sink
+
+    def remove_sink(self, sink: Sink):
+        self.sinks.remove(sink)
+
+    def phase(self, provider: str, operation: str, phase: str, call_id: Optional[str] = None):
+        if not self.sinks:
+            return _NULL_PHASE
+        return _Phase(self, provider, operation, phase, call_id)
+
+    def emit(self, event: PhaseEvent):
+        for sink in self.sinks:
+            try:
+                sink.record(event)
+            except Exception as e:
+                print(f"Instrumentation sink {type(sink).__name__} failed: {e}")
+
+
+default_instrumentation = Instrumentation()
+
+
+def add_sink(sink: Sink) -> Sink:
+    """Attach `sink` to the process-wide instrumentation used by managers by default."""
+    return default_instrumentation.add_sink(sink)
+
+
+def remove_sink(sink: Sink):
+    default_instrumentation.remove_sink(sink)
+
+
+def instrumented(method):
+    """
+    Time a manager method as the PHASE_TOTAL phase of an operation named after it.
+
+    The manager must have `provider_name` and `instrumentation` attributes. The
+    call ID is taken from the method's `call_id` argument when it has one.
+    """
+    operation = method.__name__
+    code = method.__code__
+    params = code.co_varnames[1:code.co_argcount]
+    call_id_index = params.index("call_id") if "call_id" in params else None
+
+    def call_id_of(args, kwargs) -> Optional[str]:
+        if "call_id" in kwargs:
+            return kwargs["call_id"]
+        if call_id_index is not None and call_id_index < len(args):
+            return args[call_id_index]
+        return None
+
+    if asyncio.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            instrumentation = self.instrumentation
+            if not instrumentation.sinks:
+                return await method(self, *args, **kwargs)
+            with _Phase(instrumentation, self.provider_name, operation, PHASE_TOTAL, call_id_of(args, kwargs)):
+                return await method(self, *args, **kwargs)
+    else:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            instrumentation = self.instrumentation
+            if not instrumentation.sinks:
+                return method(self, *args, **kwargs)
+            with _Phase(instrumentation, self.provider_name, operation, PHASE_TOTAL, call_id_of(args, kwargs)):
+                return method(self, *args, **kwargs)
+    return wrapper
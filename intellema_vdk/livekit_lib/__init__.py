@@ -1,3 +1,9 @@
 from .client import LiveKitManager
+from .broadcast import BroadcastResult
+from .call_handle import CallFailedError, CallHandle
+from .campaign import CallBusyError, CampaignResult
+from .fleet import LiveKitFleet
+from .inventory import ParticipantRecord, RoomInventory, RoomRecord
+from .trunk_router import Trunk, TrunkRouter
 
-__all__ = ["LiveKitManager"]
+__all__ = ["LiveKitManager", "BroadcastResult", "CallBusyError", "CallFailedError", "CallHandle", "CampaignResult", "LiveKitFleet", "ParticipantRecord", "RoomInventory", "RoomRecord", "Trunk", "TrunkRouter"]
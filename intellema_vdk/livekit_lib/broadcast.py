@@ -0,0 +1,41 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Iterable, List, Optional, Sequence, Tuple, Union
+
+BroadcastTarget = Tuple[str, Union[None, str, Sequence[str]]]
+
+
+@dataclass
+class BroadcastResult:
+    """Outcome of sending a broadcast to one room."""
+    call_id: str
+    identities: List[str] = field(default_factory=list)
+    ok: bool = True
+    error: Optional[BaseException] = None
+
+
+async def run_broadcast(send: Callable[[str, List[str]], Awaitable[None]], targets: Iterable[BroadcastTarget], concurrency: int = 50) -> List[BroadcastResult]:
+    """
+    Call `send(call_id, identities)` for every target with at most `concurrency`
+    sends in flight, collecting one BroadcastResult per target in input order.
+    """
+    normalized = []
+    for call_id, identities in targets:
+        if identities is None:
+            identities = []
+        elif isinstance(identities, str):
+            identities = [identities]
+        normalized.append(BroadcastResult(call_id, list(identities)))
+
+    iterator = iter(normalized)
+
+    async def worker():
+        for result in iterator:
+            try:
+                await send(result.call_id, result.identities)
+            except Exception as e:
+                result.ok = False
+                result.error = e
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(normalized)))))
+    return normalized
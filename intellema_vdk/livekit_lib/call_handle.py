@@ -0,0 +1,309 @@
+import asyncio
+import re
+import time
+from typing import Any, Optional
+
+from livekit import api
+
+from ..instrumentation import sip_status_code
+from .campaign import CallBusyError
+
+SIP_CALL_STATUS_ATTRIBUTE = "sip.callStatus"
+
+REASON_BUSY = "busy"
+REASON_NO_ANSWER = "no_answer"
+REASON_TRUNK_FAILURE = "trunk_failure"
+REASON_DISCONNECTED = "disconnected"
+REASON_ERROR = "error"
+REASON_HANGUP = "hangup"
+
+DEFAULT_POLL_INTERVAL = 0.5
+DEFAULT_ACTIVE_POLL_INTERVAL = 30.0
+
+_DISCONNECT_REASONS = {
+    api.DisconnectReason.USER_REJECTED: REASON_BUSY,
+    api.DisconnectReason.USER_UNAVAILABLE: REASON_NO_ANSWER,
+    api.DisconnectReason.SIP_TRUNK_FAILURE: REASON_TRUNK_FAILURE,
+}
+
+
+class CallFailedError(RuntimeError):
+    """Raised from `CallHandle.answered` when the call ends before it is answered."""
+
+    def __init__(self, reason: str, error: Optional[BaseException] = None):
+        super().__init__(f"Call failed: {reason}" + (f" ({error})" if error else ""))
+        self.reason = reason
+        self.error = error
+
+
+def _is_busy(error: BaseException) -> bool:
+    return "Busy Here" in str(error) or "486" in str(error)
+
+
+# Non-5xx SIP responses that come from the trunk or carrier (bad credentials,
+# a forbidden or unroutable request) rather than from the callee
+_TRUNK_SIP_STATUSES = frozenset({401, 403, 404, 407})
+
+_SIP_STATUS_IN_MESSAGE = re.compile(r"sip status:? (\d{3})", re.IGNORECASE)
+
+
+def _sip_status(error: BaseException) -> Optional[int]:
+    code = sip_status_code(error)
+    if code is None:
+        # Servers that leave the metadata out still name the status in the message
+        seen = 0
+        while error is not None and seen < 10 and code is None:
+            match = _SIP_STATUS_IN_MESSAGE.search(str(error))
+            code = match.group(1) if match else None
+            error = error.__cause__ or error.__context__
+            seen += 1
+    return int(code) if code and code.isdigit() else None
+
+
+def is_trunk_failure(error: Optional[BaseException]) -> bool:
+    """
+    Whether a failed dial should count against the health of the SIP trunk it used.
+
+    Only a call ended with SIP_TRUNK_FAILURE or a trunk-side SIP answer (5xx,
+    401, 403, 404, 407) count. Callee answers (busy, declined, no answer) and
+    failures that never reached the trunk, such as LiveKit API errors, an open
+    circuit breaker, rate limiting or network errors, do not.
+    """
+    if error is None or isinstance(error, CallBusyError):
+        return False
+    if isinstance(error, CallFailedError):
+        return error.reason == REASON_TRUNK_FAILURE or is_trunk_failure(error.error)
+    status = _sip_status(error)
+    return status is not None and (500 <= status < 600 or status in _TRUNK_SIP_STATUSES)
+
+
+def _is_not_found(error: BaseException) -> bool:
+    return getattr(error, "status", None) == 404 or getattr(error, "code", None) == "not_found"
+
+
+def _consume(future: asyncio.Future):
+    # Failures are also reported through `failed`, so an unawaited `answered` must not log.
+    if not future.cancelled():
+        future.exception()
+
+
+class CallHandle:
+    """
+    One outbound SIP call placed without waiting for it to be answered.
+
+    Progress is read from the SIP participant's `sip.callStatus` attribute,
+    polled every `poll_interval` seconds while ringing, or pushed in with
+    `update()`. Once answered, the call is only checked for its end, through
+    the manager's shared `room_state` cache, at intervals that double up to
+    `active_poll_interval` seconds.
+
+    - `await handle.answered` returns the SIP ParticipantInfo once the callee picks
+      up, or raises CallBusyError / CallFailedError if the call fails first.
+    - `await handle.failed` returns the failure reason ("busy", "no_answer", ...).
+      It never completes for a call that was answered.
+    - `await handle.ended` returns the reason the call ended, whether it was
+      answered or not.
+
+    A call that fails before it is answered has its room deleted, just like the
+    blocking `start_outbound_call`.
+    """
+
+    def __init__(self, manager: Any, call_id: str, phone_number: str, participant_identity: str, room: Any = None, ring_timeout: float = 60.0, poll_interval: float = DEFAULT_POLL_INTERVAL, active_poll_interval: float = DEFAULT_ACTIVE_POLL_INTERVAL, trunk_id: Optional[str] = None):
+        self.manager = manager
+        self.call_id = call_id
+        self.trunk_id = trunk_id or manager.sip_trunk_id
+        self.phone_number = phone_number
+        self.participant_identity = participant_identity
+        self.room = room
+        self.ring_timeout = ring_timeout
+        self.poll_interval = poll_interval
+        self.active_poll_interval = active_poll_interval
+        self.status = "dialing"
+        self.reason: Optional[str] = None
+        self.dialed_at = time.monotonic()
+
+        loop = asyncio.get_running_loop()
+        self.answered: asyncio.Future = loop.create_future()
+        self.failed: asyncio.Future = loop.create_future()
+        self.ended: asyncio.Future = loop.create_future()
+        self.answered.add_done_callback(_consume)
+        self._task: Optional[asyncio.Task] = None
+        self._cleanup: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.ended.done()
+
+    async def dial(self, wait_until_answered: bool = False):
+        """
+        Send CreateSIPParticipant for this call.
+
+        With `wait_until_answered`, returns once the callee has picked up. Busy
+        and other dial errors delete the room and are raised (486 as CallBusyError).
+        """
+        try:
+            await self.manager._call(
+                self.manager.lk_api.sip.create_sip_participant,
+                api.CreateSIPParticipantRequest(
+                    room_name=self.call_id,
+                    sip_trunk_id=self.trunk_id,
+                    sip_call_to=self.phone_number,
+                    participant_identity=self.participant_identity,
+                    wait_until_answered=wait_until_answered,
+                )
+            )
+        except Exception as e:
+            if _is_busy(e):
+                print(f"Call failed: User is busy ({self.phone_number})")
+                await self._fail(REASON_BUSY, e)
+                raise CallBusyError("User is busy") from e
+            await self._fail(REASON_ERROR, e)
+            raise
+
+        if wait_until_answered:
+            self._set_answered(None)
+
+    def watch(self):
+        """Start polling the participant state in the background."""
+        if self._task is None and not self.done:
+            self._task = asyncio.ensure_future(self._watch())
+
+    def update(self, participant: Optional[api.ParticipantInfo]) -> bool:
+        """
+        Advance the call state from the latest SIP participant info, or None if
+        the participant has left. Returns True if the call is over.
+        """
+        if self.done:
+            return True
+        if participant is None:
+            if self.status == "active":
+                self._end(REASON_HANGUP)
+            else:
+                self._fail_later(REASON_DISCONNECTED)
+            return True
+
+        call_status = participant.attributes.get(SIP_CALL_STATUS_ATTRIBUTE, "")
+        if participant.disconnect_reason in _DISCONNECT_REASONS and self.status != "active":
+            self._fail_later(_DISCONNECT_REASONS[participant.disconnect_reason])
+            return True
+        if call_status == "hangup":
+            if self.status == "active":
+                self._end(REASON_HANGUP)
+            else:
+                self._fail_later(_DISCONNECT_REASONS.get(participant.disconnect_reason, REASON_DISCONNECTED))
+            return True
+        if call_status == "active" and self.status != "active":
+            self._set_answered(participant)
+        elif call_status in ("dialing", "ringing"):
+            self.status = call_status
+        return False
+
+    async def hangup(self):
+        """End the call by deleting its room."""
+        if not self.done:
+            if self.status != "active":
+                self._set_failed(REASON_HANGUP)
+            self._end(REASON_HANGUP)
+        self._stop()
+        await self.manager.delete_room(self.call_id)
+
+    def close(self):
+        """Stop watching without touching the call; pending futures are cancelled."""
+        self._stop()
+        for future in (self.answered, self.failed, self.ended):
+            if not future.done():
+                future.cancel()
+
+    def _stop(self):
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._task = None
+
+    async def _watch(self):
+        try:
+            interval = self.poll_interval
+            while not self.done:
+                if self.status == "active":
+                    await asyncio.sleep(interval)
+                    interval = min(interval * 2, self.active_poll_interval)
+                    if await self._check_ended():
+                        break
+                    continue
+                if time.monotonic() - self.dialed_at > self.ring_timeout:
+                    await self._fail(REASON_NO_ANSWER)
+                    return
+                try:
+                    participant = await self.manager._call(
+                        self.manager.lk_api.room.get_participant,
+                        api.RoomParticipantIdentity(room=self.call_id, identity=self.participant_identity),
+                        idempotent=True,
+                    )
+                except Exception as e:
+                    if not _is_not_found(e):
+                        print(f"Error checking call status for {self.call_id}: {e}")
+                        await asyncio.sleep(self.poll_interval)
+                        continue
+                    participant = None
+                if self.update(participant):
+                    break
+                if self.status != "active":
+                    # Wake up for the ring timeout even when polling slowly
+                    remaining = self.ring_timeout - (time.monotonic() - self.dialed_at)
+                    await asyncio.sleep(max(min(self.poll_interval, remaining), 0.0))
+        finally:
+            if self._task is asyncio.current_task():
+                self._task = None
+
+    async def _check_ended(self) -> bool:
+        # An answered call only needs to be watched for its end. room_state is
+        # shared with every other reader of the room, and kept current without
+        # RPCs when the manager follows LiveKit events.
+        try:
+            participants = await self.manager.room_state.get(self.call_id)
+        except Exception as e:
+            if not _is_not_found(e):
+                print(f"Error checking call status for {self.call_id}: {e}")
+                return False
+            participants = []
+        if any(p["identity"] == self.participant_identity for p in participants):
+            return False
+        return self.update(None)
+
+    def _fail_later(self, reason: str):
+        # update() is synchronous, so the room cleanup runs as its own task.
+        self._set_failed(reason)
+        self._end(reason)
+        self._cleanup = asyncio.ensure_future(self._delete_room())
+
+    def _set_answered(self, participant: Optional[api.ParticipantInfo]):
+        self.status = "active"
+        if not self.answered.done():
+            self.answered.set_result(participant)
+
+    def _set_failed(self, reason: str, error: Optional[BaseException] = None):
+        self.status = "failed"
+        self.reason = reason
+        if not self.failed.done():
+            self.failed.set_result(reason)
+        if not self.answered.done():
+            self.answered.set_exception(CallBusyError("User is busy") if reason == REASON_BUSY else CallFailedError(reason, error))
+
+    def _end(self, reason: str):
+        if self.status != "failed":
+            self.status = "ended"
+        self.reason = self.reason or reason
+        if not self.ended.done():
+            self.ended.set_result(self.reason)
+
+    async def _fail(self, reason: str, error: Optional[BaseException] = None):
+        self._set_failed(reason, error)
+        self._end(reason)
+        self._stop()
+        await self._delete_room()
+
+    async def _delete_room(self):
+        # Clean up the room of a call that never connected.
+        try:
+            await self.manager.delete_room(self.call_id)
+        except Exception as e:
+            print(f"Error deleting room {self.call_id}: {e}")
@@ -0,0 +1,131 @@
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Optional, Tuple, Union
+
+STATUS_ANSWERED = "answered"
+STATUS_BUSY = "busy"
+STATUS_FAILED = "failed"
+STATUS_SUPPRESSED = "suppressed"
+
+CampaignJob = Tuple[str, str]
+CampaignJobs = Union[Iterable[CampaignJob], AsyncIterable[CampaignJob]]
+
+
+class CallBusyError(ValueError):
+    """Raised when the callee answers the SIP INVITE with 486 Busy Here."""
+
+
+@dataclass
+class CampaignResult:
+    """Outcome of a single dial attempt within a campaign."""
+    phone_number: str
+    call_id: Optional[str]
+    status: str
+    room: Any = None
+    error: Optional[BaseException] = None
+    duration: float = 0.0
+
+
+async def _iterate_jobs(jobs: CampaignJobs) -> AsyncIterator[CampaignJob]:
+    if hasattr(jobs, "__aiter__"):
+        async for job in jobs:
+            yield job
+    else:
+        for job in jobs:
+            yield job
+
+
+def _screen(manager, phone_number: str) -> Optional[CampaignResult]:
+    # Checked before taking a trunk slot so suppressed numbers never wait on one
+    suppression = getattr(manager, "suppression", None)
+    if suppression is None:
+        return None
+    try:
+        if suppression.is_suppressed(phone_number):
+            return CampaignResult(phone_number, None, STATUS_SUPPRESSED)
+    except ValueError as e:
+        return CampaignResult(phone_number, None, STATUS_FAILED, error=e)
+    return None
+
+
+async def run_campaign(manager, jobs: CampaignJobs, timeout: int = 600) -> AsyncIterator[CampaignResult]:
+    """
+    Dial every job through `manager` and yield results in completion order.
+
+    Each call takes a slot on one of `manager.trunk_router`'s trunks, so every
+    campaign (and single call) sharing the router together stays within each
+    trunk's capacity. The campaign itself starts no more dials than the
+    router's total capacity, so a huge job list is read lazily.
+
+    Numbers on the manager's suppression list are reported as "suppressed"
+    without being dialed.
+
+    Args:
+        manager: The LiveKitManager placing the calls.
+        jobs: Iterable or async iterable of (phone_number, prompt_content) tuples.
+        timeout: Empty-room timeout passed to start_outbound_call.
+    """
+    semaphore = asyncio.Semaphore(manager.trunk_router.capacity)
+    results: asyncio.Queue = asyncio.Queue()
+    tasks = set()
+    feed_done = object()
+    # Results still to come; raised by feed() before each result can be queued
+    outstanding = 0
+
+    async def dial(phone_number: str, prompt_content: str):
+        # With a warm pool the room (and so the call ID) comes from the pool
+        call_id = None if getattr(manager, "warm_pool", None) is not None else f"outbound_call_{uuid.uuid4().hex[:12]}"
+        started = time.monotonic()
+        try:
+            room = await manager.start_outbound_call(phone_number, prompt_content, call_id=call_id, timeout=timeout)
+            result = CampaignResult(phone_number, room.name, STATUS_ANSWERED, room=room)
+        except CallBusyError as e:
+            result = CampaignResult(phone_number, call_id, STATUS_BUSY, error=e)
+        except Exception as e:
+            result = CampaignResult(phone_number, call_id, STATUS_FAILED, error=e)
+        except BaseException as e:
+            # Cancellation still owes the campaign a result, or it waits for it forever
+            result = CampaignResult(phone_number, call_id, STATUS_FAILED, error=e)
+            raise
+        finally:
+            result.duration = time.monotonic() - started
+            results.put_nowait(result)
+
+    async def feed():
+        nonlocal outstanding
+        try:
+            async for phone_number, prompt_content in _iterate_jobs(jobs):
+                screened = _screen(manager, phone_number)
+                if screened is not None:
+                    outstanding += 1
+                    results.put_nowait(screened)
+                    continue
+                await semaphore.acquire()
+                task = asyncio.ensure_future(dial(phone_number, prompt_content))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                # Released from a callback so cancelled, never-started tasks give their slot back too.
+                task.add_done_callback(lambda _: semaphore.release())
+                outstanding += 1
+        except Exception as e:
+            results.put_nowait(e)
+        results.put_nowait(feed_done)
+
+    feeder = asyncio.ensure_future(feed())
+    feeding = True
+    try:
+        while feeding or outstanding:
+            item = await results.get()
+            if item is feed_done:
+                feeding = False
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                outstanding -= 1
+                yield item
+    finally:
+        feeder.cancel()
+        for task in list(tasks):
+            task.cancel()
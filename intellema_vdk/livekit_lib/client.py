@@ -3,21 +3,54 @@ import json
 import uuid
 import asyncio
 import time
-import boto3
-from typing import List, Optional
-from dotenv import load_dotenv
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
 from livekit import api
 
-# Load environment variables
-load_dotenv(dotenv_path=".env.local")
-load_dotenv()
+from .broadcast import BroadcastResult, BroadcastTarget, run_broadcast
+from .call_handle import DEFAULT_ACTIVE_POLL_INTERVAL, DEFAULT_POLL_INTERVAL, CallHandle, is_trunk_failure
+from .campaign import CampaignJobs, CampaignResult, run_campaign
+from .egress_session import EgressSession, EgressSessionManager
+from .egress_tracker import EgressTracker
+from .inventory import RoomInventory, export_inventory, iter_inventory
+from .room_state import RoomStateCache, participant_to_dict
+from .token_cache import TokenCache
+from .trunk_router import TrunkLease, TrunkRouter
+from .warm_pool import WarmRoomPool
+from ..config import load_env
+from ..events import EventBus, LiveKitEvent
+from ..instrumentation import Instrumentation, default_instrumentation, instrumented
+from ..prompt_store import PromptStore
+from ..recording_queue import RecordingJob, RecordingQueue
+from ..resilience import Resilience
+from ..s3_transfer import RecordingFetcher, get_s3_client
+from ..suppression import SuppressionList
+
+T = TypeVar("T")
+
 
 class LiveKitManager:
-    def __init__(self):
-        self.url = os.getenv("LIVEKIT_URL")
-        self.api_key = os.getenv("LIVEKIT_API_KEY")
-        self.api_secret = os.getenv("LIVEKIT_API_SECRET")
-        self.sip_trunk_id = os.getenv("SIP_OUTBOUND_TRUNK_ID")
+    provider_name = "livekit"
+
+    def __init__(self, max_calls_per_trunk: Optional[int] = None, room_state_ttl: float = 1.0, instrumentation: Optional[Instrumentation] = None, resilience: Optional[Resilience] = None, warm_pool_size: int = 0, warm_pool_max_idle: float = 300.0, suppression: Optional[SuppressionList] = None, trunk_router: Optional[TrunkRouter] = None, cluster: Optional[str] = None, url: Optional[str] = None, api_key: Optional[str] = None, api_secret: Optional[str] = None, prompt_store: Optional[PromptStore] = None):
+        load_env()
+        self.instrumentation = instrumentation or default_instrumentation
+        self.resilience = resilience or Resilience()
+        self.url = url or os.getenv("LIVEKIT_URL")
+        self.api_key = api_key or os.getenv("LIVEKIT_API_KEY")
+        self.api_secret = api_secret or os.getenv("LIVEKIT_API_SECRET")
+        self.max_calls_per_trunk = max_calls_per_trunk or int(os.getenv("SIP_TRUNK_MAX_CONCURRENT_CALLS", "10"))
+        # Outbound trunks, with per-trunk limits and health (SIP_OUTBOUND_TRUNKS or SIP_OUTBOUND_TRUNK_ID)
+        self.trunk_router = trunk_router or TrunkRouter.from_env(self.max_calls_per_trunk)
+        # Only trunks of this cluster (or of no cluster) are used when the router is shared
+        self.cluster = cluster
+        self.sip_trunk_id = self.trunk_router.trunks[0].trunk_id if self.trunk_router is not None else None
+        # Prompts are sent by reference when a store is configured (PROMPT_STORE_URL)
+        self.prompt_store = prompt_store if prompt_store is not None else PromptStore.from_env()
+        self._call_handles: Dict[str, CallHandle] = {}
+        # (poll_interval, active_poll_interval) for new CallHandles; slowed down by subscribe_events
+        self._call_poll_intervals: Tuple[float, float] = (DEFAULT_POLL_INTERVAL, DEFAULT_ACTIVE_POLL_INTERVAL)
+        # Do-not-call list consulted before every dial (SUPPRESSION_INDEX_PATHS if not given)
+        self.suppression = suppression if suppression is not None else SuppressionList.from_env()
 
         if not self.url or not self.api_key or not self.api_secret:
             raise ValueError("LIVEKIT_URL, LIVEKIT_API_KEY, and LIVEKIT_API_SECRET must be set.")
@@ -27,65 +60,303 @@ class LiveKitManager:
             api_key=self.api_key,
             api_secret=self.api_secret,
         )
+        self.egress_tracker = EgressTracker(self.lk_api, call=self._call)
+        self.egress_sessions = EgressSessionManager(self)
+        self.token_cache = TokenCache(self.api_key, self.api_secret)
+        self.room_state = RoomStateCache(self._list_participants, ttl=room_state_ttl)
+        self.warm_pool = WarmRoomPool(self, size=warm_pool_size, max_idle=warm_pool_max_idle) if warm_pool_size > 0 else None
+        self._recording_queue: Optional[RecordingQueue] = None
 
     async def close(self):
+        for handle in list(self._call_handles.values()):
+            handle.close()
+        self._call_handles.clear()
+        if self.warm_pool is not None:
+            await self.warm_pool.close()
+        if self._recording_queue is not None:
+            await self._recording_queue.close()
+        await self.egress_tracker.close()
         await self.lk_api.aclose()
 
-    async def start_outbound_call(self, phone_number: str, prompt_content: str, call_id: str = None, timeout: int = 600):
-        if not call_id:
-            call_id = f"outbound_call_{uuid.uuid4().hex[:12]}"
-
-        metadata = json.dumps({
-            "phone_number": phone_number,
-            "prompt_content": prompt_content
-        })
-
-        # 1. Create room with metadata
-        room = await self.lk_api.room.create_room(
-            api.CreateRoomRequest(
-                name=call_id,
-                empty_timeout=timeout,
-                metadata=metadata
-            )
-        )
+    @property
+    def recording_queue(self) -> RecordingQueue:
+        """
+        Durable queue that finishes `start_recording(background=True)` jobs.
 
-        # 2. Dispatch agent
-        await self.lk_api.agent_dispatch.create_dispatch(
-            api.CreateAgentDispatchRequest(
-                room=call_id,
-                agent_name="outbound-caller",
-                metadata=metadata
+        Created on first use at RECORDING_QUEUE_PATH (default
+        `recordings/jobs.sqlite3`) with RECORDING_QUEUE_CONCURRENCY workers (default 4).
+        """
+        if self._recording_queue is None:
+            self._recording_queue = RecordingQueue(
+                os.getenv("RECORDING_QUEUE_PATH", os.path.join("recordings", "jobs.sqlite3")),
+                self._run_recording_job,
+                providers={self.provider_name},
+                concurrency=int(os.getenv("RECORDING_QUEUE_CONCURRENCY", "4")),
             )
-        )
+        return self._recording_queue
 
-        # 3. Initiate Outbound Call (SIP/PSTN)
-        if not self.sip_trunk_id:
-            raise ValueError("SIP_OUTBOUND_TRUNK_ID is not configured in environment.")
+    async def _call(self, method: Callable[[Any], Awaitable[T]], request: Any, idempotent: bool = False, hedge: bool = False) -> T:
+        """
+        Send one LiveKit RPC through the retry / circuit-breaker policy in `self.resilience`.
 
-        sip_participant_identity = f"phone-{phone_number}"
+        Args:
+            method: Bound SDK method, e.g. `self.lk_api.room.create_room`.
+            request: The request message; it is re-sent unchanged on retry.
+            idempotent: Retry on any transient error, not only when the request was never delivered.
+            hedge: Hedge the request if the policy has `hedge_after` set (idempotent reads only).
+        """
+        endpoint = f"livekit.{type(method.__self__).__name__}.{method.__name__}"
+        return await self.resilience.call(endpoint, lambda: method(request), idempotent=idempotent, hedge=hedge)
+
+    @instrumented
+    async def start_outbound_call(self, phone_number: str, prompt_content: str, call_id: str = None, timeout: int = 600, wait_until_answered: bool = True, ring_timeout: float = 60.0, trunk: Optional[TrunkLease] = None):
+        """
+        Create a room, dispatch the agent into it and dial `phone_number`.
+
+        Args:
+            phone_number: Number to call, in E.164 format.
+            prompt_content: Prompt passed to the agent through the room metadata. With a
+                            `prompt_store`, only its reference ("prompt_ref") is sent and
+                            the agent resolves it with `PromptStore.resolve`.
+            call_id: Room name; generated if not given.
+            timeout: Empty-room timeout, in seconds.
+            wait_until_answered: If True, return the Room once the callee picks up.
+                                 If False, return a CallHandle as soon as the dial is placed.
+            ring_timeout: With wait_until_answered=False, seconds of ringing after
+                          which the handle gives up with reason "no_answer".
+            trunk: A slot already taken from `trunk_router` (LiveKitFleet passes one);
+                   by default one is acquired here, waiting while every trunk is full.
+
+        When the manager has a warm pool and no call_id is given, a pre-created
+        room with the agent already joined is used instead (its name becomes the
+        call ID and `timeout` does not apply). The call metadata is pushed to the
+        agent as a room metadata update and a data message on topic "call_metadata".
+
+        The trunk slot is held until the call is answered or fails. Dial errors
+        other than the callee declining count against the trunk's health.
+
+        Returns:
+            The Room, or a CallHandle when wait_until_answered is False.
+
+        Raises:
+            SuppressedNumberError: `phone_number` is on the manager's suppression list.
+            CallBusyError: The callee answered 486 Busy Here (blocking mode only;
+                           a handle reports it through `answered`/`failed`).
+        """
+        if self.suppression is not None:
+            self.suppression.check(phone_number)
+        if trunk is None:
+            if self.trunk_router is None:
+                raise ValueError("SIP_OUTBOUND_TRUNK_ID is not configured in environment.")
+            trunk = await self.trunk_router.acquire(self.cluster)
 
         try:
-            await self.lk_api.sip.create_sip_participant(
-                api.CreateSIPParticipantRequest(
-                    room_name=call_id,
-                    sip_trunk_id=self.sip_trunk_id,
-                    sip_call_to=phone_number,
-                    participant_identity=sip_participant_identity,
-                    wait_until_answered=True,
+            return await self._dial(phone_number, prompt_content, call_id, timeout, wait_until_answered, ring_timeout, trunk)
+        except BaseException:
+            # Failed dials have already released the slot with their verdict
+            trunk.release()
+            raise
+
+    async def _dial(self, phone_number: str, prompt_content: str, call_id: Optional[str], timeout: int, wait_until_answered: bool, ring_timeout: float, trunk: TrunkLease):
+        if self.prompt_store is not None:
+            metadata = json.dumps({
+                "phone_number": phone_number,
+                "prompt_ref": await self.prompt_store.aput(prompt_content)
+            })
+        else:
+            metadata = json.dumps({
+                "phone_number": phone_number,
+                "prompt_content": prompt_content
+            })
+
+        warm = None
+        if self.warm_pool is not None and not call_id:
+            self.warm_pool.start()
+            warm = self.warm_pool.claim()
+
+        if warm is not None:
+            # The agent is already in the room; hand it this call's details
+            call_id = warm.name
+            room = warm.room
+            try:
+                with self.instrumentation.phase(self.provider_name, "start_outbound_call", "push_metadata", call_id):
+                    await self._push_call_metadata(call_id, metadata)
+            except BaseException:
+                # The agent keeps a claimed room alive, so its empty timeout never reaps it
+                await self._delete_claimed_room(call_id)
+                raise
+        else:
+            if not call_id:
+                call_id = f"outbound_call_{uuid.uuid4().hex[:12]}"
+
+            # 1. Create room with metadata
+            with self.instrumentation.phase(self.provider_name, "start_outbound_call", "create_room", call_id):
+                room = await self._call(
+                    self.lk_api.room.create_room,
+                    api.CreateRoomRequest(
+                        name=call_id,
+                        empty_timeout=timeout,
+                        metadata=metadata
+                    ),
+                    idempotent=True
                 )
-            )
-        except Exception as e:
-            # Handle SIP Busy/Error 
-            if "Busy Here" in str(e) or "486" in str(e):
-                print(f"Call failed: User is busy ({phone_number})")
-                # We might want to clean up the room if the call failed
-                await self.delete_room(call_id)
-                raise ValueError("User is busy")
-            raise e
 
+            # 2. Dispatch agent
+            with self.instrumentation.phase(self.provider_name, "start_outbound_call", "create_dispatch", call_id):
+                await self._call(
+                    self.lk_api.agent_dispatch.create_dispatch,
+                    api.CreateAgentDispatchRequest(
+                        room=call_id,
+                        agent_name="outbound-caller",
+                        metadata=metadata
+                    )
+                )
+
+        # 3. Initiate Outbound Call (SIP/PSTN)
+        sip_participant_identity = f"phone-{phone_number}"
+        poll_interval, active_poll_interval = self._call_poll_intervals
+        handle = CallHandle(self, call_id, phone_number, sip_participant_identity, room=room, ring_timeout=ring_timeout, poll_interval=poll_interval, active_poll_interval=active_poll_interval, trunk_id=trunk.trunk_id)
+
+        # Busy detection and room cleanup on a failed dial live in the handle
+        with self.instrumentation.phase(self.provider_name, "start_outbound_call", "create_sip_participant", call_id):
+            try:
+                await handle.dial(wait_until_answered=wait_until_answered)
+            except Exception as e:
+                trunk.release(failed=is_trunk_failure(e))
+                raise
+            except BaseException:
+                # Cancelled before the handle could clean up after the dial
+                if warm is not None:
+                    await self._delete_claimed_room(call_id)
+                raise
+
+        if not wait_until_answered:
+            self._call_handles[call_id] = handle
+            handle.ended.add_done_callback(lambda _: self._call_handles.pop(call_id, None))
+            handle.answered.add_done_callback(lambda answered: trunk.release(failed=not answered.cancelled() and is_trunk_failure(answered.exception())))
+            handle.watch()
+            return handle
+
+        trunk.release()
         return room
 
-    async def create_token(self, call_id: str, participant_name: str) -> str:
+    async def _push_call_metadata(self, call_id: str, metadata: str):
+        await asyncio.gather(
+            self._call(
+                self.lk_api.room.update_room_metadata,
+                api.UpdateRoomMetadataRequest(room=call_id, metadata=metadata),
+                idempotent=True
+            ),
+            self._call(
+                self.lk_api.room.send_data,
+                api.SendDataRequest(
+                    room=call_id,
+                    data=metadata.encode('utf-8'),
+                    kind=1,  # 1 = RELIABLE, 0 = LOSSY
+                    topic="call_metadata"
+                )
+            ),
+        )
+
+    async def _delete_claimed_room(self, call_id: str):
+        try:
+            await self._call(self.lk_api.room.delete_room, api.DeleteRoomRequest(room=call_id), idempotent=True)
+        except Exception as e:
+            print(f"Error deleting warm room {call_id}: {e}")
+
+    def get_call_handle(self, call_id: str) -> Optional[CallHandle]:
+        """Return the handle of a non-blocking call that has not ended yet."""
+        return self._call_handles.get(call_id)
+
+    def subscribe_events(self, bus: EventBus, fallback_poll_interval: float = 30.0) -> Callable[[], None]:
+        """
+        Follow LiveKit webhooks published on `bus` (see WebhookServer).
+
+        Egress events settle `start_recording` waits as soon as they arrive,
+        participant and room events keep `room_state` current (it stops
+        re-listing rooms on a TTL), and participant events for a non-blocking
+        call are passed to its CallHandle. The egress poller and CallHandle
+        polling keep running only as a fallback, backing off to
+        `fallback_poll_interval` seconds between polls.
+
+        Returns:
+            A function that unsubscribes and restores the poll intervals.
+        """
+        tracker = self.egress_tracker
+        intervals = (tracker.min_interval, tracker.max_interval)
+        event_driven = self.room_state.event_driven
+        call_intervals = self._call_poll_intervals
+        tracker.min_interval = max(tracker.min_interval, fallback_poll_interval / 6)
+        tracker.max_interval = max(tracker.max_interval, fallback_poll_interval)
+        self.room_state.event_driven = True
+        self._set_call_poll_intervals((max(call_intervals[0], fallback_poll_interval / 6), max(call_intervals[1], fallback_poll_interval)))
+        unsubscribe = bus.subscribe(LiveKitEvent, self._on_livekit_event)
+
+        def restore():
+            unsubscribe()
+            tracker.min_interval, tracker.max_interval = intervals
+            self.room_state.event_driven = event_driven
+            # Rooms cached while events kept them current are stale without them
+            if not event_driven:
+                self.room_state.invalidate()
+            self._set_call_poll_intervals(call_intervals)
+
+        return restore
+
+    def _set_call_poll_intervals(self, intervals: Tuple[float, float]):
+        self._call_poll_intervals = intervals
+        for handle in self._call_handles.values():
+            handle.poll_interval, handle.active_poll_interval = intervals
+
+    def _on_livekit_event(self, event: LiveKitEvent):
+        info = event.egress_info
+        if info is not None:
+            self.egress_tracker.resolve(info)
+            self.egress_sessions.discard(info)
+        self.room_state.apply_event(event.event)
+
+        handle = self._call_handles.get(event.room_name)
+        if handle is None:
+            return
+        participant = event.participant
+        if event.type == "room_finished":
+            handle.update(None)
+        elif participant is not None and participant.identity == handle.participant_identity:
+            if event.type in ("participant_left", "participant_connection_aborted"):
+                # The final participant info carries the disconnect reason, if any
+                if not handle.update(participant):
+                    handle.update(None)
+            else:
+                handle.update(participant)
+
+    def dial_campaign(self, jobs: CampaignJobs, timeout: int = 600) -> AsyncIterator[CampaignResult]:
+        """
+        Dial many numbers concurrently and yield each result as soon as the call
+        is answered, busy or failed.
+
+        Args:
+            jobs: Iterable or async iterable of (phone_number, prompt_content) tuples.
+            timeout: Empty-room timeout for each call, in seconds.
+
+        Returns:
+            An async iterator of CampaignResult, in completion order. Concurrency is
+            capped per SIP trunk by `trunk_router`.
+        """
+        if self.trunk_router is None:
+            raise ValueError("SIP_OUTBOUND_TRUNK_ID is not configured in environment.")
+        return run_campaign(self, jobs, timeout=timeout)
+
+    @instrumented
+    async def create_token(self, call_id: str, participant_name: str, use_cache: bool = True) -> str:
+        """
+        Create a join token for `participant_name` in `call_id`.
+
+        With `use_cache`, a still-valid token minted earlier for the same room,
+        identity and grants is returned instead of signing a new one.
+        """
+        if use_cache:
+            return self.token_cache.get(call_id, participant_name)
+
         token = api.AccessToken(self.api_key, self.api_secret)
         token.with_identity(participant_name)
         token.with_name(participant_name)
@@ -95,24 +366,47 @@ class LiveKitManager:
         ))
         return token.to_jwt()
 
+    @instrumented
+    async def create_tokens(self, call_id: str, participant_names: List[str]) -> Dict[str, str]:
+        """
+        Create join tokens for many participants of one room in a single call.
+
+        Returns:
+            Dict mapping each participant name to its token. Cached tokens are reused.
+        """
+        return self.token_cache.get_many(call_id, participant_names)
+
+    @instrumented
     async def delete_room(self, call_id: str):
-        await self.lk_api.room.delete_room(api.DeleteRoomRequest(room=call_id))
-
-    async def start_stream(self, call_id: str, rtmp_urls: List[str]):
-        await self.lk_api.egress.start_room_composite_egress(
-            api.RoomCompositeEgressRequest(
-                room_name=call_id,
-                layout="speaker",
-                stream_outputs=[
-                    api.StreamOutput(
-                        protocol=api.StreamProtocol.RTMP,
-                        urls=rtmp_urls
-                    )
-                ]
-            )
-        )
+        await self._call(self.lk_api.room.delete_room, api.DeleteRoomRequest(room=call_id), idempotent=True)
+        self.token_cache.invalidate(call_id)
+        self.room_state.invalidate(call_id)
+        self.egress_sessions.forget(call_id)
 
-    async def start_recording(self, call_id: str, output_filepath: Optional[str] = None, upload_to_s3: bool = True, wait_for_completion: bool = True):
+    @instrumented
+    async def start_stream(self, call_id: str, rtmp_urls: List[str]) -> EgressSession:
+        """
+        Stream the room to `rtmp_urls`.
+
+        The URLs are added to the room's running streaming egress, if any
+        (including one started by `start_recording(..., rtmp_urls=...)`), so
+        every destination shares one composite encoder. See `egress_sessions`.
+        """
+        return await self.egress_sessions.add_streams(call_id, rtmp_urls)
+
+    @instrumented
+    async def stop_stream(self, call_id: str, rtmp_urls: Optional[List[str]] = None):
+        """
+        Stop streaming the room to `rtmp_urls` (default: every attached URL).
+
+        An egress left with no outputs is stopped; a recording keeps running.
+        """
+        if rtmp_urls is None:
+            rtmp_urls = [url for session in self.egress_sessions.sessions(call_id) for url in session.stream_urls]
+        await self.egress_sessions.remove_streams(call_id, rtmp_urls)
+
+    @instrumented
+    async def start_recording(self, call_id: str, output_filepath: Optional[str] = None, upload_to_s3: bool = True, wait_for_completion: bool = True, background: bool = False, rtmp_urls: Optional[List[str]] = None):
         """
         Start recording a room.
         
@@ -121,6 +415,14 @@ class LiveKitManager:
             output_filepath: Optional path/filename for the recording.
             upload_to_s3: If True, uploads to S3 (requires env vars). If False, saves locally on Egress server.
             wait_for_completion: If True, waits for the recording to finish and downloads it locally (if upload_to_s3 is True).
+            background: If True (with upload_to_s3), return as soon as the egress has started.
+                        Waiting and downloading are done by `recording_queue`, which
+                        survives restarts; see `get_recording_status`.
+            rtmp_urls: Also stream to these URLs from the same egress. Later
+                       `start_stream` calls add their URLs to it as well.
+
+        Returns:
+            The queued RecordingJob in background mode, otherwise None.
         """
         file_output = None
         filename = output_filepath if output_filepath else f"{call_id}-{uuid.uuid4().hex[:6]}.mp4"
@@ -152,85 +454,91 @@ class LiveKitManager:
             )
             print(f"Starting recording. File will be saved locally: {filename}")
         
-        egress_info = await self.lk_api.egress.start_room_composite_egress(
-            api.RoomCompositeEgressRequest(
-                room_name=call_id,
-                layout="grid",
-                preset=api.EncodingOptionsPreset.H264_720P_30,
-                file_outputs=[file_output]
-            )
-        )
+        with self.instrumentation.phase(self.provider_name, "start_recording", "start_egress", call_id):
+            egress_info = await self.egress_sessions.record(call_id, file_output, rtmp_urls)
+
+        if background and upload_to_s3:
+            self.recording_queue.start()
+            job = await self.recording_queue.aenqueue(call_id, self.provider_name, egress_info.egress_id, bucket=bucket, key=filename, local_path=os.path.join("recordings", filename))
+            print(f"Recording job {job.job_id} queued for egress {egress_info.egress_id}")
+            return job
 
         if wait_for_completion and upload_to_s3:
-            egress_id = egress_info.egress_id
-            print(f"Waiting for egress {egress_id} to complete...")
-            
-            while True:
-                try:
-                    egress_list = await self.lk_api.egress.list_egress(api.ListEgressRequest(egress_id=egress_id))
-                except Exception as e:
-                    print(f"Error checking egress status: {e}")
-                    await asyncio.sleep(5)
-                    continue
-
-                if not egress_list.items:
-                    print("Egress info not found during polling.")
-                    break
-                
-                info = egress_list.items[0]
-                if info.status == api.EgressStatus.EGRESS_COMPLETE:
-                    print("Egress completed successfully.")
-                    break
-                elif info.status == api.EgressStatus.EGRESS_FAILED:
-                    raise RuntimeError(f"Egress failed: {info.error}")
-                elif info.status == api.EgressStatus.EGRESS_LIMIT_REACHED:
-                     raise RuntimeError(f"Egress limit reached: {info.error}")
-                
-                await asyncio.sleep(5)
-
-            # Download from S3
-            print(f"Downloading {filename} from S3 bucket {bucket}...")
-            s3 = boto3.client(
-                's3',
-                aws_access_key_id=access_key,
-                aws_secret_access_key=secret_key,
-                region_name=region
-            )
-            
-            local_dir = "recordings"
-            os.makedirs(local_dir, exist_ok=True)
-            local_path = os.path.join(local_dir, filename)
-            
-            try:
-                s3.download_file(bucket, filename, local_path)
-                print(f"Recording downloaded to: {local_path}")
-            except Exception as e:
-                print(f"Failed to download recording: {e}")
-                raise e
+            await self._finish_recording(call_id, egress_info.egress_id, bucket, filename, os.path.join("recordings", filename))
+
+    async def _finish_recording(self, call_id: str, egress_id: str, bucket: str, filename: str, local_path: str):
+        # Wait for the egress to upload the file to S3, then download it
+        print(f"Waiting for egress {egress_id} to complete...")
+
+        with self.instrumentation.phase(self.provider_name, "start_recording", "wait_egress", call_id):
+            info = await self.egress_tracker.wait(egress_id)
+        self.egress_sessions.ended(egress_id)
+        if info is not None:
+            print("Egress completed successfully.")
+
+        # Download from S3
+        print(f"Downloading {filename} from S3 bucket {bucket}...")
+        fetcher = RecordingFetcher(get_s3_client(os.getenv("AWS_ACCESS_KEY_ID"), os.getenv("AWS_SECRET_ACCESS_KEY"), os.getenv("AWS_REGION")), rate_limiter=self.resilience.rate_limiter)
+
+        try:
+            with self.instrumentation.phase(self.provider_name, "start_recording", "download", call_id):
+                await fetcher.fetch(bucket, filename, local_path)
+            print(f"Recording downloaded to: {local_path}")
+        except Exception as e:
+            print(f"Failed to download recording: {e}")
+            raise e
+
+    async def _run_recording_job(self, job: RecordingJob):
+        await self._finish_recording(job.call_id, job.source_id, job.bucket, job.key, job.local_path)
 
+    def resume_recordings(self) -> List[RecordingJob]:
+        """
+        Start the recording queue so jobs left unfinished by a previous run are
+        completed. Call once at startup from within the event loop.
+
+        Returns:
+            The unfinished LiveKit jobs found in the queue.
+        """
+        self.recording_queue.start()
+        return [job for job in self.recording_queue.store.unfinished() if job.provider == self.provider_name]
+
+    def get_recording_status(self, call_id: str) -> List[RecordingJob]:
+        """Background recording jobs for `call_id`, oldest first, with their current status."""
+        return self.recording_queue.status(call_id)
+
+    @instrumented
     async def kick_participant(self, call_id: str, identity: str):
-        await self.lk_api.room.remove_participant(
+        await self._call(
+            self.lk_api.room.remove_participant,
             api.RoomParticipantIdentity(
                 room=call_id,
                 identity=identity
-            )
+            ),
+            idempotent=True
         )
+        self.room_state.invalidate(call_id)
 
+    @instrumented
     async def mute_participant(self, call_id: str, identity: str, track_sid: str, muted: bool):
-        await self.lk_api.room.mute_published_track(
+        await self._call(
+            self.lk_api.room.mute_published_track,
             api.MuteRoomTrackRequest(
                 room=call_id,
                 identity=identity,
                 track_sid=track_sid,
                 muted=muted
-            )
+            ),
+            idempotent=True
         )
+        self.room_state.invalidate(call_id)
 
-    async def send_alert(self, call_id: str, message: str, participant_identity: Optional[str] = None):
-        destination_identities = [participant_identity] if participant_identity else []
-        data_packet = json.dumps({"type": "alert", "message": message}).encode('utf-8')
+    @staticmethod
+    def _encode_alert(message: str) -> bytes:
+        return json.dumps({"type": "alert", "message": message}).encode('utf-8')
 
-        await self.lk_api.room.send_data(
+    async def _send_data(self, call_id: str, data_packet: bytes, destination_identities: List[str]):
+        await self._call(
+            self.lk_api.room.send_data,
             api.SendDataRequest(
                 room=call_id,
                 data=data_packet,
@@ -239,10 +547,53 @@ class LiveKitManager:
             )
         )
 
-    async def get_participant_identities(self, call_id: str) -> List[dict]:
+    @instrumented
+    async def send_alert(self, call_id: str, message: str, participant_identity: Optional[str] = None):
+        destination_identities = [participant_identity] if participant_identity else []
+        await self._send_data(call_id, self._encode_alert(message), destination_identities)
+
+    @instrumented
+    async def broadcast_alert(self, targets: Iterable[BroadcastTarget], message: str, concurrency: int = 50) -> List[BroadcastResult]:
+        """
+        Send the same alert to many rooms concurrently.
+
+        Args:
+            targets: Iterable of (call_id, identities) pairs. identities may be None
+                     (everyone in the room), a single identity or a list of identities.
+            message: Alert text. It is encoded once and the same bytes are reused
+                     for every target.
+            concurrency: Maximum number of sends in flight.
+
+        Returns:
+            One BroadcastResult per target, in input order, with `ok` and `error`
+            set per room. A failure in one room does not stop the others.
+        """
+        data_packet = self._encode_alert(message)
+
+        async def send(call_id: str, identities: List[str]):
+            await self._send_data(call_id, data_packet, identities)
+
+        return await run_broadcast(send, targets, concurrency=concurrency)
+
+    async def _list_participants(self, call_id: str) -> List[api.ParticipantInfo]:
+        response = await self._call(
+            self.lk_api.room.list_participants,
+            api.ListParticipantsRequest(room=call_id),
+            idempotent=True,
+            hedge=True
+        )
+        return list(response.participants)
+
+    @instrumented
+    async def get_participant_identities(self, call_id: str, use_cache: bool = True) -> List[dict]:
         """
         Get a list of all participants in a room with their identities and tracks.
         
+        Args:
+            call_id: Name of the room.
+            use_cache: If True, serve from the room-state cache (refreshed after
+                       `room_state_ttl` seconds, with concurrent callers sharing one RPC).
+        
         Returns:
             List of dicts with participant info:
             [
@@ -257,24 +608,28 @@ class LiveKitManager:
                 ...
             ]
         """
-        response = await self.lk_api.room.list_participants(
-            api.ListParticipantsRequest(room=call_id)
-        )
-        participants = []
-        for p in response.participants:
-            tracks = []
-            for track in p.tracks:
-                tracks.append({
-                    "sid": track.sid,
-                    "type": "audio" if track.type == 1 else "video" if track.type == 2 else "unknown",
-                    "muted": track.muted,
-                    "source": track.source.name if hasattr(track.source, 'name') else str(track.source)
-                })
-            participants.append({
-                "identity": p.identity,
-                "name": p.name,
-                "tracks": tracks
-            })
-        return participants
+        if use_cache:
+            return await self.room_state.get(call_id)
+        return [participant_to_dict(p) for p in await self._list_participants(call_id)]
 
-    
+    def iter_inventory(self, concurrency: int = 50, names: Optional[List[str]] = None, include_participants: bool = True) -> AsyncIterator[RoomInventory]:
+        """
+        Yield every live room with its participants as compact records.
+
+        Args:
+            concurrency: Maximum number of list_participants RPCs in flight.
+            names: Only these rooms (default: all rooms on the server).
+            include_participants: If False, only list_rooms is called.
+
+        Returns:
+            An async iterator of RoomInventory, in completion order.
+        """
+        return iter_inventory(self, concurrency=concurrency, names=names, include_participants=include_participants)
+
+    @instrumented
+    async def export_inventory(self, path: str, concurrency: int = 50) -> int:
+        """
+        Write the room/participant inventory to a CSV file, or to Parquet when
+        `path` ends in `.parquet` (requires pyarrow). Returns the number of rows.
+        """
+        return await export_inventory(self, path, concurrency=concurrency)
@@ -0,0 +1,204 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from livekit import api
+
+from .egress_tracker import TERMINAL_EGRESS_STATUSES
+
+RECORDING_LAYOUT = "grid"
+RECORDING_PRESET = api.EncodingOptionsPreset.H264_720P_30
+STREAM_LAYOUT = "speaker"
+
+
+@dataclass
+class EgressSession:
+    """A room composite egress and the outputs currently attached to it."""
+    room_name: str
+    egress_id: str
+    # RTMP URLs can only be added to an egress that was started with a stream output
+    streaming: bool
+    stream_urls: List[str] = field(default_factory=list)
+    file_paths: List[str] = field(default_factory=list)
+
+    @property
+    def recording(self) -> bool:
+        return bool(self.file_paths)
+
+
+class EgressSessionManager:
+    """
+    Keeps one room composite egress per room and attaches outputs to it.
+
+    Every output of a session is fed by the same composite encoder, so an extra
+    RTMP destination costs no extra encoding. RTMP URLs are added and removed
+    on the running egress with UpdateStream. LiveKit cannot attach a file
+    output to a running egress, nor a stream output to a file-only one. Start
+    both together (`start_recording(..., rtmp_urls=...)`) to record and stream
+    from one encoder; otherwise a second egress is started for the missing
+    output kind and tracked alongside the first.
+
+    Sessions end when their egress reaches a terminal status (seen through
+    `discard`, called from the manager's egress waits and webhooks), when the
+    last output is removed, or when the room is deleted.
+    """
+
+    def __init__(self, manager: Any):
+        self.manager = manager
+        self._sessions: Dict[str, List[EgressSession]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def sessions(self, room_name: str) -> List[EgressSession]:
+        return list(self._sessions.get(room_name, ()))
+
+    def get(self, egress_id: str) -> Optional[EgressSession]:
+        for sessions in self._sessions.values():
+            for session in sessions:
+                if session.egress_id == egress_id:
+                    return session
+        return None
+
+    def _lock(self, room_name: str) -> asyncio.Lock:
+        lock = self._locks.get(room_name)
+        if lock is None:
+            lock = self._locks[room_name] = asyncio.Lock()
+        return lock
+
+    def _find(self, room_name: str, streaming: bool = False, recording: bool = False) -> Optional[EgressSession]:
+        for session in self._sessions.get(room_name, ()):
+            if (not streaming or session.streaming) and (not recording or session.recording):
+                return session
+        return None
+
+    async def _start(self, room_name: str, rtmp_urls: List[str], file_output: Optional[api.EncodedFileOutput]) -> EgressSession:
+        if file_output is not None:
+            request = api.RoomCompositeEgressRequest(room_name=room_name, layout=RECORDING_LAYOUT, preset=RECORDING_PRESET, file_outputs=[file_output])
+        else:
+            request = api.RoomCompositeEgressRequest(room_name=room_name, layout=STREAM_LAYOUT)
+        if rtmp_urls:
+            request.stream_outputs.append(api.StreamOutput(protocol=api.StreamProtocol.RTMP, urls=rtmp_urls))
+        info = await self.manager._call(self.manager.lk_api.egress.start_room_composite_egress, request)
+        session = EgressSession(
+            room_name,
+            info.egress_id,
+            streaming=bool(rtmp_urls),
+            stream_urls=list(rtmp_urls),
+            file_paths=[file_output.filepath] if file_output is not None else [],
+        )
+        self._sessions.setdefault(room_name, []).append(session)
+        return session
+
+    async def record(self, room_name: str, file_output: api.EncodedFileOutput, rtmp_urls: Optional[Iterable[str]] = None) -> EgressSession:
+        """
+        Start recording `room_name` to `file_output`, streaming to `rtmp_urls` from the same egress.
+
+        A file output cannot be attached to a running egress, so this always
+        starts one. Later `add_streams` calls attach to it if `rtmp_urls` were given.
+        """
+        rtmp_urls = _unique(rtmp_urls or ())
+        async with self._lock(room_name):
+            session = await self._start(room_name, rtmp_urls, file_output)
+        print(f"Egress {session.egress_id} recording {room_name}" + (f" and streaming to {len(rtmp_urls)} destination(s)" if rtmp_urls else ""))
+        return session
+
+    async def add_streams(self, room_name: str, rtmp_urls: Iterable[str]) -> EgressSession:
+        """
+        Stream `room_name` to `rtmp_urls`.
+
+        URLs are added to the room's streaming egress if it has one; URLs that
+        are already attached are skipped. Otherwise a streaming egress is started.
+        """
+        rtmp_urls = _unique(rtmp_urls)
+        async with self._lock(room_name):
+            session = self._find(room_name, streaming=True)
+            if session is not None:
+                added = [url for url in rtmp_urls if url not in session.stream_urls]
+                if not added:
+                    return session
+                try:
+                    await self.manager._call(self.manager.lk_api.egress.update_stream, api.UpdateStreamRequest(egress_id=session.egress_id, add_output_urls=added))
+                    session.stream_urls.extend(added)
+                    print(f"Added {len(added)} stream output(s) to egress {session.egress_id}")
+                    return session
+                except Exception as e:
+                    if not _egress_gone(e):
+                        raise
+                    # The egress ended without us hearing about it; start a fresh one below
+                    self._remove(session)
+                    rtmp_urls = _unique(session.stream_urls + rtmp_urls)
+            if self._find(room_name) is not None:
+                print(f"Room {room_name} has a file-only egress; starting a separate streaming egress")
+            return await self._start(room_name, rtmp_urls, None)
+
+    async def remove_streams(self, room_name: str, rtmp_urls: Iterable[str]) -> Optional[EgressSession]:
+        """
+        Stop streaming `room_name` to `rtmp_urls`.
+
+        A streaming egress left with no outputs is stopped.
+
+        Returns:
+            The session, or None if it was stopped or there was none.
+        """
+        rtmp_urls = set(rtmp_urls)
+        async with self._lock(room_name):
+            session = self._find(room_name, streaming=True)
+            if session is None:
+                return None
+            removed = [url for url in session.stream_urls if url in rtmp_urls]
+            if not removed:
+                return session
+            if len(removed) == len(session.stream_urls) and not session.recording:
+                await self._stop(session)
+                return None
+            await self.manager._call(self.manager.lk_api.egress.update_stream, api.UpdateStreamRequest(egress_id=session.egress_id, remove_output_urls=removed))
+            session.stream_urls = [url for url in session.stream_urls if url not in rtmp_urls]
+            return session
+
+    async def stop(self, room_name: str):
+        """Stop every egress of `room_name`."""
+        async with self._lock(room_name):
+            for session in self.sessions(room_name):
+                await self._stop(session)
+
+    async def _stop(self, session: EgressSession):
+        try:
+            await self.manager._call(self.manager.lk_api.egress.stop_egress, api.StopEgressRequest(egress_id=session.egress_id), idempotent=True)
+        except Exception as e:
+            if not _egress_gone(e):
+                raise
+        self._remove(session)
+
+    def discard(self, info: api.EgressInfo) -> bool:
+        """Drop the session of `info.egress_id` if it has reached a terminal status."""
+        if info.status not in TERMINAL_EGRESS_STATUSES:
+            return False
+        return self.ended(info.egress_id)
+
+    def ended(self, egress_id: str) -> bool:
+        """Drop the session of an egress known to have finished."""
+        session = self.get(egress_id)
+        if session is None:
+            return False
+        self._remove(session)
+        return True
+
+    def forget(self, room_name: str):
+        """Drop a room's sessions without stopping them, e.g. after the room was deleted."""
+        self._sessions.pop(room_name, None)
+        self._locks.pop(room_name, None)
+
+    def _remove(self, session: EgressSession):
+        sessions = self._sessions.get(session.room_name)
+        if sessions is None:
+            return
+        sessions[:] = [s for s in sessions if s is not session]
+        if not sessions:
+            del self._sessions[session.room_name]
+
+
+def _unique(urls: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(urls))
+
+
+def _egress_gone(error: BaseException) -> bool:
+    return getattr(error, "status", None) in (404, 412) or getattr(error, "code", None) in ("not_found", "failed_precondition")
@@ -0,0 +1,173 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from livekit import api
+
+TERMINAL_EGRESS_STATUSES = (
+    api.EgressStatus.EGRESS_COMPLETE,
+    api.EgressStatus.EGRESS_FAILED,
+    api.EgressStatus.EGRESS_ABORTED,
+    api.EgressStatus.EGRESS_LIMIT_REACHED,
+)
+
+
+async def _direct_call(method, request, idempotent: bool = False, hedge: bool = False):
+    return await method(request)
+
+
+class EgressTracker:
+    """
+    Watches every outstanding egress from a single background task.
+
+    Each tick lists the active egresses once and looks up individually only the
+    egresses that have left the active set, so the RPC count per tick does not
+    grow with the number of recordings. The interval starts at `min_interval`
+    and backs off towards `max_interval` while nothing changes, then snaps back
+    as soon as an egress is added or finishes.
+
+    RPCs go through `call(method, request, idempotent=..., hedge=...)` when
+    given (LiveKitManager passes its retry/circuit-breaker choke point). After
+    `max_errors` consecutive failed polls every waiter is failed with the last
+    error instead of polling a dead endpoint forever.
+    """
+
+    def __init__(self, lk_api: api.LiveKitAPI, min_interval: float = 0.5, max_interval: float = 5.0, backoff: float = 1.5, call: Optional[Callable[..., Awaitable[Any]]] = None, max_errors: int = 10):
+        self.lk_api = lk_api
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.call = call or _direct_call
+        self.max_errors = max_errors
+        self._errors = 0
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def track(self, egress_id: str) -> asyncio.Future:
+        """
+        Start watching `egress_id`.
+
+        Returns:
+            A future that resolves to the final EgressInfo on EGRESS_COMPLETE (or None
+            if the egress can no longer be found), and raises RuntimeError on
+            EGRESS_FAILED, EGRESS_ABORTED or EGRESS_LIMIT_REACHED, or when the
+            status could not be read for `max_errors` polls in a row.
+        """
+        future = self._futures.get(egress_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._futures[egress_id] = future
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        self._wakeup.set()
+        return future
+
+    async def wait(self, egress_id: str) -> Optional[api.EgressInfo]:
+        """Wait until `egress_id` reaches a terminal status. See `track`."""
+        return await asyncio.shield(self.track(egress_id))
+
+    def resolve(self, info: api.EgressInfo) -> bool:
+        """
+        Settle the future for `info.egress_id` if `info` is terminal.
+
+        Returns:
+            True if a tracked future was settled.
+        """
+        if info.status not in TERMINAL_EGRESS_STATUSES:
+            return False
+        future = self._futures.pop(info.egress_id, None)
+        if future is None or future.done():
+            return False
+        if info.status == api.EgressStatus.EGRESS_COMPLETE:
+            future.set_result(info)
+        elif info.status == api.EgressStatus.EGRESS_LIMIT_REACHED:
+            future.set_exception(RuntimeError(f"Egress limit reached: {info.error}"))
+        elif info.status == api.EgressStatus.EGRESS_ABORTED:
+            future.set_exception(RuntimeError(f"Egress aborted: {info.error}"))
+        else:
+            future.set_exception(RuntimeError(f"Egress failed: {info.error}"))
+        return True
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for future in self._futures.values():
+            if not future.done():
+                future.cancel()
+        self._futures.clear()
+
+    def _fail_all(self, error: Exception):
+        futures, self._futures = self._futures, {}
+        for future in futures.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def _run(self):
+        interval = self.min_interval
+        self._errors = 0
+        while self._futures:
+            self._wakeup.clear()
+            changed = await self._poll()
+            interval = self.min_interval if changed else min(interval * self.backoff, self.max_interval)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+                interval = self.min_interval
+            except asyncio.TimeoutError:
+                pass
+
+    async def _list_active(self) -> Dict[str, api.EgressInfo]:
+        active = {}
+        page_token = None
+        while True:
+            request = api.ListEgressRequest(active=True)
+            if page_token:
+                request.page_token.CopyFrom(page_token)
+            response = await self.call(self.lk_api.egress.list_egress, request, idempotent=True, hedge=True)
+            for info in response.items:
+                active[info.egress_id] = info
+            page_token = getattr(response, "next_page_token", None)
+            if not page_token or not page_token.token:
+                return active
+
+    async def _lookup(self, egress_id: str):
+        response = await self.call(self.lk_api.egress.list_egress, api.ListEgressRequest(egress_id=egress_id), idempotent=True, hedge=True)
+        if not response.items:
+            print(f"Egress {egress_id} not found during polling.")
+            future = self._futures.pop(egress_id, None)
+            if future is not None and not future.done():
+                future.set_result(None)
+            return True
+        return self.resolve(response.items[0])
+
+    async def _poll(self) -> bool:
+        try:
+            active = await self._list_active()
+        except Exception as e:
+            print(f"Error checking egress status: {e}")
+            self._errors += 1
+            if self._errors >= self.max_errors:
+                self._fail_all(RuntimeError(f"Egress status unavailable after {self._errors} failed polls: {e}"))
+            return False
+        self._errors = 0
+
+        changed = False
+        for info in active.values():
+            if info.egress_id in self._futures:
+                changed = self.resolve(info) or changed
+
+        gone = [egress_id for egress_id in self._futures if egress_id not in active]
+        if gone:
+            results = await asyncio.gather(*(self._lookup(egress_id) for egress_id in gone), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    print(f"Error checking egress status: {result}")
+                elif result:
+                    changed = True
+        return changed
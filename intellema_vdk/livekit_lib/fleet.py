@@ -0,0 +1,128 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+
+from ..suppression import SuppressionList
+from .campaign import CampaignJobs, CampaignResult, run_campaign
+from .client import LiveKitManager
+from .trunk_router import STRATEGY_LEAST_IN_FLIGHT, Trunk, TrunkRouter
+
+# LiveKitManager methods whose first argument is the call ID (room name)
+_ROOM_METHODS = frozenset({
+    "start_stream",
+    "stop_stream",
+    "start_recording",
+    "get_recording_status",
+    "create_token",
+    "create_tokens",
+    "kick_participant",
+    "mute_participant",
+    "send_alert",
+    "get_participant_identities",
+    "get_call_handle",
+})
+
+
+class LiveKitFleet:
+    """
+    Dials through SIP trunks on several LiveKit clusters behind one manager API.
+
+    Every trunk of the shared `trunk_router` names the cluster it is configured
+    on. Each call takes a slot on the best trunk across all clusters (see
+    TrunkRouter) and is placed by that cluster's LiveKitManager. The fleet
+    remembers which cluster each room lives on, so room methods such as
+    `delete_room`, `start_recording` or `create_token` take the same arguments
+    as on LiveKitManager and go to the right cluster.
+
+    Trunks without a cluster can be used from any cluster; calls on them are
+    placed by `default_cluster` (the first manager if not given).
+
+    Rooms created without the fleet can be registered with `adopt`.
+    """
+
+    def __init__(self, managers: Dict[str, LiveKitManager], trunk_router: TrunkRouter, suppression: Optional[SuppressionList] = None, default_cluster: Optional[str] = None):
+        if not managers:
+            raise ValueError("LiveKitFleet needs at least one cluster")
+        unknown = [t.trunk_id for t in trunk_router.trunks if t.cluster is not None and t.cluster not in managers]
+        if unknown:
+            raise ValueError(f"SIP trunks {unknown} name no configured cluster ({sorted(managers)})")
+        if default_cluster is not None and default_cluster not in managers:
+            raise ValueError(f"Unknown default cluster {default_cluster}")
+        self.managers = dict(managers)
+        self.default_cluster = default_cluster if default_cluster is not None else next(iter(managers))
+        self.trunk_router = trunk_router
+        for manager in self.managers.values():
+            manager.trunk_router = trunk_router
+        self.suppression = suppression if suppression is not None else next(iter(self.managers.values())).suppression
+        self.warm_pool = None
+        self._rooms: Dict[str, str] = {}
+
+    @classmethod
+    def from_config(cls, clusters: Dict[str, Dict[str, str]], trunks: Sequence[Trunk], strategy: str = STRATEGY_LEAST_IN_FLIGHT, default_cluster: Optional[str] = None, **manager_kwargs: Any) -> "LiveKitFleet":
+        """
+        Build one LiveKitManager per cluster and a router over `trunks`.
+
+        Args:
+            clusters: Cluster name -> {"url": ..., "api_key": ..., "api_secret": ...}.
+            trunks: The trunks to dial through; each `cluster` must be a key of
+                `clusters` or None (see `default_cluster`).
+            strategy: TrunkRouter strategy.
+            default_cluster: Cluster that places calls on trunks without a cluster.
+            **manager_kwargs: Passed to every LiveKitManager.
+        """
+        router = TrunkRouter(trunks, strategy=strategy)
+        managers = {
+            name: LiveKitManager(trunk_router=router, cluster=name, **settings, **manager_kwargs)
+            for name, settings in clusters.items()
+        }
+        return cls(managers, router, default_cluster=default_cluster)
+
+    def manager_for(self, call_id: str) -> LiveKitManager:
+        """The manager of the cluster hosting `call_id`."""
+        cluster = self._rooms.get(call_id)
+        if cluster is None:
+            raise ValueError(f"Unknown call {call_id}; it was not placed through this fleet (see adopt)")
+        return self.managers[cluster]
+
+    def adopt(self, call_id: str, cluster: str):
+        """Route later room methods for `call_id` to `cluster`."""
+        if cluster not in self.managers:
+            raise ValueError(f"Unknown cluster {cluster}")
+        self._rooms[call_id] = cluster
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in _ROOM_METHODS:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+        def route(call_id: str, *args, **kwargs):
+            return getattr(self.manager_for(call_id), name)(call_id, *args, **kwargs)
+
+        return route
+
+    async def start_outbound_call(self, phone_number: str, prompt_content: str, call_id: str = None, timeout: int = 600, wait_until_answered: bool = True, ring_timeout: float = 60.0):
+        """Place a call on the best trunk of any cluster. See LiveKitManager.start_outbound_call."""
+        if self.suppression is not None:
+            self.suppression.check(phone_number)
+        trunk = await self.trunk_router.acquire()
+        cluster = trunk.trunk.cluster or self.default_cluster
+        manager = self.managers[cluster]
+        if call_id:
+            self._rooms[call_id] = cluster
+        try:
+            result = await manager.start_outbound_call(phone_number, prompt_content, call_id=call_id, timeout=timeout, wait_until_answered=wait_until_answered, ring_timeout=ring_timeout, trunk=trunk)
+        except BaseException:
+            if call_id:
+                self._rooms.pop(call_id, None)
+            raise
+        self._rooms[getattr(result, "call_id", None) or result.name] = cluster
+        return result
+
+    def dial_campaign(self, jobs: CampaignJobs, timeout: int = 600) -> AsyncIterator[CampaignResult]:
+        """Dial many numbers across every cluster. See LiveKitManager.dial_campaign."""
+        return run_campaign(self, jobs, timeout=timeout)
+
+    async def delete_room(self, call_id: str):
+        await self.manager_for(call_id).delete_room(call_id)
+        self._rooms.pop(call_id, None)
+
+    async def close(self):
+        await asyncio.gather(*(manager.close() for manager in self.managers.values()))
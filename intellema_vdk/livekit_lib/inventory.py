@@ -0,0 +1,195 @@
+import asyncio
+import csv
+from typing import Any, AsyncIterator, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from livekit import api
+
+from .call_handle import SIP_CALL_STATUS_ATTRIBUTE, _is_not_found
+
+
+class RoomRecord(NamedTuple):
+    """One live room, as reported by list_rooms."""
+    sid: str
+    name: str
+    num_participants: int
+    num_publishers: int
+    creation_time: int
+    active_recording: bool
+    metadata: str
+
+
+class ParticipantRecord(NamedTuple):
+    """One participant of a room, with only the fields needed for reconciliation."""
+    sid: str
+    identity: str
+    name: str
+    kind: str
+    state: str
+    joined_at: int
+    num_tracks: int
+    sip_call_status: str
+
+
+class RoomInventory(NamedTuple):
+    """A room with its participants. `error` is set if they could not be listed."""
+    room: RoomRecord
+    participants: Tuple[ParticipantRecord, ...]
+    error: Optional[BaseException] = None
+
+
+ROOM_COLUMNS = tuple(f"room_{f}" for f in RoomRecord._fields)
+PARTICIPANT_COLUMNS = tuple(f"participant_{f}" for f in ParticipantRecord._fields)
+INVENTORY_COLUMNS = ROOM_COLUMNS + PARTICIPANT_COLUMNS + ("error",)
+
+_EMPTY_PARTICIPANT = ("",) * 5 + (0, 0, "")
+
+
+def _room_record(room: api.Room) -> RoomRecord:
+    return RoomRecord(room.sid, room.name, room.num_participants, room.num_publishers, room.creation_time, room.active_recording, room.metadata)
+
+
+def _participant_record(p: api.ParticipantInfo) -> ParticipantRecord:
+    return ParticipantRecord(
+        p.sid,
+        p.identity,
+        p.name,
+        api.ParticipantInfo.Kind.Name(p.kind),
+        api.ParticipantInfo.State.Name(p.state),
+        p.joined_at,
+        len(p.tracks),
+        p.attributes.get(SIP_CALL_STATUS_ATTRIBUTE, ""),
+    )
+
+
+async def iter_inventory(manager: Any, concurrency: int = 50, names: Optional[Sequence[str]] = None, include_participants: bool = True) -> AsyncIterator[RoomInventory]:
+    """
+    List every live room (or `names`) and yield each with its participants.
+
+    Participants are listed with at most `concurrency` list_participants RPCs in
+    flight, and rooms are yielded in completion order as soon as their listing
+    returns, so only the room records and the in-flight results are held in
+    memory. Rooms that close between the two listings are skipped.
+    """
+    response = await manager._call(manager.lk_api.room.list_rooms, api.ListRoomsRequest(names=list(names or [])), idempotent=True)
+    rooms = [_room_record(room) for room in response.rooms]
+    del response
+
+    if not include_participants:
+        for room in rooms:
+            yield RoomInventory(room, ())
+        return
+
+    async def fetch(room: RoomRecord) -> Optional[RoomInventory]:
+        try:
+            listed = await manager._call(manager.lk_api.room.list_participants, api.ListParticipantsRequest(room=room.name), idempotent=True, hedge=True)
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            return RoomInventory(room, (), e)
+        return RoomInventory(room, tuple(_participant_record(p) for p in listed.participants))
+
+    pending = set()
+    queue = iter(rooms)
+    try:
+        while True:
+            for room in queue:
+                pending.add(asyncio.ensure_future(fetch(room)))
+                if len(pending) >= concurrency:
+                    break
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result is not None:
+                    yield result
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def inventory_rows(inventory: RoomInventory) -> List[tuple]:
+    """
+    Flatten one room into rows of INVENTORY_COLUMNS: one per participant, or a
+    single row with empty participant columns for an empty room.
+    """
+    error = str(inventory.error) if inventory.error else ""
+    if not inventory.participants:
+        return [inventory.room + _EMPTY_PARTICIPANT + (error,)]
+    return [inventory.room + participant + (error,) for participant in inventory.participants]
+
+
+def to_columns(rows: Iterable[tuple]) -> Dict[str, list]:
+    """Transpose rows of INVENTORY_COLUMNS into a dict of column lists."""
+    columns = {name: [] for name in INVENTORY_COLUMNS}
+    appenders = [columns[name].append for name in INVENTORY_COLUMNS]
+    for row in rows:
+        for append, value in zip(appenders, row):
+            append(value)
+    return columns
+
+
+class _CsvWriter:
+    def __init__(self, path: str):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(INVENTORY_COLUMNS)
+
+    def write(self, rows: List[tuple]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow") from e
+        self._pa = pa
+        self._schema = pa.schema(
+            [(name, pa.string()) for name in ROOM_COLUMNS[:2]]
+            + [(ROOM_COLUMNS[2], pa.int32()), (ROOM_COLUMNS[3], pa.int32()), (ROOM_COLUMNS[4], pa.int64()), (ROOM_COLUMNS[5], pa.bool_()), (ROOM_COLUMNS[6], pa.string())]
+            + [(name, pa.string()) for name in PARTICIPANT_COLUMNS[:5]]
+            + [(PARTICIPANT_COLUMNS[5], pa.int64()), (PARTICIPANT_COLUMNS[6], pa.int32()), (PARTICIPANT_COLUMNS[7], pa.string())]
+            + [("error", pa.string())]
+        )
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows: List[tuple]):
+        self._writer.write_table(self._pa.Table.from_pydict(to_columns(rows), schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+async def export_inventory(manager: Any, path: str, concurrency: int = 50, batch_rows: int = 10000) -> int:
+    """
+    Write the inventory to `path`, one row per participant (see INVENTORY_COLUMNS).
+
+    A path ending in `.parquet` is written as Parquet (requires pyarrow), in row
+    groups of `batch_rows`; anything else is written as CSV. Rows are flushed
+    every `batch_rows`, so memory does not grow with the number of rooms.
+
+    Returns:
+        The number of rows written.
+    """
+    writer = _ParquetWriter(path) if path.endswith(".parquet") else _CsvWriter(path)
+    written = 0
+    batch: List[tuple] = []
+    try:
+        async for inventory in iter_inventory(manager, concurrency=concurrency):
+            batch.extend(inventory_rows(inventory))
+            if len(batch) >= batch_rows:
+                writer.write(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            writer.write(batch)
+            written += len(batch)
+    finally:
+        writer.close()
+    return written
@@ -0,0 +1,139 @@
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from livekit import api
+
+
+def participant_to_dict(p: api.ParticipantInfo) -> dict:
+    tracks = []
+    for track in p.tracks:
+        tracks.append({
+            "sid": track.sid,
+            "type": "audio" if track.type == 1 else "video" if track.type == 2 else "unknown",
+            "muted": track.muted,
+            "source": track.source.name if hasattr(track.source, 'name') else str(track.source)
+        })
+    return {
+        "identity": p.identity,
+        "name": p.name,
+        "tracks": tracks
+    }
+
+
+class _RoomState:
+    __slots__ = ("participants", "loaded_at")
+
+    def __init__(self, participants: Dict[str, dict], loaded_at: float):
+        self.participants = participants
+        self.loaded_at = loaded_at
+
+
+class RoomStateCache:
+    """
+    Caches the participant list of each room for `ttl` seconds.
+
+    Concurrent callers asking for the same room while a refresh is in flight
+    share that one `list_participants` RPC. When webhook events are fed in with
+    `apply_event` and `event_driven` is True, cached rooms no longer expire and
+    are updated in place from participant and track events instead of being
+    re-listed, except that they are re-listed after `event_driven_ttl` in case
+    a `room_finished` event was missed.
+
+    Expired rooms are dropped as the cache is used, and at most `max_rooms`
+    are kept, the least recently loaded going first.
+    """
+
+    def __init__(self, fetch: Callable[[str], Awaitable[List[api.ParticipantInfo]]], ttl: float = 1.0, event_driven: bool = False, event_driven_ttl: float = 300.0, max_rooms: int = 10000):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.event_driven = event_driven
+        self.event_driven_ttl = event_driven_ttl
+        self.max_rooms = max_rooms
+        # In load order, so the oldest (first to expire) rooms are at the front
+        self._rooms: "OrderedDict[str, _RoomState]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def _max_age(self) -> float:
+        return self.event_driven_ttl if self.event_driven else self.ttl
+
+    def _prune(self, now: float):
+        oldest = now - self._max_age
+        while self._rooms:
+            room, state = next(iter(self._rooms.items()))
+            if state.loaded_at > oldest and len(self._rooms) <= self.max_rooms:
+                break
+            del self._rooms[room]
+
+    async def get(self, room: str) -> List[dict]:
+        now = time.monotonic()
+        self._prune(now)
+        state = self._rooms.get(room)
+        if state is None:
+            state = await self._refresh(room)
+        return [{**p, "tracks": [dict(t) for t in p["tracks"]]} for p in state.participants.values()]
+
+    def invalidate(self, room: Optional[str] = None):
+        """
+        Forget the cached state of `room`, or of every room when `room` is None.
+
+        A refresh already in flight for the room is not stored when it returns,
+        and later callers start a new one.
+        """
+        if room is None:
+            self._rooms.clear()
+            self._inflight.clear()
+        else:
+            self._rooms.pop(room, None)
+            self._inflight.pop(room, None)
+
+    def apply_event(self, event: api.WebhookEvent) -> bool:
+        """
+        Update a cached room from a LiveKit webhook event.
+
+        Only rooms that are already cached are touched, so a partial view is
+        never served. Returns True if the cache changed.
+        """
+        room = event.room.name
+        if event.event == "room_finished":
+            return self._rooms.pop(room, None) is not None
+
+        state = self._rooms.get(room)
+        if state is None:
+            return False
+
+        identity = event.participant.identity
+        if event.event == "participant_left":
+            return state.participants.pop(identity, None) is not None
+        if event.event in ("participant_joined", "track_published"):
+            state.participants[identity] = participant_to_dict(event.participant)
+            return True
+        if event.event == "track_unpublished":
+            participant = participant_to_dict(event.participant)
+            participant["tracks"] = [t for t in participant["tracks"] if t["sid"] != event.track.sid]
+            state.participants[identity] = participant
+            return True
+        return False
+
+    async def _refresh(self, room: str) -> _RoomState:
+        future = self._inflight.get(room)
+        if future is None:
+            future = asyncio.ensure_future(self._load(room))
+            self._inflight[room] = future
+            future.add_done_callback(lambda f: self._inflight.pop(room) if self._inflight.get(room) is f else None)
+        # Shield so one cancelled caller does not cancel the shared RPC for the others.
+        return await asyncio.shield(future)
+
+    async def _load(self, room: str) -> _RoomState:
+        # The in-flight task is the room's load generation: `invalidate` drops
+        # it, so a result fetched before the invalidation is not stored.
+        task = asyncio.current_task()
+        participants = await self.fetch(room)
+        state = _RoomState({p.identity: participant_to_dict(p) for p in participants}, time.monotonic())
+        if self._inflight.get(room) is task:
+            self._rooms.pop(room, None)
+            self._rooms[room] = state
+            self._prune(state.loaded_at)
+        return state
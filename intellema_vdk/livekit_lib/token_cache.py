@@ -0,0 +1,70 @@
+import json
+import time
+import dataclasses
+import datetime
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from livekit import api
+
+
+class TokenCache:
+    """
+    Reuses signed access tokens keyed by (room, identity, name, grants).
+
+    A cached token is handed out again until `refresh_margin` before it expires,
+    after which a fresh one is minted. At most `max_size` tokens are kept; the
+    least recently used are dropped first.
+    """
+
+    def __init__(self, api_key: str, api_secret: str, ttl: datetime.timedelta = datetime.timedelta(hours=6), refresh_margin: datetime.timedelta = datetime.timedelta(minutes=10), max_size: int = 10000):
+        if refresh_margin >= ttl:
+            raise ValueError("refresh_margin must be shorter than ttl")
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.max_size = max_size
+        self._tokens: "OrderedDict[Tuple[str, str, str, str], Tuple[str, float]]" = OrderedDict()
+
+    def get(self, room: str, identity: str, name: Optional[str] = None, grants: Optional[api.VideoGrants] = None) -> str:
+        name = name if name is not None else identity
+        # The default grants are fully determined by the room, so skip serializing them.
+        grants_key = "" if grants is None else json.dumps(dataclasses.asdict(grants), sort_keys=True)
+        key = (room, identity, name, grants_key)
+
+        now = time.time()
+        cached = self._tokens.get(key)
+        if cached is not None and cached[1] - self.refresh_margin.total_seconds() > now:
+            self._tokens.move_to_end(key)
+            return cached[0]
+
+        if grants is None:
+            grants = api.VideoGrants(room_join=True, room=room)
+        token = (
+            api.AccessToken(self.api_key, self.api_secret)
+            .with_identity(identity)
+            .with_name(name)
+            .with_grants(grants)
+            .with_ttl(self.ttl)
+            .to_jwt()
+        )
+        self._tokens[key] = (token, now + self.ttl.total_seconds())
+        self._tokens.move_to_end(key)
+        while len(self._tokens) > self.max_size:
+            self._tokens.popitem(last=False)
+        return token
+
+    def get_many(self, room: str, identities: Iterable[str], grants: Optional[api.VideoGrants] = None) -> Dict[str, str]:
+        return {identity: self.get(room, identity, grants=grants) for identity in identities}
+
+    def invalidate(self, room: Optional[str] = None):
+        """Drop cached tokens for `room`, or every token when `room` is None."""
+        if room is None:
+            self._tokens.clear()
+            return
+        for key in [key for key in self._tokens if key[0] == room]:
+            del self._tokens[key]
+
+    def __len__(self) -> int:
+        return len(self._tokens)
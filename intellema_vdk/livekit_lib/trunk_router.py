@@ -0,0 +1,200 @@
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+STRATEGY_LEAST_IN_FLIGHT = "least_in_flight"
+STRATEGY_WEIGHTED = "weighted"
+
+
+@dataclass
+class Trunk:
+    """
+    An outbound SIP trunk and its live routing state.
+
+    `cluster` names the LiveKit deployment the trunk is configured on (see
+    LiveKitFleet); None means any, and a fleet then places its calls through
+    its default cluster.
+    """
+    trunk_id: str
+    capacity: int = 10
+    weight: float = 1.0
+    cluster: Optional[str] = None
+    in_flight: int = 0
+    dialed: int = 0
+    errors: int = 0
+    # Consecutive failed dials; reset by a successful one
+    failures: int = 0
+    ejections: int = 0
+    ejected_until: float = 0.0
+
+    @property
+    def available(self) -> int:
+        return self.capacity - self.in_flight
+
+    def ejected(self, now: Optional[float] = None) -> bool:
+        return self.ejected_until > (time.monotonic() if now is None else now)
+
+
+class TrunkLease:
+    """A slot on a trunk, held for one dial. `release()` may be called more than once."""
+
+    def __init__(self, router: "TrunkRouter", trunk: Trunk):
+        self.router = router
+        self.trunk = trunk
+        self.released = False
+
+    @property
+    def trunk_id(self) -> str:
+        return self.trunk.trunk_id
+
+    def release(self, failed: bool = False):
+        """Give the slot back, recording whether the trunk failed the dial."""
+        if not self.released:
+            self.released = True
+            self.router._release(self.trunk, failed)
+
+
+class TrunkRouter:
+    """
+    Spreads outbound calls over several SIP trunks.
+
+    Each trunk takes at most `capacity` calls at a time; `acquire()` waits when
+    every eligible trunk is full. Among trunks with free slots it picks:
+
+    - "least_in_flight": the trunk with the lowest share of its capacity in use,
+      preferring higher weights on ties;
+    - "weighted": a random trunk, in proportion to `weight`.
+
+    After `failure_threshold` consecutive trunk failures a trunk is ejected for
+    `ejection_time` seconds, doubling on each further ejection up to
+    `max_ejection_time`. Once the ejection expires the trunk is tried again; one
+    more failure ejects it again and a success restores it. If every eligible
+    trunk is ejected they are used anyway, so a correlated outage degrades to
+    plain least-loaded routing instead of refusing every call.
+
+    One router can be shared by several managers (and campaigns); limits and
+    health then apply across all of them.
+    """
+
+    def __init__(self, trunks: Sequence[Trunk], strategy: str = STRATEGY_LEAST_IN_FLIGHT, failure_threshold: int = 5, ejection_time: float = 30.0, max_ejection_time: float = 300.0):
+        if not trunks:
+            raise ValueError("TrunkRouter needs at least one trunk")
+        if strategy not in (STRATEGY_LEAST_IN_FLIGHT, STRATEGY_WEIGHTED):
+            raise ValueError(f"Unknown trunk routing strategy: {strategy}")
+        self.trunks: List[Trunk] = list(trunks)
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.ejection_time = ejection_time
+        self.max_ejection_time = max_ejection_time
+        self._condition: Optional[asyncio.Condition] = None
+
+    @classmethod
+    def from_env(cls, default_capacity: int = 10) -> Optional["TrunkRouter"]:
+        """
+        Build a router from SIP_OUTBOUND_TRUNKS, or from the single SIP_OUTBOUND_TRUNK_ID.
+
+        SIP_OUTBOUND_TRUNKS is a comma-separated list of
+        `trunk_id[@cluster][:capacity[:weight]]`, e.g. `ST_a:20,ST_b@eu:10:2`.
+        SIP_TRUNK_ROUTING picks the strategy (default least_in_flight).
+
+        Returns:
+            The router, or None if no trunk is configured.
+        """
+        spec = os.getenv("SIP_OUTBOUND_TRUNKS")
+        if spec:
+            trunks = [parse_trunk(entry, default_capacity) for entry in spec.split(",") if entry.strip()]
+        elif os.getenv("SIP_OUTBOUND_TRUNK_ID"):
+            trunks = [Trunk(os.getenv("SIP_OUTBOUND_TRUNK_ID"), capacity=default_capacity)]
+        else:
+            return None
+        return cls(trunks, strategy=os.getenv("SIP_TRUNK_ROUTING", STRATEGY_LEAST_IN_FLIGHT))
+
+    @property
+    def capacity(self) -> int:
+        return sum(trunk.capacity for trunk in self.trunks)
+
+    @property
+    def in_flight(self) -> int:
+        return sum(trunk.in_flight for trunk in self.trunks)
+
+    def clusters(self) -> List[Optional[str]]:
+        return list(dict.fromkeys(trunk.cluster for trunk in self.trunks))
+
+    def _eligible(self, cluster: Optional[str]) -> List[Trunk]:
+        if cluster is None:
+            return self.trunks
+        return [t for t in self.trunks if t.cluster is None or t.cluster == cluster]
+
+    def _choose(self, cluster: Optional[str]) -> Optional[Trunk]:
+        now = time.monotonic()
+        eligible = self._eligible(cluster)
+        if not eligible:
+            raise ValueError(f"No SIP trunk is configured for cluster {cluster!r}")
+        free = [t for t in eligible if t.available > 0]
+        healthy = [t for t in free if not t.ejected(now)]
+        if not healthy and not any(not t.ejected(now) for t in eligible):
+            healthy = free
+        if not healthy:
+            return None
+        if self.strategy == STRATEGY_WEIGHTED:
+            return random.choices(healthy, weights=[t.weight for t in healthy])[0]
+        return min(healthy, key=lambda t: (t.in_flight / t.capacity, -t.weight))
+
+    def _until_unejected(self, cluster: Optional[str]) -> Optional[float]:
+        # Seconds until a free but ejected trunk may be used again; no release announces that
+        now = time.monotonic()
+        ejections = [t.ejected_until for t in self._eligible(cluster) if t.available > 0 and t.ejected(now)]
+        return min(ejections) - now if ejections else None
+
+    async def acquire(self, cluster: Optional[str] = None) -> TrunkLease:
+        """
+        Take a slot on the best trunk (of `cluster`, if given), waiting for one
+        to free up, or for a free trunk's ejection to expire, if they are all full.
+        """
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            while True:
+                trunk = self._choose(cluster)
+                if trunk is not None:
+                    trunk.in_flight += 1
+                    trunk.dialed += 1
+                    return TrunkLease(self, trunk)
+                try:
+                    await asyncio.wait_for(self._condition.wait(), self._until_unejected(cluster))
+                except asyncio.TimeoutError:
+                    pass
+
+    def _release(self, trunk: Trunk, failed: bool):
+        trunk.in_flight -= 1
+        if failed:
+            trunk.errors += 1
+            trunk.failures += 1
+            if trunk.failures >= self.failure_threshold and not trunk.ejected():
+                duration = min(self.ejection_time * (2 ** trunk.ejections), self.max_ejection_time)
+                trunk.ejections += 1
+                trunk.ejected_until = time.monotonic() + duration
+                print(f"SIP trunk {trunk.trunk_id} ejected for {duration:.0f}s after {trunk.failures} consecutive failures")
+        else:
+            trunk.failures = 0
+            trunk.ejections = 0
+        if self._condition is not None:
+            asyncio.ensure_future(self._notify())
+
+    async def _notify(self):
+        async with self._condition:
+            self._condition.notify_all()
+
+
+def parse_trunk(entry: str, default_capacity: int = 10) -> Trunk:
+    """Parse one `trunk_id[@cluster][:capacity[:weight]]` entry of SIP_OUTBOUND_TRUNKS."""
+    parts = entry.strip().split(":")
+    if len(parts) > 3 or not parts[0]:
+        raise ValueError(f"Invalid SIP trunk entry: {entry!r}")
+    trunk_id, _, cluster = parts[0].partition("@")
+    capacity = int(parts[1]) if len(parts) > 1 and parts[1] else default_capacity
+    weight = float(parts[2]) if len(parts) > 2 and parts[2] else 1.0
+    return Trunk(trunk_id, capacity=capacity, weight=weight, cluster=cluster or None)
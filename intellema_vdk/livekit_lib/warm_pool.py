@@ -0,0 +1,163 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Optional, Set
+
+from livekit import api
+
+WARM_ROOM_METADATA = json.dumps({"warm": True})
+
+
+@dataclass
+class WarmRoom:
+    """A pre-created room whose agent has already joined."""
+    name: str
+    room: Any
+    ready_at: float
+
+
+class WarmRoomPool:
+    """
+    Keeps `size` rooms ready with the agent already dispatched and joined.
+
+    A background task creates rooms (metadata `{"warm": true}`), dispatches
+    `agent_name` into each and waits until an agent participant is present.
+    Rooms idle for longer than `max_idle` seconds are deleted and replaced. At
+    most `refill_concurrency` rooms are warmed at once; after a failed warm-up
+    the refill backs off exponentially up to 30 seconds.
+
+    `claim()` hands out the oldest ready room, or None when the pool is empty,
+    in which case the caller creates a room as usual.
+    """
+
+    def __init__(self, manager: Any, size: int = 5, max_idle: float = 300.0, agent_name: str = "outbound-caller", empty_timeout: int = 600, refill_concurrency: int = 4, agent_join_timeout: float = 30.0):
+        self.manager = manager
+        self.size = size
+        self.max_idle = max_idle
+        self.agent_name = agent_name
+        self.empty_timeout = empty_timeout
+        self.refill_concurrency = refill_concurrency
+        self.agent_join_timeout = agent_join_timeout
+        self._ready: Deque[WarmRoom] = deque()
+        self._warming: Set[asyncio.Task] = set()
+        self._deleting: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._failures = 0
+        self._retry_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._ready)
+
+    def start(self):
+        """Start refilling in the background. Safe to call repeatedly."""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    def resize(self, size: int):
+        """Change the target number of warm rooms; surplus rooms are released as they expire."""
+        self.size = size
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def claim(self) -> Optional[WarmRoom]:
+        now = time.monotonic()
+        warm = None
+        while self._ready:
+            candidate = self._ready.popleft()
+            if now - candidate.ready_at < self.max_idle:
+                warm = candidate
+                break
+            self._discard(candidate)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return warm
+
+    async def close(self, delete_rooms: bool = True):
+        tasks = [t for t in [self._task, *self._warming] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, *self._deleting, return_exceptions=True)
+        self._task = None
+        self._warming.clear()
+
+        rooms, self._ready = list(self._ready), deque()
+        if delete_rooms and rooms:
+            await asyncio.gather(*(self._delete(warm.name) for warm in rooms))
+
+    async def _run(self):
+        check_interval = max(0.5, min(self.max_idle / 4, 5.0))
+        while True:
+            self._wakeup.clear()
+            self._expire()
+            deficit = self.size - len(self._ready) - len(self._warming)
+            if time.monotonic() >= self._retry_at:
+                for _ in range(max(0, min(deficit, self.refill_concurrency - len(self._warming)))):
+                    task = asyncio.ensure_future(self._warm_one())
+                    self._warming.add(task)
+                    task.add_done_callback(self._warming.discard)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=check_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._ready and (now - self._ready[0].ready_at >= self.max_idle or len(self._ready) > self.size):
+            self._discard(self._ready.popleft())
+
+    def _discard(self, warm: WarmRoom):
+        task = asyncio.ensure_future(self._delete(warm.name))
+        self._deleting.add(task)
+        task.add_done_callback(self._deleting.discard)
+
+    async def _delete(self, name: str):
+        try:
+            await self.manager.delete_room(name)
+        except Exception as e:
+            print(f"Error deleting warm room {name}: {e}")
+
+    async def _warm_one(self):
+        name = f"warm_{uuid.uuid4().hex[:12]}"
+        lk_api = self.manager.lk_api
+        try:
+            room = await self.manager._call(
+                lk_api.room.create_room,
+                api.CreateRoomRequest(name=name, empty_timeout=self.empty_timeout, metadata=WARM_ROOM_METADATA),
+                idempotent=True
+            )
+            await self.manager._call(
+                lk_api.agent_dispatch.create_dispatch,
+                api.CreateAgentDispatchRequest(room=name, agent_name=self.agent_name, metadata=WARM_ROOM_METADATA)
+            )
+            await asyncio.wait_for(self._wait_for_agent(name), timeout=self.agent_join_timeout)
+        except asyncio.CancelledError:
+            await self._delete(name)
+            raise
+        except Exception as e:
+            print(f"Failed to warm room {name}: {e}")
+            self._failures += 1
+            self._retry_at = time.monotonic() + min(30.0, 0.5 * 2 ** self._failures)
+            await self._delete(name)
+        else:
+            self._failures = 0
+            self._ready.append(WarmRoom(name, room, time.monotonic()))
+        finally:
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    async def _wait_for_agent(self, name: str):
+        while True:
+            response = await self.manager._call(
+                self.manager.lk_api.room.list_participants,
+                api.ListParticipantsRequest(room=name),
+                idempotent=True
+            )
+            if any(p.kind == api.ParticipantInfo.Kind.AGENT for p in response.participants):
+                return
+            await asyncio.sleep(0.25)
@@ -0,0 +1,266 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+REF_PREFIX = "sha256:"
+
+# Blob tag bytes: zlib-compressed or plain UTF-8
+_COMPRESSED = b"Z"
+_PLAIN = b"T"
+
+
+class PromptNotFoundError(KeyError):
+    """Raised when a prompt reference is not in the store."""
+
+
+def prompt_ref(content: str) -> str:
+    """The content address of a prompt: `sha256:<hex digest of its UTF-8 bytes>`."""
+    return REF_PREFIX + hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _digest(ref: str) -> str:
+    if not ref.startswith(REF_PREFIX) or len(ref) != len(REF_PREFIX) + 64:
+        raise ValueError(f"Invalid prompt reference: {ref!r}")
+    return ref[len(REF_PREFIX):]
+
+
+class FilePromptBackend:
+    """Prompt blobs as files under `directory`, sharded by the first two hex digits."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self._path(digest))
+
+    def write(self, digest: str, blob: bytes):
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename, so readers in other processes never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def read(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+class S3PromptBackend:
+    """
+    Prompt blobs as S3 objects `<prefix><digest>` (requires boto3). Each
+    request takes a token for `s3.<operation>` from `rate_limiter`, if given.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "prompts/", s3: Any = None, rate_limiter: Any = None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self._s3 = s3
+        self.rate_limiter = rate_limiter
+
+    @property
+    def s3(self):
+        if self._s3 is None:
+            from .s3_transfer import get_s3_client
+
+            self._s3 = get_s3_client(os.getenv("AWS_ACCESS_KEY_ID"), os.getenv("AWS_SECRET_ACCESS_KEY"), os.getenv("AWS_REGION"))
+        return self._s3
+
+    def _limit(self, operation: str):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire_sync(f"s3.{operation}")
+
+    def exists(self, digest: str) -> bool:
+        self._limit("head_object")
+        try:
+            self.s3.head_object(Bucket=self.bucket, Key=self.prefix + digest)
+            return True
+        except Exception as e:
+            if getattr(e, "response", {}).get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def write(self, digest: str, blob: bytes):
+        self._limit("put_object")
+        self.s3.put_object(Bucket=self.bucket, Key=self.prefix + digest, Body=blob)
+
+    def read(self, digest: str) -> Optional[bytes]:
+        self._limit("get_object")
+        try:
+            return self.s3.get_object(Bucket=self.bucket, Key=self.prefix + digest)["Body"].read()
+        except self.s3.exceptions.NoSuchKey:
+            return None
+
+
+async def _single_flight(inflight: Dict[str, asyncio.Future], key: str, fn: Any) -> str:
+    loop = asyncio.get_running_loop()
+    future = inflight.get(key)
+    if future is None or future.get_loop() is not loop:
+        future = loop.run_in_executor(None, fn, key)
+        inflight[key] = future
+        future.add_done_callback(lambda f: inflight.pop(key) if inflight.get(key) is f else None)
+    # Shield so one cancelled caller does not cancel the shared work for the others.
+    return await asyncio.shield(future)
+
+
+class PromptStore:
+    """
+    Content-addressed prompt registry.
+
+    `put` stores a prompt once under its sha256 reference and returns the
+    reference, which is all the call metadata needs to carry; the agent
+    resolves it with `get` (or `resolve` on the whole metadata dict). Blobs
+    are zlib-compressed when `compress` is set and that makes them smaller.
+
+    The last `cache_size` prompts are kept in an LRU in both directions, so a
+    prompt shared by a whole campaign is hashed and written once and an agent
+    reads each prompt from the backend once. Concurrent `aput`s of the same
+    prompt (or `aget`s of the same reference) share one backend round trip.
+    """
+
+    def __init__(self, backend: Any, cache_size: int = 256, compress: bool = True, compress_level: int = 6):
+        self.backend = backend
+        self.cache_size = cache_size
+        self.compress = compress
+        self.compress_level = compress_level
+        # content -> ref for prompts known to be stored; str hashes are cached, so hits cost no sha256
+        self._refs: "OrderedDict[str, str]" = OrderedDict()
+        self._contents: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        # In-flight executor work, keyed by content (aput) and by reference (aget)
+        self._putting: Dict[str, asyncio.Future] = {}
+        self._getting: Dict[str, asyncio.Future] = {}
+
+    @classmethod
+    def from_env(cls) -> Optional["PromptStore"]:
+        """
+        Build a store from PROMPT_STORE_URL: a directory path (or `file://` URL)
+        or `s3://bucket/prefix`. PROMPT_STORE_CACHE_SIZE sets the LRU size.
+        S3 requests are limited by RATE_LIMITS (see RateLimiter.from_env).
+
+        Returns:
+            The store, or None if PROMPT_STORE_URL is not set.
+        """
+        url = os.getenv("PROMPT_STORE_URL")
+        if not url:
+            return None
+        if url.startswith("s3://"):
+            bucket, _, prefix = url[len("s3://"):].partition("/")
+            from .rate_limit import RateLimiter
+
+            backend = S3PromptBackend(bucket, prefix, rate_limiter=RateLimiter.from_env())
+        else:
+            backend = FilePromptBackend(url[len("file://"):] if url.startswith("file://") else url)
+        return cls(backend, cache_size=int(os.getenv("PROMPT_STORE_CACHE_SIZE", "256")))
+
+    def _remember(self, content: str, ref: str):
+        with self._lock:
+            self._refs[content] = ref
+            self._refs.move_to_end(content)
+            self._contents[ref] = content
+            self._contents.move_to_end(ref)
+            while len(self._refs) > self.cache_size:
+                self._refs.popitem(last=False)
+            while len(self._contents) > self.cache_size:
+                self._contents.popitem(last=False)
+
+    def _encode(self, content: str) -> bytes:
+        data = content.encode("utf-8")
+        if self.compress:
+            packed = zlib.compress(data, self.compress_level)
+            if len(packed) < len(data):
+                return _COMPRESSED + packed
+        return _PLAIN + data
+
+    @staticmethod
+    def _decode(blob: bytes) -> str:
+        tag, data = blob[:1], blob[1:]
+        if tag == _COMPRESSED:
+            data = zlib.decompress(data)
+        elif tag != _PLAIN:
+            raise ValueError("Unrecognised prompt blob")
+        return data.decode("utf-8")
+
+    def cached_ref(self, content: str) -> Optional[str]:
+        """The reference of `content` if it is known to be stored, without hashing it."""
+        with self._lock:
+            ref = self._refs.get(content)
+            if ref is not None:
+                self._refs.move_to_end(content)
+            return ref
+
+    def put(self, content: str) -> str:
+        """Store `content` (if it is not stored yet) and return its reference."""
+        ref = self.cached_ref(content)
+        if ref is not None:
+            return ref
+        ref = prompt_ref(content)
+        digest = _digest(ref)
+        if not self.backend.exists(digest):
+            self.backend.write(digest, self._encode(content))
+        self._remember(content, ref)
+        return ref
+
+    def get(self, ref: str) -> str:
+        """
+        Return the prompt stored under `ref`.
+
+        Raises:
+            PromptNotFoundError: Nothing is stored under `ref`.
+            ValueError: `ref` is malformed, or the stored blob does not match it.
+        """
+        with self._lock:
+            content = self._contents.get(ref)
+            if content is not None:
+                self._contents.move_to_end(ref)
+                return content
+        blob = self.backend.read(_digest(ref))
+        if blob is None:
+            raise PromptNotFoundError(ref)
+        content = self._decode(blob)
+        if prompt_ref(content) != ref:
+            raise ValueError(f"Stored prompt does not match {ref}")
+        self._remember(content, ref)
+        return content
+
+    async def aput(self, content: str) -> str:
+        """`put` without blocking the event loop on a backend write."""
+        ref = self.cached_ref(content)
+        if ref is not None:
+            return ref
+        return await _single_flight(self._putting, content, self.put)
+
+    async def aget(self, ref: str) -> str:
+        """`get` without blocking the event loop on a backend read."""
+        with self._lock:
+            content = self._contents.get(ref)
+        if content is not None:
+            return content
+        return await _single_flight(self._getting, ref, self.get)
+
+    def resolve(self, metadata: Dict[str, Any]) -> Optional[str]:
+        """
+        The prompt of a call's metadata: `prompt_content` if it is inline,
+        otherwise the prompt stored under `prompt_ref`.
+        """
+        if metadata.get("prompt_content") is not None:
+            return metadata["prompt_content"]
+        ref = metadata.get("prompt_ref")
+        return self.get(ref) if ref else None
@@ -0,0 +1,277 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+
+class RateLimit(NamedTuple):
+    """A token bucket: `rate` requests per second on average, bursts of up to `burst`."""
+    rate: float
+    burst: Optional[float] = None
+
+    @property
+    def capacity(self) -> float:
+        return self.burst if self.burst is not None else max(self.rate, 1.0)
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised instead of waiting longer than the limiter's `max_wait` for a token."""
+
+    def __init__(self, endpoint: str, wait: float):
+        super().__init__(f"Rate limit for {endpoint} would delay the request {wait:.1f}s")
+        self.endpoint = endpoint
+        self.wait = wait
+
+
+Buckets = List[Tuple[str, RateLimit]]
+
+
+class _MemoryBuckets:
+    """Buckets for one process."""
+
+    def __init__(self):
+        self._state: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, buckets: Buckets, now: float, max_wait: Optional[float], block: bool) -> Optional[float]:
+        with self._lock:
+            levels = [_refill(self._state.get(key), limit, now) for key, limit in buckets]
+            wait = _wait_for(levels, buckets)
+            if (max_wait is not None and wait > max_wait) or (not block and wait > 0):
+                return None if not block else wait
+            for (key, _), level in zip(buckets, levels):
+                self._state[key] = (level - 1.0, now)
+            return wait
+
+    def drain(self, buckets: Buckets, now: float):
+        with self._lock:
+            for key, limit in buckets:
+                level = _refill(self._state.get(key), limit, now)
+                self._state[key] = (min(level, 0.0), now)
+
+
+class _SqliteBuckets:
+    """
+    Buckets in a SQLite file, shared by every process that opens it.
+
+    Each reservation is one short BEGIN IMMEDIATE transaction. The file only
+    holds transient state, so it is written with synchronous=OFF.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        # A connection must not be used across fork()
+        if conn is None or self._local.pid != os.getpid():
+            import sqlite3
+
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _levels(self, conn, buckets: Buckets, now: float) -> List[float]:
+        keys = [key for key, _ in buckets]
+        rows = dict((key, (tokens, updated)) for key, tokens, updated in conn.execute(
+            f"SELECT key, tokens, updated FROM buckets WHERE key IN ({','.join('?' * len(keys))})", keys
+        ))
+        return [_refill(rows.get(key), limit, now) for key, limit in buckets]
+
+    def _store(self, conn, buckets: Buckets, levels: List[float], now: float):
+        conn.executemany(
+            "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+            [(key, level, now) for (key, _), level in zip(buckets, levels)],
+        )
+
+    def reserve(self, buckets: Buckets, now: float, max_wait: Optional[float], block: bool) -> Optional[float]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels = self._levels(conn, buckets, now)
+            wait = _wait_for(levels, buckets)
+            if (max_wait is not None and wait > max_wait) or (not block and wait > 0):
+                conn.execute("ROLLBACK")
+                return None if not block else wait
+            self._store(conn, buckets, [level - 1.0 for level in levels], now)
+            conn.execute("COMMIT")
+            return wait
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def drain(self, buckets: Buckets, now: float):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels = self._levels(conn, buckets, now)
+            self._store(conn, buckets, [min(level, 0.0) for level in levels], now)
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+
+def _refill(state: Optional[Tuple[float, float]], limit: RateLimit, now: float) -> float:
+    if state is None:
+        return limit.capacity
+    tokens, updated = state
+    return min(limit.capacity, tokens + max(now - updated, 0.0) * limit.rate)
+
+
+def _wait_for(levels: List[float], buckets: Buckets) -> float:
+    # Levels below one are debts from requests already admitted; wait them out
+    return max([(1.0 - level) / limit.rate for level, (_, limit) in zip(levels, buckets) if level < 1.0] or [0.0])
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limits on provider endpoints, shared across processes.
+
+    Limits are keyed by endpoint name or any dot-separated prefix of it, so
+    "retell" covers every Retell request, "livekit.SIPService" every LiveKit SIP
+    RPC and "twilio.create_recording" just that one. A request draws one token
+    from every matching bucket.
+
+    Admission is by reservation: the tokens are taken at once (a bucket may go
+    into debt) and the caller sleeps until its turn, so concurrent callers are
+    spaced out evenly instead of polling and retrying in bursts. With `path`,
+    the buckets live in a SQLite file and every process on the host using the
+    same file shares one budget; otherwise they are per process.
+
+    After a 429, `throttled()` empties the matching buckets so every process
+    backs off together.
+
+    The async methods (`acquire`, `atry_acquire`, `athrottled`) touch a shared
+    SQLite file from the default executor, so an event loop never waits on
+    another process's lock.
+    """
+
+    def __init__(self, limits: Dict[str, Union[RateLimit, float]], path: Optional[str] = None, max_wait: Optional[float] = 60.0):
+        self.limits: Dict[str, RateLimit] = {
+            key: limit if isinstance(limit, RateLimit) else RateLimit(float(limit))
+            for key, limit in limits.items()
+        }
+        for key, limit in self.limits.items():
+            if limit.rate <= 0:
+                raise ValueError(f"Rate limit for {key} must be positive")
+        self.path = path
+        self.max_wait = max_wait
+        self._backend = _SqliteBuckets(path) if path else _MemoryBuckets()
+        self._matches: Dict[str, Buckets] = {}
+
+    @classmethod
+    def from_env(cls) -> Optional["RateLimiter"]:
+        """
+        Build a limiter from RATE_LIMITS, e.g. `retell=20,twilio=80:100,livekit.SIPService=10`
+        (`key=rate[:burst]`, rate per second).
+
+        Buckets are stored at RATE_LIMIT_PATH, by default a file in the system
+        temp directory, so all processes on the host share them.
+        RATE_LIMIT_MAX_WAIT caps how long a request may wait (default 60s).
+
+        Returns:
+            The limiter, or None if RATE_LIMITS is not set.
+        """
+        spec = os.getenv("RATE_LIMITS")
+        if not spec:
+            return None
+        path = os.getenv("RATE_LIMIT_PATH") or os.path.join(tempfile.gettempdir(), "intellema_vdk_rate_limits.sqlite3")
+        max_wait = float(os.getenv("RATE_LIMIT_MAX_WAIT", "60"))
+        return cls(parse_limits(spec), path=path, max_wait=max_wait)
+
+    def buckets(self, endpoint: str) -> Buckets:
+        """The (key, limit) pairs that apply to `endpoint`."""
+        buckets = self._matches.get(endpoint)
+        if buckets is None:
+            parts = endpoint.split(".")
+            prefixes = [".".join(parts[:i]) for i in range(1, len(parts) + 1)]
+            buckets = [(key, self.limits[key]) for key in prefixes if key in self.limits]
+            self._matches[endpoint] = buckets
+        return buckets
+
+    def reserve(self, endpoint: str) -> float:
+        """
+        Take a token for `endpoint`.
+
+        Returns:
+            Seconds to wait before sending the request.
+
+        Raises:
+            RateLimitExceeded: The wait would exceed `max_wait`; no token was taken.
+        """
+        buckets = self.buckets(endpoint)
+        if not buckets:
+            return 0.0
+        wait = self._backend.reserve(buckets, time.time(), self.max_wait, block=True)
+        if self.max_wait is not None and wait > self.max_wait:
+            raise RateLimitExceeded(endpoint, wait)
+        return wait
+
+    def try_acquire(self, endpoint: str) -> bool:
+        """Take a token only if one is available now."""
+        buckets = self.buckets(endpoint)
+        return not buckets or self._backend.reserve(buckets, time.time(), self.max_wait, block=False) is not None
+
+    async def _offload(self, fn, endpoint: str):
+        if self.path is None:
+            return fn(endpoint)
+        return await asyncio.get_running_loop().run_in_executor(None, fn, endpoint)
+
+    async def acquire(self, endpoint: str):
+        """Wait for a token for `endpoint`."""
+        if not self.buckets(endpoint):
+            return
+        wait = await self._offload(self.reserve, endpoint)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def atry_acquire(self, endpoint: str) -> bool:
+        """`try_acquire` for use on an event loop."""
+        if not self.buckets(endpoint):
+            return True
+        return await self._offload(self.try_acquire, endpoint)
+
+    def acquire_sync(self, endpoint: str):
+        """Blocking counterpart of `acquire`."""
+        wait = self.reserve(endpoint)
+        if wait > 0:
+            time.sleep(wait)
+
+    def throttled(self, endpoint: str):
+        """Record that the provider answered 429: empty the matching buckets."""
+        buckets = self.buckets(endpoint)
+        if buckets:
+            self._backend.drain(buckets, time.time())
+
+    async def athrottled(self, endpoint: str):
+        """`throttled` for use on an event loop."""
+        if self.buckets(endpoint):
+            await self._offload(self.throttled, endpoint)
+
+
+def parse_limits(spec: str) -> Dict[str, RateLimit]:
+    """Parse RATE_LIMITS (`key=rate[:burst],...`)."""
+    limits = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        key, sep, value = entry.partition("=")
+        if not sep or not key.strip():
+            raise ValueError(f"Invalid rate limit entry: {entry!r}")
+        rate, _, burst = value.partition(":")
+        limits[key.strip()] = RateLimit(float(rate), float(burst) if burst else None)
+    return limits
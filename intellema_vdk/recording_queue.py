@@ -0,0 +1,381 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+TERMINAL_JOB_STATUSES = (JOB_COMPLETED, JOB_FAILED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recording_jobs (
+    job_id TEXT PRIMARY KEY,
+    call_id TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    bucket TEXT,
+    key TEXT,
+    local_path TEXT,
+    params TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    lease_until REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS recording_jobs_call_id ON recording_jobs (call_id);
+CREATE INDEX IF NOT EXISTS recording_jobs_status ON recording_jobs (status, next_attempt_at);
+"""
+
+_COLUMNS = ("job_id", "call_id", "provider", "source_id", "bucket", "key", "local_path", "params", "status", "attempts", "error", "created_at", "updated_at")
+
+
+@dataclass
+class RecordingJob:
+    """
+    A recording whose transfer is finished in the background.
+
+    `source_id` is the LiveKit egress ID or the Twilio recording SID; `bucket`
+    and `key` name the S3 object and `local_path` the local copy.
+    """
+    job_id: str
+    call_id: str
+    provider: str
+    source_id: str
+    bucket: Optional[str] = None
+    key: Optional[str] = None
+    local_path: Optional[str] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+    status: str = JOB_PENDING
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_JOB_STATUSES
+
+
+def _row_to_job(row: tuple) -> RecordingJob:
+    values = dict(zip(_COLUMNS, row))
+    values["params"] = json.loads(values["params"] or "{}")
+    return RecordingJob(**values)
+
+
+class RecordingJobStore:
+    """
+    SQLite table of recording jobs, safe to share between threads and processes.
+
+    A worker claims a job by taking a lease on it. A job whose lease runs out
+    (because its worker crashed or was restarted) can be claimed again, so
+    unfinished jobs are picked up by the next worker that starts.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def add(self, job: RecordingJob) -> RecordingJob:
+        now = time.time()
+        job.created_at = job.updated_at = now
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO recording_jobs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                (job.job_id, job.call_id, job.provider, job.source_id, job.bucket, job.key, job.local_path,
+                 json.dumps(job.params), job.status, job.attempts, job.error, job.created_at, job.updated_at),
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[RecordingJob]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM recording_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def for_call(self, call_id: str) -> List[RecordingJob]:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM recording_jobs WHERE call_id = ? ORDER BY created_at", (call_id,)).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def unfinished(self) -> List[RecordingJob]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM recording_jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JOB_PENDING, JOB_RUNNING),
+            ).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def claim(self, providers: Set[str], lease: float) -> Optional[RecordingJob]:
+        """Lease the oldest runnable job for one of `providers` (any if empty), or return None."""
+        now = time.time()
+        provider_filter = f"provider IN ({', '.join('?' * len(providers))}) AND " if providers else ""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM recording_jobs"
+                    f" WHERE {provider_filter}((status = ? AND next_attempt_at <= ?) OR (status = ? AND lease_until < ?))"
+                    " ORDER BY created_at LIMIT 1",
+                    (*providers, JOB_PENDING, now, JOB_RUNNING, now),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE recording_jobs SET status = ?, attempts = attempts + 1, lease_until = ?, updated_at = ? WHERE job_id = ?",
+                        (JOB_RUNNING, now + lease, now, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = _row_to_job(row)
+        job.status = JOB_RUNNING
+        job.attempts += 1
+        return job
+
+    def renew(self, job_id: str, lease: float):
+        with self._lock:
+            self._conn.execute("UPDATE recording_jobs SET lease_until = ? WHERE job_id = ? AND status = ?", (time.time() + lease, job_id, JOB_RUNNING))
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None, retry_at: float = 0.0):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE recording_jobs SET status = ?, error = ?, next_attempt_at = ?, lease_until = 0, updated_at = ? WHERE job_id = ?",
+                (status, error, retry_at, time.time(), job_id),
+            )
+
+
+class RecordingQueue:
+    """
+    Finishes recordings in the background from a durable SQLite job table.
+
+    `enqueue()` records a job and returns at once. Up to `concurrency` workers
+    claim jobs and run `handler(job)`, which waits for the recording and moves
+    it to S3 and/or disk; a plain function is run in a thread, a coroutine
+    function on the loop. Failed jobs are retried with jittered exponential
+    backoff up to `max_attempts` times. Jobs left unfinished by a crash or
+    restart are resumed once their lease (`lease` seconds, renewed while the
+    job runs) expires, by this or any other process using the same file.
+
+    Only jobs whose provider is in `providers` are claimed, so managers for
+    different providers can share one file.
+    """
+
+    def __init__(self, path: str, handler: Callable[[RecordingJob], Any], providers: Optional[Set[str]] = None, concurrency: int = 4, max_attempts: int = 5, lease: float = 60.0, poll_interval: float = 2.0):
+        self.store = RecordingJobStore(path)
+        self.handler = handler
+        self.providers = set(providers or ())
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers) or (self._thread is not None and self._thread.is_alive())
+
+    def enqueue(self, call_id: str, provider: str, source_id: str, bucket: Optional[str] = None, key: Optional[str] = None, local_path: Optional[str] = None, **params) -> RecordingJob:
+        """Store a new job and wake an idle worker. Safe to call from any thread."""
+        job = self.store.add(RecordingJob(
+            job_id=uuid.uuid4().hex,
+            call_id=call_id,
+            provider=provider,
+            source_id=source_id,
+            bucket=bucket,
+            key=key,
+            local_path=local_path,
+            params=params,
+        ))
+        self._notify()
+        return job
+
+    async def aenqueue(self, call_id: str, provider: str, source_id: str, bucket: Optional[str] = None, key: Optional[str] = None, local_path: Optional[str] = None, **params) -> RecordingJob:
+        """`enqueue` without blocking the event loop on the SQLite write."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, lambda: self.enqueue(call_id, provider, source_id, bucket=bucket, key=key, local_path=local_path, **params)
+        )
+
+    def get(self, job_id: str) -> Optional[RecordingJob]:
+        return self.store.get(job_id)
+
+    def status(self, call_id: str) -> List[RecordingJob]:
+        """Every job for `call_id`, oldest first."""
+        return self.store.for_call(call_id)
+
+    async def wait(self, job_id: str, interval: float = 1.0) -> RecordingJob:
+        """Wait until `job_id` has completed or failed for good."""
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await loop.run_in_executor(None, self.store.get, job_id)
+            if job is None:
+                raise ValueError(f"Unknown recording job: {job_id}")
+            if job.done:
+                return job
+            await asyncio.sleep(interval)
+
+    def start(self):
+        """Start the workers on the running event loop. Safe to call repeatedly."""
+        if self._workers:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.concurrency)]
+
+    def start_thread(self):
+        """Start the workers on a daemon thread with its own event loop, for synchronous callers."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        started = threading.Event()
+
+        async def run():
+            self.start()
+            started.set()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+
+        self._thread = threading.Thread(target=lambda: asyncio.run(run()), name="recording-queue", daemon=True)
+        self._thread.start()
+        started.wait()
+
+    async def close(self):
+        """Stop the workers. Jobs in progress are resumed by the next worker to start."""
+        if self._thread is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.stop)
+            return
+        self._stopping = True
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._loop = None
+
+    def stop(self):
+        """Stop workers started with `start_thread()` and wait for the thread to exit."""
+        thread, loop = self._thread, self._loop
+        if thread is None:
+            return
+        self._stopping = True
+        workers, self._workers = self._workers, []
+        if loop is not None and not loop.is_closed():
+            for task in workers:
+                loop.call_soon_threadsafe(task.cancel)
+        thread.join()
+        self._thread = None
+        self._loop = None
+
+    def _notify(self):
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            wakeup.set()
+        else:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        # The flag backs up cancellation, which wait_for can swallow before Python 3.12
+        while not self._stopping:
+            job = await loop.run_in_executor(None, self.store.claim, self.providers, self.lease)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job: RecordingJob):
+        loop = asyncio.get_running_loop()
+        if asyncio.iscoroutinefunction(self.handler):
+            work = asyncio.ensure_future(self.handler(job))
+        else:
+            work = loop.run_in_executor(None, self.handler, job)
+        heartbeat = asyncio.ensure_future(self._heartbeat(job, work))
+        try:
+            await work
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.cancelled() and heartbeat.result():
+                # The lease was lost and the job aborted; another worker may own it now
+                return
+            # Leave the job leased; it is resumed when the lease runs out
+            raise
+        except Exception as e:
+            if job.attempts >= self.max_attempts:
+                print(f"Recording job {job.job_id} for {job.call_id} failed: {e}")
+                await self._finish(job.job_id, JOB_FAILED, error=str(e))
+            else:
+                delay = random.uniform(0, min(300.0, 5.0 * 2 ** job.attempts))
+                print(f"Recording job {job.job_id} for {job.call_id} failed (attempt {job.attempts}), retrying in {delay:.0f}s: {e}")
+                await self._finish(job.job_id, JOB_PENDING, error=str(e), retry_at=time.time() + delay)
+        else:
+            await self._finish(job.job_id, JOB_COMPLETED)
+        finally:
+            heartbeat.cancel()
+            if not work.done():
+                work.cancel()
+
+    async def _finish(self, job_id: str, status: str, error: Optional[str] = None, retry_at: float = 0.0):
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, lambda: self.store.finish(job_id, status, error=error, retry_at=retry_at))
+        except Exception as e:
+            # The lease runs out and the job is run again, so nothing is lost
+            print(f"Could not record the outcome of recording job {job_id}: {e}")
+
+    async def _heartbeat(self, job: RecordingJob, work: asyncio.Future) -> bool:
+        """
+        Renew the job's lease while it runs. Failed renewals are retried; if the
+        lease would run out before one succeeds, the job is aborted so it is not
+        run twice (a handler running in a thread cannot be interrupted, but its
+        outcome is no longer recorded). Returns True if it aborted the job.
+        """
+        loop = asyncio.get_running_loop()
+        renewed_at = time.monotonic()
+        delay = self.lease / 3
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await loop.run_in_executor(None, self.store.renew, job.job_id, self.lease)
+                renewed_at = time.monotonic()
+                delay = self.lease / 3
+            except Exception as e:
+                remaining = renewed_at + self.lease - time.monotonic()
+                # Leave a margin for the abort to land before another worker claims the job
+                if remaining <= self.lease / 6:
+                    print(f"Recording job {job.job_id} for {job.call_id} lost its lease ({e}); aborting")
+                    work.cancel()
+                    return True
+                delay = min(self.lease / 12, max(remaining - self.lease / 6, 0.1))
+                print(f"Could not renew the lease of recording job {job.job_id}, retrying in {delay:.1f}s: {e}")
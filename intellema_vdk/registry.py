@@ -0,0 +1,130 @@
+import asyncio
+import inspect
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+def _create_client(provider: str, **kwargs) -> Any:
+    # Provider modules are imported here, on first use, to keep package import cheap.
+    if provider == "livekit":
+        from .livekit_lib.client import LiveKitManager
+        return LiveKitManager(**kwargs)
+    elif provider == "retell":
+        from .retell_lib.retell_client import RetellManager
+        return RetellManager(**kwargs)
+    elif provider == "retell_async":
+        from .retell_lib.async_retell_client import AsyncRetellManager
+        return AsyncRetellManager(**kwargs)
+    else:
+        raise ValueError(f"Unknown provider: {provider}. Supported providers: 'livekit', 'retell', 'retell_async'")
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class ClientRegistry:
+    """
+    Keeps one manager per (provider, constructor kwargs, event loop) and hands
+    the same instance to every caller, so HTTP sessions and keep-alive
+    connections are reused instead of rebuilt per call. The registry may be
+    shared by threads running their own loops.
+
+    Managers from a registry are shared: close them with `aclose_all()` (or by
+    leaving `async with registry:`), never with the manager's own `close()`.
+    Managers whose loop has been closed are dropped and closed on the next `get`.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Tuple, Any] = {}
+        self._lock = threading.Lock()
+        # Close tasks of dropped managers, kept referenced until they finish
+        self._closing: Set[asyncio.Task] = set()
+
+    def get(self, provider: str, **kwargs) -> Any:
+        loop = _running_loop()
+        key = (provider, tuple(sorted(kwargs.items())), id(loop))
+        with self._lock:
+            stale = self._pop_stale()
+            entry = self._clients.get(key)
+            # The entry holds its loop, so a live entry's id() cannot be reused
+            if entry is not None:
+                client = entry[0]
+            else:
+                client = _create_client(provider, **kwargs)
+                self._clients[key] = (client, loop)
+        for old in stale:
+            self._close_stale(old)
+        return client
+
+    def _pop_stale(self) -> List[Any]:
+        keys = [key for key, (_, loop) in self._clients.items() if loop is not None and loop.is_closed()]
+        return [self._clients.pop(key)[0] for key in keys]
+
+    def _close_stale(self, client: Any):
+        # Best effort: the manager's sessions belong to a loop that no longer runs
+        close = getattr(client, "close", None)
+        if close is None:
+            return
+        try:
+            result = close()
+        except Exception as e:
+            print(f"Error closing {type(client).__name__}: {e}")
+            return
+        if not inspect.isawaitable(result):
+            return
+        loop = _running_loop()
+        if loop is None:
+            asyncio.run(self._await_close(client, result))
+            return
+        task = loop.create_task(self._await_close(client, result))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _await_close(client: Any, result: Any):
+        try:
+            await result
+        except Exception as e:
+            print(f"Error closing {type(client).__name__}: {e}")
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def aclose_all(self):
+        """Close every registered manager and forget it."""
+        with self._lock:
+            clients = [client for client, _ in self._clients.values()]
+            self._clients.clear()
+        for client in clients:
+            close = getattr(client, "close", None)
+            if close is None:
+                continue
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"Error closing {type(client).__name__}: {e}")
+
+    async def __aenter__(self) -> "ClientRegistry":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose_all()
+
+
+default_registry = ClientRegistry()
+
+
+def get_client(provider: str, **kwargs) -> Any:
+    """Return the process-wide shared manager for `provider`."""
+    return default_registry.get(provider, **kwargs)
+
+
+async def aclose_all():
+    """Close every manager held by the process-wide registry."""
+    await default_registry.aclose_all()
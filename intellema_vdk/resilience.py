@@ -0,0 +1,334 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from .instrumentation import sip_status_code
+from .rate_limit import RateLimiter
+
+T = TypeVar("T")
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+# Exception class names (anywhere in the MRO) that mean the network, not the
+# request, failed. Matched by name so no provider SDK has to be imported here.
+_TRANSIENT_ERROR_NAMES = frozenset({
+    "ConnectionError",
+    "TimeoutError",
+    "ClientConnectionError",
+    "ClientPayloadError",
+    "ServerTimeoutError",
+    "TransportError",
+    "TimeoutException",
+    "APIConnectionError",
+    "APITimeoutError",
+    "Timeout",
+})
+
+# Errors raised before the request reached the server, so resending it cannot
+# duplicate a side effect.
+_NOT_SENT_ERROR_NAMES = frozenset({
+    "ConnectionRefusedError",
+    "ClientConnectorError",
+    "ConnectError",
+    "ConnectTimeout",
+    "NewConnectionError",
+})
+
+# HTTP statuses with which a server rejects a request without acting on it.
+_REJECTED_STATUSES = (429, 503)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(f"Circuit open for {endpoint}; retry in {retry_after:.1f}s")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+def _status_of(error: BaseException) -> Optional[int]:
+    for attr in ("status_code", "status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def _chain(error: Optional[BaseException]):
+    seen = 0
+    while error is not None and seen < 10:
+        yield error
+        error = error.__cause__ or error.__context__
+        seen += 1
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    True for failures worth retrying: network errors, timeouts, HTTP 408, 429
+    and 5xx. SIP answers (busy, declined, ...) are final and never transient.
+    """
+    if isinstance(error, CircuitOpenError) or sip_status_code(error):
+        return False
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    if any(cls.__name__ in _TRANSIENT_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    status = _status_of(error)
+    return status is not None and (status >= 500 or status in (408, 429))
+
+
+def is_safe_to_resend(error: BaseException) -> bool:
+    """
+    True if `error` proves the server did not act on the request, so even a
+    non-idempotent call (placing a phone call, dispatching an agent) can be
+    sent again: connection refused/failed, or an explicit 429/503 rejection.
+    """
+    if sip_status_code(error):
+        return False
+    for link in _chain(error):
+        if isinstance(link, ConnectionRefusedError):
+            return True
+        if any(cls.__name__ in _NOT_SENT_ERROR_NAMES for cls in type(link).__mro__):
+            return True
+    return _status_of(error) in _REJECTED_STATUSES
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter: attempt n sleeps uniform(0, min(max_delay, base_delay * multiplier**n))."""
+    max_attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 2.0
+    multiplier: float = 2.0
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Fails fast once at least `failure_rate` of the calls to an endpoint in the
+    last `window` seconds failed transiently, counting only once `min_requests`
+    calls were made in that window.
+
+    After `reset_timeout` seconds one probe call is let through (half-open);
+    its success closes the circuit again, its failure re-opens it. Thread-safe,
+    so it can be shared by the thread-pool users of RetellManager.
+    """
+
+    def __init__(self, endpoint: str, failure_rate: float = 0.5, min_requests: int = 10, window: float = 30.0, reset_timeout: float = 30.0):
+        self.endpoint = endpoint
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self.state = CIRCUIT_CLOSED
+        # (time, failed) of each call outcome within the window, oldest first
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == CIRCUIT_CLOSED:
+                return
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if self.state == CIRCUIT_OPEN and remaining <= 0:
+                self.state = CIRCUIT_HALF_OPEN
+            if self.state == CIRCUIT_HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(self.endpoint, max(remaining, 0.0))
+
+    def record_success(self):
+        with self._lock:
+            if self.state == CIRCUIT_HALF_OPEN:
+                self.state = CIRCUIT_CLOSED
+                self._reset()
+            elif self.state == CIRCUIT_CLOSED:
+                self._add(False)
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == CIRCUIT_HALF_OPEN:
+                self._open()
+            elif self.state == CIRCUIT_CLOSED:
+                self._add(True)
+                count = len(self._outcomes)
+                if count >= self.min_requests and self._failures >= self.failure_rate * count:
+                    self._open()
+            # Calls that started before the circuit opened do not extend it
+
+    def release(self):
+        """Forget an in-flight probe whose outcome is unknown (e.g. it was cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    def _add(self, failed: bool):
+        now = time.monotonic()
+        self._outcomes.append((now, failed))
+        self._failures += failed
+        while self._outcomes and self._outcomes[0][0] <= now - self.window:
+            self._failures -= self._outcomes.popleft()[1]
+
+    def _open(self):
+        self.state = CIRCUIT_OPEN
+        self._opened_at = time.monotonic()
+        self._reset()
+
+    def _reset(self):
+        self._outcomes.clear()
+        self._failures = 0
+        self._probing = False
+
+
+class Resilience:
+    """
+    Retry, circuit-breaking and hedging policy applied to every provider RPC.
+
+    Each endpoint (e.g. "room.create_room") has its own CircuitBreaker, which
+    sees each call once, with its outcome after any retries. Idempotent calls are retried on any transient error; other calls only when
+    the error proves the request was never acted on (see is_safe_to_resend).
+    With `hedge_after` set, hedged idempotent reads send a second copy of the
+    request if the first has not answered within that many seconds and use
+    whichever answers first.
+
+    With a `rate_limiter` (RATE_LIMITS if not given), every attempt, retry and
+    hedged copy first takes a token for its endpoint; a hedge is only sent if
+    one is available at once. A 429 answer drains the endpoint's buckets.
+    """
+
+    def __init__(self, policy: Optional[RetryPolicy] = None, failure_rate: float = 0.5, min_requests: int = 10, window: float = 30.0, reset_timeout: float = 30.0, hedge_after: Optional[float] = None, rate_limiter: Optional[RateLimiter] = None):
+        self.policy = policy or RetryPolicy()
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self.hedge_after = hedge_after
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter.from_env()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(endpoint)
+                if breaker is None:
+                    breaker = CircuitBreaker(endpoint, self.failure_rate, self.min_requests, self.window, self.reset_timeout)
+                    self._breakers[endpoint] = breaker
+        return breaker
+
+    def _should_retry(self, error: BaseException, idempotent: bool, attempt: int) -> bool:
+        if attempt >= self.policy.max_attempts:
+            return False
+        return is_transient(error) if idempotent else is_safe_to_resend(error)
+
+    def _record(self, breaker: CircuitBreaker, error: BaseException):
+        # Only transient failures say anything about endpoint health; a 404 or a
+        # busy callee means the endpoint answered.
+        if is_transient(error):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    def _throttled(self, error: BaseException) -> bool:
+        return self.rate_limiter is not None and _status_of(error) == 429
+
+    async def call(self, endpoint: str, fn: Callable[[], Awaitable[T]], idempotent: bool = False, hedge: bool = False) -> T:
+        """
+        Await `fn()` under the endpoint's breaker, retrying per the policy.
+
+        Args:
+            endpoint: Name of the remote operation; one breaker per name.
+            fn: Zero-argument callable returning a fresh awaitable per attempt.
+            idempotent: Whether the call may be repeated after any transient error.
+            hedge: Send a hedged second request (idempotent reads only, needs `hedge_after`).
+        """
+        breaker = self.breaker(endpoint)
+        breaker.before_call()
+        recorded = False
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire(endpoint)
+                try:
+                    if hedge and idempotent and self.hedge_after is not None:
+                        result = await self._hedged(endpoint, fn)
+                    else:
+                        result = await fn()
+                except Exception as e:
+                    if self._throttled(e):
+                        await self.rate_limiter.athrottled(endpoint)
+                    if not self._should_retry(e, idempotent, attempt):
+                        recorded = True
+                        self._record(breaker, e)
+                        raise
+                    await asyncio.sleep(self.policy.delay(attempt))
+                    continue
+                recorded = True
+                breaker.record_success()
+                return result
+        finally:
+            # Cancelled, or stopped by RateLimitExceeded: says nothing about endpoint health
+            if not recorded:
+                breaker.release()
+
+    def call_sync(self, endpoint: str, fn: Callable[[], T], idempotent: bool = False) -> T:
+        """Blocking counterpart of `call` for RetellManager. Hedging is not supported."""
+        breaker = self.breaker(endpoint)
+        breaker.before_call()
+        recorded = False
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire_sync(endpoint)
+                try:
+                    result = fn()
+                except Exception as e:
+                    if self._throttled(e):
+                        self.rate_limiter.throttled(endpoint)
+                    if not self._should_retry(e, idempotent, attempt):
+                        recorded = True
+                        self._record(breaker, e)
+                        raise
+                    time.sleep(self.policy.delay(attempt))
+                    continue
+                recorded = True
+                breaker.record_success()
+                return result
+        finally:
+            # Interrupted, or stopped by RateLimitExceeded: says nothing about endpoint health
+            if not recorded:
+                breaker.release()
+
+    async def _hedged(self, endpoint: str, fn: Callable[[], Awaitable[T]]) -> T:
+        tasks = {asyncio.ensure_future(fn())}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if not done and (self.rate_limiter is None or await self.rate_limiter.atry_acquire(endpoint)):
+                tasks.add(asyncio.ensure_future(fn()))
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
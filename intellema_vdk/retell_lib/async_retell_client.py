@@ -0,0 +1,391 @@
+import os
+import uuid
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+import httpx
+from retell import AsyncRetell
+from twilio.rest import Client
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+
+from ..config import load_env
+from ..events import EventBus, RetellCallEvent, TwilioStatusEvent
+from ..instrumentation import Instrumentation, default_instrumentation, instrumented
+from ..recording_queue import RecordingJob, RecordingQueue
+from ..resilience import Resilience
+from ..suppression import SuppressionList
+from ..s3_transfer import DEFAULT_BUFFER_SIZE, get_s3_client, stream_to_s3_async
+from .call_tracker import AsyncCallTracker, EndCallResult
+from .retell_client import (
+    ACTIVE_CALL_STATUSES,
+    FORCE_END_UPDATE,
+    DOWNLOAD_CHUNK_SIZE,
+    _aws_settings,
+    _build_call_kwargs,
+    _build_import_kwargs,
+    _new_stream_urls,
+    _print_call_created,
+    _print_import_error,
+    _print_import_result,
+)
+
+T = TypeVar("T")
+
+
+class AsyncRetellManager:
+    """
+    asyncio counterpart of RetellManager with the same method names as LiveKitManager.
+
+    Retell requests go through AsyncRetell and Twilio requests through
+    AsyncTwilioHttpClient, so nothing blocks the event loop. Both keep their
+    connections alive in a pool; call `close()` when the manager is no longer needed.
+    """
+
+    provider_name = "retell"
+
+    def __init__(self, max_connections: int = 200, instrumentation: Optional[Instrumentation] = None, resilience: Optional[Resilience] = None, suppression: Optional[SuppressionList] = None):
+        load_env()
+        self.instrumentation = instrumentation or default_instrumentation
+        self.resilience = resilience or Resilience()
+        self.suppression = suppression if suppression is not None else SuppressionList.from_env()
+        self.twilio_account_sid = os.getenv("TWILIO_ACCOUNT_SID")
+        self.twilio_auth_token = os.getenv("TWILIO_AUTH_TOKEN")
+        self.twilio_number = os.getenv("TWILIO_PHONE_NUMBER")
+        self.retell_api_key = os.getenv("RETELL_API_KEY")
+        self.retell_agent_id = os.getenv("RETELL_AGENT_ID")
+
+        if not all([self.twilio_account_sid, self.twilio_auth_token, self.twilio_number, self.retell_api_key, self.retell_agent_id]):
+            raise ValueError("Missing necessary environment variables for AsyncRetellManager")
+
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        )
+        self.twilio_http_client = AsyncTwilioHttpClient(pool_connections=True)
+        self.twilio_client = Client(self.twilio_account_sid, self.twilio_auth_token, http_client=self.twilio_http_client)
+        # Overridable so requests can be routed through a proxy or a local stand-in server
+        self.twilio_api_base_url = os.getenv("TWILIO_API_BASE_URL", "https://api.twilio.com").rstrip("/")
+        self.twilio_client.api.base_url = self.twilio_api_base_url
+        # Retries are handled by self.resilience, so the SDK's own are turned off.
+        self.retell_client = AsyncRetell(api_key=self.retell_api_key, http_client=self.http_client, max_retries=0)
+        self.call_tracker = AsyncCallTracker(self)
+        self._recording_queue: Optional[RecordingQueue] = None
+        # Set by Twilio recording status callbacks so waits end without the next poll
+        self._recording_waiters: Dict[str, asyncio.Event] = {}
+        # Media Stream SIDs by call SID, then by URL
+        self._streams: Dict[str, Dict[str, str]] = {}
+        self._events_subscribed = False
+        self.recording_status_callback: Optional[str] = None
+
+    async def close(self):
+        if self._recording_queue is not None:
+            await self._recording_queue.close()
+        await self.retell_client.close()
+        await self.twilio_http_client.close()
+
+    def subscribe_events(self, bus: EventBus, recording_status_callback: Optional[str] = None) -> Callable[[], None]:
+        """
+        Follow Retell call events and Twilio status callbacks published on `bus`
+        (see WebhookServer).
+
+        Retell events update `call_tracker`, so `delete_room` uses the known call
+        status instead of fetching it. Twilio recording callbacks end
+        `start_recording` waits immediately; polling continues as a fallback.
+
+        Args:
+            bus: The EventBus the webhook server publishes to.
+            recording_status_callback: Public URL of the Twilio webhook route, passed
+                                       to Twilio when a recording is created. Defaults
+                                       to TWILIO_STATUS_CALLBACK_URL.
+
+        Returns:
+            A function that unsubscribes.
+        """
+        self.recording_status_callback = recording_status_callback or os.getenv("TWILIO_STATUS_CALLBACK_URL")
+        unsubscribers = [
+            bus.subscribe(RetellCallEvent, self._on_retell_event),
+            bus.subscribe(TwilioStatusEvent, self._on_twilio_event),
+        ]
+        self._events_subscribed = True
+
+        def unsubscribe():
+            for unsubscribe_one in unsubscribers:
+                unsubscribe_one()
+            self._events_subscribed = False
+
+        return unsubscribe
+
+    def _on_retell_event(self, event: RetellCallEvent):
+        self.call_tracker.update(event.call)
+
+    def _on_twilio_event(self, event: TwilioStatusEvent):
+        waiter = self._recording_waiters.get(event.recording_sid) if event.recording_sid else None
+        if waiter is not None:
+            waiter.set()
+
+    @property
+    def recording_queue(self) -> RecordingQueue:
+        """Durable queue that finishes `start_recording(background=True)` jobs. See LiveKitManager.recording_queue."""
+        if self._recording_queue is None:
+            self._recording_queue = RecordingQueue(
+                os.getenv("RECORDING_QUEUE_PATH", os.path.join("recordings", "jobs.sqlite3")),
+                self._run_recording_job,
+                providers={self.provider_name},
+                concurrency=int(os.getenv("RECORDING_QUEUE_CONCURRENCY", "4")),
+            )
+        return self._recording_queue
+
+    async def _call(self, endpoint: str, method: Callable[..., Awaitable[T]], *args, idempotent: bool = False, hedge: bool = False, **kwargs) -> T:
+        """Await `method(*args, **kwargs)` through the retry / circuit-breaker policy in `self.resilience`."""
+        return await self.resilience.call(endpoint, lambda: method(*args, **kwargs), idempotent=idempotent, hedge=hedge)
+
+    @instrumented
+    async def import_phone_number(self, termination_uri: str = None, outbound_agent_id: str = None, inbound_agent_id: str = None, nickname: str = None, sip_trunk_auth_username: str = None, sip_trunk_auth_password: str = None, phone_number: str = None):
+        """
+        Import/register your Twilio phone number with Retell.
+        See RetellManager.import_phone_number for the meaning of each argument.
+        """
+        phone_number = phone_number or self.twilio_number
+        import_kwargs = _build_import_kwargs(
+            phone_number,
+            termination_uri=termination_uri,
+            outbound_agent_id=outbound_agent_id or self.retell_agent_id,
+            inbound_agent_id=inbound_agent_id,
+            nickname=nickname,
+            sip_trunk_auth_username=sip_trunk_auth_username,
+            sip_trunk_auth_password=sip_trunk_auth_password,
+        )
+
+        try:
+            response = await self._call("retell.import_phone_number", self.retell_client.phone_number.import_, **import_kwargs)
+            _print_import_result(phone_number, response)
+            return response
+        except Exception as e:
+            _print_import_error(e)
+            raise
+
+    @instrumented
+    async def start_outbound_call(self, phone_number: str, prompt_content: str = None, call_id: str = None) -> str:
+        if self.suppression is not None:
+            self.suppression.check(phone_number)
+        call_kwargs = _build_call_kwargs(self.twilio_number, self.retell_agent_id, phone_number, prompt_content, call_id)
+        with self.instrumentation.phase(self.provider_name, "start_outbound_call", "create_phone_call", call_id):
+            call_response = await self._call("retell.create_phone_call", self.retell_client.call.create_phone_call, **call_kwargs)
+        _print_call_created(call_response)
+        self.call_tracker.track(call_response.call_id, call_response.call_status, call_response)
+        return call_response.call_id
+
+    def _known_call_status(self, call_id: str) -> Optional[str]:
+        # Trusted only while Retell events keep the tracker current
+        if not self._events_subscribed:
+            return None
+        tracked = self.call_tracker.get(call_id)
+        return tracked.call_status if tracked is not None else None
+
+    @instrumented
+    async def delete_room(self, call_id: str):
+        try:
+            call_status = self._known_call_status(call_id)
+            if call_status is None:
+                with self.instrumentation.phase(self.provider_name, "delete_room", "retrieve_call", call_id):
+                    call_data = await self._call("retell.get_call", self.retell_client.call.retrieve, call_id, idempotent=True, hedge=True)
+                self.call_tracker.update(call_data)
+                call_status = call_data.call_status
+            print(f"Current call status: {call_status}")
+
+            if call_status in ACTIVE_CALL_STATUSES:
+                print(f"Triggering end for Retell call {call_id}...")
+
+                with self.instrumentation.phase(self.provider_name, "delete_room", "update_call", call_id):
+                    await self._call(
+                        "retell.update_call",
+                        self.retell_client.call.update,
+                        call_id,
+                        idempotent=True,
+                        **FORCE_END_UPDATE
+                    )
+
+                print("✓ force_end override sent to Retell API")
+            else:
+                print(f"Call already ended: {call_status}")
+
+        except Exception as e:
+            print(f"Error ending call {call_id}: {e}")
+            raise
+
+    @instrumented
+    async def end_calls(self, call_ids: Optional[List[str]] = None, refresh: bool = True) -> List[EndCallResult]:
+        """
+        End many calls at once. Their status is read with batched list-calls
+        requests and force_end is sent concurrently, only to calls still active.
+        See CallTracker.end_calls.
+        """
+        return await self.call_tracker.end_calls(call_ids, refresh=refresh)
+
+    @instrumented
+    async def start_stream(self, call_id: str, rtmp_urls: List[str]) -> Dict[str, str]:
+        """
+        Starts a Twilio Media Stream to each URL, concurrently.
+        Note: Twilio streams are WebSocket-based, so the URLs must be WSS URLs.
+
+        Twilio forks the call audio to every stream without re-encoding. URLs
+        already streaming are skipped; a call takes at most MAX_STREAMS_PER_CALL.
+
+        Returns:
+            The Stream SID of every URL attached to the call.
+        """
+        attached = self._streams.setdefault(call_id, {})
+        new_urls = _new_stream_urls(attached, rtmp_urls)
+        streams = await asyncio.gather(*(
+            self._call("twilio.create_stream", self.twilio_client.calls(call_id).streams.create_async, url=url)
+            for url in new_urls
+        ), return_exceptions=True)
+        errors = []
+        for url, stream in zip(new_urls, streams):
+            if isinstance(stream, BaseException):
+                errors.append(stream)
+            else:
+                attached[url] = stream.sid
+        if errors:
+            raise errors[0]
+        return dict(attached)
+
+    @instrumented
+    async def stop_stream(self, call_id: str, rtmp_urls: Optional[List[str]] = None):
+        """Stops the Media Streams to `rtmp_urls` (default: all of the call's streams)."""
+        attached = self._streams.get(call_id, {})
+        sids = [attached.pop(url) for url in (list(attached) if rtmp_urls is None else rtmp_urls) if url in attached]
+        if not attached:
+            self._streams.pop(call_id, None)
+        await asyncio.gather(*(
+            self._call("twilio.update_stream", self.twilio_client.calls(call_id).streams(sid).update_async, status="stopped", idempotent=True)
+            for sid in sids
+        ))
+
+    @instrumented
+    async def start_recording(self, call_id: str, output_filepath: Optional[str] = None, upload_to_s3: bool = True, wait_for_completion: bool = True, buffer_size: int = DEFAULT_BUFFER_SIZE, background: bool = False):
+        """
+        Triggers a recording on the active Twilio call.
+
+        Args:
+            call_id: The Twilio Call SID.
+            output_filepath: Optional filename for the recording.
+            upload_to_s3: If True, uploads to S3.
+            wait_for_completion: If True, waits for recording to finish and then uploads.
+            buffer_size: Bytes gathered in memory before each S3 part upload and local write.
+            background: If True (with upload_to_s3), return as soon as the recording has
+                        started. Waiting and uploading are done by `recording_queue`,
+                        which survives restarts; see `get_recording_status`.
+
+        Returns:
+            The Twilio Recording SID, or the queued RecordingJob in background mode.
+        """
+        with self.instrumentation.phase(self.provider_name, "start_recording", "create_recording", call_id):
+            recording = await self._call("twilio.create_recording", self.twilio_client.calls(call_id).recordings.create_async, **self._recording_kwargs())
+        print(f"Recording started: {recording.sid}")
+
+        if background and upload_to_s3:
+            _, _, bucket, _ = _aws_settings()
+            filename = output_filepath if output_filepath else f"{call_id}-{uuid.uuid4().hex[:6]}.mp3"
+            self.recording_queue.start()
+            job = await self.recording_queue.aenqueue(call_id, self.provider_name, recording.sid, bucket=bucket, key=filename, local_path=os.path.join("recordings", filename), buffer_size=buffer_size)
+            print(f"Recording job {job.job_id} queued for recording {recording.sid}")
+            return job
+
+        if not wait_for_completion:
+            return recording.sid
+
+        await self._wait_for_recording(call_id, recording.sid)
+
+        if not upload_to_s3:
+            return recording.sid
+
+        filename = output_filepath if output_filepath else f"{call_id}-{uuid.uuid4().hex[:6]}.mp3"
+        await self._transfer_recording(call_id, recording.sid, filename, os.path.join("recordings", filename), buffer_size)
+
+        return recording.sid
+
+    async def _wait_for_recording(self, call_id: str, recording_sid: str):
+        print("Waiting for recording to complete...")
+        waiter = self._recording_waiters.setdefault(recording_sid, asyncio.Event())
+        try:
+            with self.instrumentation.phase(self.provider_name, "start_recording", "wait_recording", call_id):
+                while True:
+                    waiter.clear()
+                    rec_status = await self._call("twilio.fetch_recording", self.twilio_client.recordings(recording_sid).fetch_async, idempotent=True)
+                    if rec_status.status == 'completed':
+                        print("Recording completed.")
+                        break
+                    elif rec_status.status in ['failed', 'absent']:
+                        raise RuntimeError(f"Recording failed with status: {rec_status.status}")
+                    try:
+                        await asyncio.wait_for(waiter.wait(), timeout=5)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self._recording_waiters.pop(recording_sid, None)
+
+    def _recording_kwargs(self) -> dict:
+        if not self.recording_status_callback:
+            return {}
+        return {"recording_status_callback": self.recording_status_callback, "recording_status_callback_event": ["completed", "absent"]}
+
+    async def _transfer_recording(self, call_id: str, recording_sid: str, filename: str, local_path: str, buffer_size: int = DEFAULT_BUFFER_SIZE, bucket: Optional[str] = None):
+        media_url = f"{self.twilio_api_base_url}/2010-04-01/Accounts/{self.twilio_account_sid}/Recordings/{recording_sid}.mp3"
+        print(f"Downloading recording from: {media_url}")
+
+        access_key, secret_key, default_bucket, region = _aws_settings()
+        bucket = bucket or default_bucket
+        s3 = get_s3_client(access_key, secret_key, region)
+        rate_limiter = self.resilience.rate_limiter
+
+        with self.instrumentation.phase(self.provider_name, "start_recording", "transfer", call_id):
+            if rate_limiter is not None:
+                await rate_limiter.acquire("twilio.download_recording")
+            async with self.http_client.stream("GET", media_url, auth=(self.twilio_account_sid, self.twilio_auth_token), follow_redirects=True) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    if rate_limiter is not None and response.status_code == 429:
+                        await rate_limiter.athrottled("twilio.download_recording")
+                    raise RuntimeError(f"Failed to download recording: {response.status_code} {response.text}")
+
+                print(f"Uploading to S3: s3://{bucket}/{filename}")
+                size = await stream_to_s3_async(response.aiter_bytes(DOWNLOAD_CHUNK_SIZE), s3, bucket, filename, local_path=local_path, buffer_size=buffer_size, rate_limiter=rate_limiter)
+
+        print(f"Upload complete: s3://{bucket}/{filename} ({size} bytes)")
+        print(f"Recording saved locally: {local_path}")
+
+    async def _run_recording_job(self, job: RecordingJob):
+        await self._wait_for_recording(job.call_id, job.source_id)
+        await self._transfer_recording(job.call_id, job.source_id, job.key, job.local_path, job.params.get("buffer_size", DEFAULT_BUFFER_SIZE), bucket=job.bucket)
+
+    def resume_recordings(self) -> List[RecordingJob]:
+        """Start the recording queue so unfinished jobs from a previous run are completed. See LiveKitManager.resume_recordings."""
+        self.recording_queue.start()
+        return [job for job in self.recording_queue.store.unfinished() if job.provider == self.provider_name]
+
+    def get_recording_status(self, call_id: str) -> List[RecordingJob]:
+        """Background recording jobs for `call_id`, oldest first, with their current status."""
+        return self.recording_queue.status(call_id)
+
+    @instrumented
+    async def mute_participant(self, call_id: str, identity: str, track_sid: str, muted: bool):
+        """
+        Mutes the participant on the Twilio call.
+        This prevents audio from reaching the Retell AI.
+        """
+        await self._call("twilio.update_call", self.twilio_client.calls(call_id).update_async, muted=muted, idempotent=True)
+
+    @instrumented
+    async def kick_participant(self, call_id: str, identity: str):
+        """
+        Alias for delete_room (hangup).
+        """
+        await self.delete_room(call_id)
+
+    @instrumented
+    async def send_alert(self, call_id: str, message: str, participant_identity: Optional[str] = None):
+        """
+        Not fully supported in this hybrid model
+        """
+        raise NotImplementedError("send_alert is not currently supported in AsyncRetellManager")
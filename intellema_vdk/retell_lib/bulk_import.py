@@ -0,0 +1,296 @@
+import asyncio
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from ..suppression import normalize_e164
+from .retell_client import _build_import_kwargs
+
+IMPORT_IMPORTED = "imported"
+IMPORT_SKIPPED = "skipped"
+IMPORT_FAILED = "failed"
+
+# A number with one of these as its last logged status is not imported again
+COMPLETED_IMPORT_STATUSES = (IMPORT_IMPORTED, IMPORT_SKIPPED)
+
+# Retell's largest list-phone-numbers page
+LIST_PAGE_SIZE = 1000
+
+
+@dataclass
+class ImportRecord:
+    """One number to import, with the optional settings of `import_phone_number`."""
+    phone_number: str
+    termination_uri: Optional[str] = None
+    outbound_agent_id: Optional[str] = None
+    inbound_agent_id: Optional[str] = None
+    nickname: Optional[str] = None
+    sip_trunk_auth_username: Optional[str] = None
+    sip_trunk_auth_password: Optional[str] = None
+
+
+_RECORD_FIELDS = tuple(f.name for f in fields(ImportRecord))
+
+
+@dataclass
+class ImportResult:
+    """Outcome of one number in a bulk import; `skipped` means it was already registered."""
+    phone_number: str
+    status: str
+    error: Optional[str] = None
+    at: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status in COMPLETED_IMPORT_STATUSES
+
+
+def _record(values: Dict[str, Any], where: str, default_country_code: str) -> ImportRecord:
+    unknown = set(values) - set(_RECORD_FIELDS)
+    if unknown:
+        raise ValueError(f"{where}: unknown columns {sorted(unknown)}")
+    raw = str(values.get("phone_number") or "").strip()
+    phone_number = normalize_e164(raw, default_country_code) if raw else None
+    if phone_number is None:
+        raise ValueError(f"{where}: invalid phone number {raw!r}")
+    settings = {k: str(v).strip() for k, v in values.items() if k != "phone_number" and v not in (None, "")}
+    return ImportRecord(phone_number, **settings)
+
+
+def load_records(path: str, default_country_code: str = "1") -> List[ImportRecord]:
+    """
+    Read the numbers to import from a CSV or JSON file.
+
+    A CSV file has a header row with `phone_number` and any other ImportRecord
+    field as columns; empty cells are left unset. A JSON file holds a list of
+    such objects, or of plain number strings. Numbers are normalized to E.164
+    and listed once, keeping the first occurrence.
+
+    Raises:
+        ValueError: A row has an invalid number or an unknown column. Nothing
+            is imported from a file with a bad row.
+    """
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+        if not isinstance(entries, list):
+            raise ValueError(f"{path}: expected a JSON list")
+        rows = [({"phone_number": e} if isinstance(e, str) else e, f"{path}[{i}]") for i, e in enumerate(entries)]
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or "phone_number" not in reader.fieldnames:
+                raise ValueError(f"{path}: the header must have a phone_number column")
+            rows = [(row, f"{path}:{reader.line_num}") for row in reader]
+
+    records: Dict[str, ImportRecord] = {}
+    for values, where in rows:
+        record = _record(values, where, default_country_code)
+        records.setdefault(record.phone_number, record)
+    return list(records.values())
+
+
+class ImportLog:
+    """
+    Append-only JSON-lines log of import results, one line per number attempt.
+
+    Each line is flushed as soon as the number is done, so a run that is
+    interrupted loses at most the numbers still in flight. On the next run,
+    `completed()` tells which numbers need not be tried again; numbers whose
+    last attempt failed are retried.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = None
+        self._lock = threading.Lock()
+
+    def read(self) -> Dict[str, ImportResult]:
+        """The last logged result of every number."""
+        results: Dict[str, ImportResult] = {}
+        if not os.path.exists(self.path):
+            return results
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    result = ImportResult(**json.loads(line))
+                except (ValueError, TypeError):
+                    # A line cut short by a crash; that number is simply tried again
+                    continue
+                results[result.phone_number] = result
+        return results
+
+    def completed(self) -> Set[str]:
+        """Numbers imported, or found already registered, by an earlier run."""
+        return {number for number, result in self.read().items() if result.ok}
+
+    def write(self, result: ImportResult):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(asdict(result)) + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+async def registered_numbers(manager: Any) -> Set[str]:
+    """Every number already registered with Retell, read with list-phone-numbers."""
+    numbers: Set[str] = set()
+    pagination_key = None
+    while True:
+        kwargs: Dict[str, Any] = {"limit": LIST_PAGE_SIZE}
+        if pagination_key:
+            kwargs["pagination_key"] = pagination_key
+        response = await manager._call("retell.list_phone_numbers", manager.retell_client.phone_number.list, idempotent=True, **kwargs)
+        numbers.update(n.phone_number for n in response.items)
+        pagination_key = response.pagination_key if response.has_more else None
+        if not pagination_key:
+            return numbers
+
+
+async def bulk_import(manager: Any, records: Iterable[ImportRecord], log_path: Optional[str] = None, concurrency: int = 8, defaults: Optional[Dict[str, str]] = None) -> List[ImportResult]:
+    """
+    Import many numbers into Retell through an AsyncRetellManager.
+
+    Registered numbers are read once up front and reported as skipped instead
+    of being imported again; the rest are imported `concurrency` at a time.
+
+    Args:
+        manager: The AsyncRetellManager whose Retell account receives the numbers.
+        records: The numbers to import (see load_records).
+        log_path: ImportLog file. Numbers it lists as imported or skipped are
+            left out, so rerunning the same file resumes an interrupted import.
+        concurrency: Maximum number of import requests in flight.
+        defaults: Settings for records that leave them unset, e.g.
+            {"termination_uri": ...}. `outbound_agent_id` falls back to the
+            manager's agent.
+
+    Returns:
+        One ImportResult per number processed in this run, in input order.
+
+    Raises:
+        ValueError: A record to import has no `termination_uri`, which Retell
+            requires, and `defaults` has none either. Nothing is imported.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    log = ImportLog(log_path) if log_path else None
+    done = log.completed() if log else set()
+    pending = [r for r in records if r.phone_number not in done]
+    if not pending:
+        return []
+
+    defaults = dict(defaults or {})
+    defaults.setdefault("outbound_agent_id", manager.retell_agent_id)
+    missing = [r.phone_number for r in pending if not (r.termination_uri or defaults.get("termination_uri"))]
+    if missing:
+        raise ValueError(
+            f"{len(missing)} numbers have no termination_uri (e.g. {', '.join(missing[:3])}); "
+            "add a termination_uri column or pass a default"
+        )
+    registered = await registered_numbers(manager)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(record: ImportRecord) -> ImportResult:
+        if record.phone_number in registered:
+            result = ImportResult(record.phone_number, IMPORT_SKIPPED, at=time.time())
+        else:
+            settings = {k: v for k, v in asdict(record).items() if v is not None}
+            import_kwargs = _build_import_kwargs(**{**defaults, **settings})
+            async with semaphore:
+                try:
+                    await manager._call("retell.import_phone_number", manager.retell_client.phone_number.import_, **import_kwargs)
+                    result = ImportResult(record.phone_number, IMPORT_IMPORTED, at=time.time())
+                except Exception as e:
+                    result = ImportResult(record.phone_number, IMPORT_FAILED, error=str(e) or type(e).__name__, at=time.time())
+        if log:
+            log.write(result)
+        if result.status == IMPORT_FAILED:
+            print(f"✗ {result.phone_number}: {result.error}")
+        else:
+            print(f"✓ {result.phone_number} {result.status}")
+        return result
+
+    try:
+        return list(await asyncio.gather(*(run(r) for r in pending)))
+    finally:
+        if log:
+            log.close()
+
+
+async def _main(args: Any) -> int:
+    from .async_retell_client import AsyncRetellManager
+
+    records: List[ImportRecord] = []
+    try:
+        for path in args.files:
+            records.extend(load_records(path, default_country_code=args.country_code))
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 2
+    defaults = {
+        key: value
+        for key, value in (
+            ("termination_uri", args.termination_uri),
+            ("outbound_agent_id", args.outbound_agent_id),
+            ("inbound_agent_id", args.inbound_agent_id),
+            ("sip_trunk_auth_username", args.sip_username or os.getenv("RETELL_SIP_TRUNK_USERNAME")),
+            ("sip_trunk_auth_password", os.getenv("RETELL_SIP_TRUNK_PASSWORD")),
+        )
+        if value
+    }
+
+    manager = AsyncRetellManager(max_connections=max(args.concurrency, 10))
+    try:
+        results = await bulk_import(manager, records, log_path=args.log, concurrency=args.concurrency, defaults=defaults)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 2
+    finally:
+        await manager.close()
+
+    counts = {status: sum(1 for r in results if r.status == status) for status in (IMPORT_IMPORTED, IMPORT_SKIPPED, IMPORT_FAILED)}
+    print(
+        f"\n{counts[IMPORT_IMPORTED]} imported, {counts[IMPORT_SKIPPED]} already registered, "
+        f"{counts[IMPORT_FAILED]} failed, {len(records) - len(results)} done in an earlier run"
+    )
+    if counts[IMPORT_FAILED]:
+        print(f"Run the same command again to retry the failed numbers (log: {args.log})")
+        return 1
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import phone numbers into Retell from CSV or JSON files.")
+    parser.add_argument("files", nargs="+", help="CSV (with a phone_number header) or JSON files")
+    parser.add_argument("--log", default="retell_import.jsonl", help="Result log; rerunning with the same log resumes the import")
+    parser.add_argument("--concurrency", type=int, default=8, help="Imports in flight at once")
+    parser.add_argument("--country-code", default="1", help="Country code for numbers without one")
+    parser.add_argument("--termination-uri", help="Default SIP trunk termination URI")
+    parser.add_argument("--outbound-agent-id", help="Default outbound agent (default: RETELL_AGENT_ID)")
+    parser.add_argument("--inbound-agent-id", help="Default inbound agent")
+    parser.add_argument("--sip-username", help="Default SIP trunk username; the password is read from RETELL_SIP_TRUNK_PASSWORD")
+    args = parser.parse_args(argv)
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+# Statuses in which a Retell call can still be ended with the force_end override.
+ACTIVE_CALL_STATUSES = ('registered', 'ongoing', 'dialing')
+
+# Sent as a raw body field so it works whether or not the SDK models it
+FORCE_END_UPDATE = {"extra_body": {"override_dynamic_variables": {"force_end": "true"}}}
+
+
+@dataclass
+class TrackedCall:
+    """Last known state of a Retell call."""
+    call_id: str
+    call_status: Optional[str] = None
+    updated_at: float = 0.0
+    call: Any = None
+
+    @property
+    def active(self) -> bool:
+        return self.call_status in ACTIVE_CALL_STATUSES
+
+
+@dataclass
+class EndCallResult:
+    """Outcome of ending one call through `end_calls`."""
+    call_id: str
+    ok: bool = True
+    skipped: bool = False
+    call_status: Optional[str] = None
+    error: Optional[BaseException] = None
+
+
+class _CallTrackerBase:
+    def __init__(self, manager: Any, batch_size: int = 100, page_size: int = 1000, concurrency: int = 20):
+        self.manager = manager
+        self.batch_size = batch_size
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self._calls: Dict[str, TrackedCall] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, call_id: str) -> bool:
+        return call_id in self._calls
+
+    def get(self, call_id: str) -> Optional[TrackedCall]:
+        return self._calls.get(call_id)
+
+    def track(self, call_id: str, call_status: Optional[str] = None, call: Any = None) -> TrackedCall:
+        """Start tracking `call_id`, optionally with a status already known to the caller."""
+        with self._lock:
+            tracked = self._calls.get(call_id)
+            if tracked is None:
+                tracked = self._calls[call_id] = TrackedCall(call_id)
+            if call_status is not None:
+                tracked.call_status = call_status
+                tracked.call = call
+                tracked.updated_at = time.time()
+            return tracked
+
+    def update(self, call: Any) -> Optional[TrackedCall]:
+        """
+        Apply a call object (or dict) from list-calls, get-call or a webhook.
+
+        Returns:
+            The updated TrackedCall, or None if the call is not tracked.
+        """
+        call_id = call["call_id"] if isinstance(call, dict) else call.call_id
+        call_status = call["call_status"] if isinstance(call, dict) else call.call_status
+        with self._lock:
+            tracked = self._calls.get(call_id)
+            if tracked is not None:
+                tracked.call_status = call_status
+                tracked.call = call
+                tracked.updated_at = time.time()
+            return tracked
+
+    def forget(self, call_id: str):
+        with self._lock:
+            self._calls.pop(call_id, None)
+
+    def prune(self) -> int:
+        """Stop tracking calls that have finished. Returns how many were removed."""
+        with self._lock:
+            done = [c for c, tracked in self._calls.items() if tracked.call_status is not None and not tracked.active]
+            for call_id in done:
+                del self._calls[call_id]
+        return len(done)
+
+    def active_calls(self) -> List[str]:
+        return [c for c, tracked in self._calls.items() if tracked.active]
+
+    def _batches(self, call_ids: Optional[Iterable[str]]) -> List[List[str]]:
+        if call_ids is None:
+            # Finished calls cannot change any more, so they are not listed again
+            call_ids = [c for c, tracked in self._calls.items() if tracked.call_status is None or tracked.active]
+        else:
+            call_ids = [self.track(c).call_id for c in call_ids]
+        return [call_ids[i:i + self.batch_size] for i in range(0, len(call_ids), self.batch_size)]
+
+    def _list_kwargs(self, batch: List[str], pagination_key: Optional[str]) -> Dict[str, Any]:
+        kwargs = {
+            "filter_criteria": {"call_id": {"type": "enum", "op": "in", "value": batch}},
+            "limit": self.page_size,
+        }
+        if pagination_key:
+            kwargs["pagination_key"] = pagination_key
+        return kwargs
+
+    def _apply_page(self, response: Any) -> Optional[str]:
+        for call in response.items:
+            self.update(call)
+        return response.pagination_key if response.has_more else None
+
+    def _targets(self, call_ids: Optional[Iterable[str]]) -> List[EndCallResult]:
+        call_ids = self.active_calls() if call_ids is None else list(call_ids)
+        results = []
+        for call_id in call_ids:
+            tracked = self._calls.get(call_id)
+            status = tracked.call_status if tracked is not None else None
+            results.append(EndCallResult(call_id, call_status=status, skipped=status not in ACTIVE_CALL_STATUSES))
+        return results
+
+
+class CallTracker(_CallTrackerBase):
+    """
+    Tracks the status of many Retell calls for a RetellManager.
+
+    `refresh()` reads the state of every tracked, unfinished call with
+    list-calls filtered by call ID, `batch_size` IDs per request and
+    `page_size` calls per page, instead of one get-call per call.
+    `end_calls()` then sends the force_end override only to calls known to be
+    registered, dialing or ongoing, `concurrency` at a time.
+    """
+
+    def refresh(self, call_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Re-read the status of `call_ids` (tracking them if needed), or of every
+        unfinished tracked call.
+
+        Returns:
+            The number of list-calls requests made.
+        """
+        requests = 0
+        for batch in self._batches(call_ids):
+            pagination_key = None
+            while True:
+                response = self.manager._call(
+                    "retell.list_calls",
+                    self.manager.retell_client.call.list,
+                    idempotent=True,
+                    **self._list_kwargs(batch, pagination_key)
+                )
+                requests += 1
+                pagination_key = self._apply_page(response)
+                if not pagination_key:
+                    break
+        return requests
+
+    def end_calls(self, call_ids: Optional[Iterable[str]] = None, refresh: bool = True) -> List[EndCallResult]:
+        """
+        End `call_ids` (default: every tracked active call).
+
+        Args:
+            call_ids: Calls to end; untracked IDs are tracked first.
+            refresh: Refresh their status first, so calls that already ended are skipped.
+
+        Returns:
+            One EndCallResult per call, in input order. Calls that were not active
+            are returned with `skipped=True`.
+        """
+        if call_ids is not None:
+            call_ids = list(call_ids)
+        if refresh:
+            self.refresh(call_ids)
+        results = self._targets(call_ids)
+
+        def end(result: EndCallResult):
+            try:
+                call = self.manager._call("retell.update_call", self.manager.retell_client.call.update, result.call_id, idempotent=True, **FORCE_END_UPDATE)
+                self.update(call)
+            except Exception as e:
+                result.ok = False
+                result.error = e
+
+        pending = [r for r in results if not r.skipped]
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(pending))) as executor:
+                list(executor.map(end, pending))
+        return results
+
+
+class AsyncCallTracker(_CallTrackerBase):
+    """asyncio counterpart of CallTracker for AsyncRetellManager; batches are refreshed concurrently."""
+
+    async def refresh(self, call_ids: Optional[Iterable[str]] = None) -> int:
+        """See CallTracker.refresh."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def refresh_batch(batch: List[str]) -> int:
+            requests = 0
+            pagination_key = None
+            async with semaphore:
+                while True:
+                    response = await self.manager._call(
+                        "retell.list_calls",
+                        self.manager.retell_client.call.list,
+                        idempotent=True,
+                        **self._list_kwargs(batch, pagination_key)
+                    )
+                    requests += 1
+                    pagination_key = self._apply_page(response)
+                    if not pagination_key:
+                        return requests
+
+        return sum(await asyncio.gather(*(refresh_batch(batch) for batch in self._batches(call_ids))))
+
+    async def end_calls(self, call_ids: Optional[Iterable[str]] = None, refresh: bool = True) -> List[EndCallResult]:
+        """See CallTracker.end_calls."""
+        if call_ids is not None:
+            call_ids = list(call_ids)
+        if refresh:
+            await self.refresh(call_ids)
+        results = self._targets(call_ids)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def end(result: EndCallResult):
+            async with semaphore:
+                try:
+                    call = await self.manager._call("retell.update_call", self.manager.retell_client.call.update, result.call_id, idempotent=True, **FORCE_END_UPDATE)
+                    self.update(call)
+                except Exception as e:
+                    result.ok = False
+                    result.error = e
+
+        await asyncio.gather(*(end(r) for r in results if not r.skipped))
+        return results
@@ -1,19 +1,140 @@
 import os
-from typing import List, Optional
-from dotenv import load_dotenv
+from typing import Callable, Dict, List, Optional, TypeVar
 from twilio.rest import Client
 from retell import Retell
-import time
+import threading
 import uuid
-import requests
-import boto3
 
-# Load environment variables
-load_dotenv(dotenv_path=".env.local")
-load_dotenv()
+from ..config import load_env
+from ..events import EventBus, RetellCallEvent, TwilioStatusEvent
+from ..instrumentation import Instrumentation, default_instrumentation, instrumented
+from ..recording_queue import RecordingJob, RecordingQueue
+from ..resilience import Resilience
+from ..suppression import SuppressionList
+from ..s3_transfer import DEFAULT_BUFFER_SIZE, get_s3_client, stream_to_s3
+from .call_tracker import ACTIVE_CALL_STATUSES, FORCE_END_UPDATE, CallTracker, EndCallResult
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Twilio forks at most four unidirectional Media Streams off one call
+MAX_STREAMS_PER_CALL = 4
+
+T = TypeVar("T")
+
+
+def _aws_settings():
+    access_key = os.getenv("AWS_ACCESS_KEY_ID")
+    secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
+    bucket = os.getenv("AWS_S3_BUCKET")
+    region = os.getenv("AWS_REGION")
+
+    if not access_key or not secret_key or not bucket:
+        raise ValueError("AWS credentials (AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_S3_BUCKET) are required for S3 upload.")
+    return access_key, secret_key, bucket, region
+
+
+def _build_import_kwargs(phone_number: str, termination_uri: str = None, outbound_agent_id: str = None, inbound_agent_id: str = None, nickname: str = None, sip_trunk_auth_username: str = None, sip_trunk_auth_password: str = None) -> dict:
+    import_kwargs = {
+        "phone_number": phone_number,
+    }
+
+    # Add termination URI if provided
+    if termination_uri:
+        import_kwargs["termination_uri"] = termination_uri
+
+    # Add SIP credentials if provided
+    if sip_trunk_auth_username and sip_trunk_auth_password:
+        import_kwargs["sip_trunk_auth_username"] = sip_trunk_auth_username
+        import_kwargs["sip_trunk_auth_password"] = sip_trunk_auth_password
+
+    # Agents are sent as raw body fields: newer SDKs only model them as
+    # outbound_agents/inbound_agents lists and reject these keywords
+    agents = {}
+
+    # Set outbound agent (required for outbound calls)
+    if outbound_agent_id:
+        agents["outbound_agent_id"] = outbound_agent_id
+
+    # Set inbound agent if provided
+    if inbound_agent_id:
+        agents["inbound_agent_id"] = inbound_agent_id
+
+    if agents:
+        import_kwargs["extra_body"] = agents
+
+    # Add nickname if provided
+    if nickname:
+        import_kwargs["nickname"] = nickname
+
+    return import_kwargs
+
+
+def _print_import_result(phone_number: str, response):
+    print(f"✓ Phone number {phone_number} successfully imported to Retell!")
+    print(f"  Phone Number: {response.phone_number}")
+    print(f"  Type: {response.phone_number_type}")
+    if hasattr(response, 'outbound_agent_id') and response.outbound_agent_id:
+        print(f"  Outbound Agent: {response.outbound_agent_id}")
+    if hasattr(response, 'inbound_agent_id') and response.inbound_agent_id:
+        print(f"  Inbound Agent: {response.inbound_agent_id}")
+
+
+def _print_import_error(e: Exception):
+    print(f"✗ Error importing phone number: {e}")
+    print(f"\nNote: If you're using Twilio, you may need to:")
+    print(f"  1. Create an Elastic SIP Trunk in Twilio console")
+    print(f"  2. Provide the termination_uri parameter (e.g., 'yourtrunk.pstn.twilio.com')")
+    print(f"  3. Or purchase the number directly through Retell dashboard")
+
+
+def _build_call_kwargs(from_number: str, agent_id: str, phone_number: str, prompt_content: str = None, call_id: str = None) -> dict:
+    call_kwargs = {
+        "from_number": from_number,
+        "to_number": phone_number,
+        "override_agent_id": agent_id,
+    }
+
+    if call_id:
+        call_kwargs["metadata"] = {"call_id": call_id}
+
+    # Only set up dynamic variables if we have a custom prompt
+    if prompt_content:
+        enhanced_prompt = (
+            f"{prompt_content}\n\n"
+            "SYSTEM INSTRUCTION: Continually check the dynamic variable {{force_end}}. "
+            "If {{force_end}} == 'true, you must IMMEDIATELY say goodbye and activate your end_call tool to terminate the call."
+        )
+        call_kwargs["retell_llm_dynamic_variables"] = {
+            "prompt_content": enhanced_prompt,
+            "force_end": "false"
+        }
+
+    return call_kwargs
+
+
+def _new_stream_urls(attached: Dict[str, str], urls: List[str]) -> List[str]:
+    if not urls:
+        raise ValueError("No stream URLs provided")
+    new_urls = [url for url in dict.fromkeys(urls) if url not in attached]
+    if len(attached) + len(new_urls) > MAX_STREAMS_PER_CALL:
+        raise ValueError(f"A call can have at most {MAX_STREAMS_PER_CALL} media streams ({len(attached)} already attached)")
+    return new_urls
+
+
+def _print_call_created(call_response):
+    print(f"Call created successfully!")
+    print(f"Retell Call ID: {call_response.call_id}")
+    print(f"Call Status: {call_response.call_status}")
+
 
 class RetellManager:
-    def __init__(self):
+    provider_name = "retell"
+
+    def __init__(self, instrumentation: Optional[Instrumentation] = None, resilience: Optional[Resilience] = None, suppression: Optional[SuppressionList] = None):
+        load_env()
+        self.instrumentation = instrumentation or default_instrumentation
+        self.resilience = resilience or Resilience()
+        self.suppression = suppression if suppression is not None else SuppressionList.from_env()
         self.twilio_account_sid = os.getenv("TWILIO_ACCOUNT_SID")
         self.twilio_auth_token = os.getenv("TWILIO_AUTH_TOKEN")
         self.twilio_number = os.getenv("TWILIO_PHONE_NUMBER")
@@ -24,9 +145,90 @@ class RetellManager:
             raise ValueError("Missing necessary environment variables for RetellManager")
 
         self.twilio_client = Client(self.twilio_account_sid, self.twilio_auth_token)
-        self.retell_client = Retell(api_key=self.retell_api_key)
+        # Overridable so requests can be routed through a proxy or a local stand-in server
+        self.twilio_api_base_url = os.getenv("TWILIO_API_BASE_URL", "https://api.twilio.com").rstrip("/")
+        self.twilio_client.api.base_url = self.twilio_api_base_url
+        # Retries are handled by self.resilience, so the SDK's own are turned off.
+        self.retell_client = Retell(api_key=self.retell_api_key, max_retries=0)
+        self.call_tracker = CallTracker(self)
+        self._recording_queue: Optional[RecordingQueue] = None
+        # Set by Twilio recording status callbacks so waits end without the next poll
+        self._recording_waiters: Dict[str, threading.Event] = {}
+        # Media Stream SIDs by call SID, then by URL
+        self._streams: Dict[str, Dict[str, str]] = {}
+        self._events_subscribed = False
+        self.recording_status_callback: Optional[str] = None
+
+    def close(self):
+        if self._recording_queue is not None:
+            self._recording_queue.stop()
+        self.retell_client.close()
+        session = getattr(self.twilio_client.http_client, "session", None)
+        if session is not None:
+            session.close()
+
+    def subscribe_events(self, bus: EventBus, recording_status_callback: Optional[str] = None) -> Callable[[], None]:
+        """
+        Follow Retell call events and Twilio status callbacks published on `bus`
+        (see WebhookServer).
+
+        Retell events update `call_tracker`, so `delete_room` uses the known call
+        status instead of fetching it. Twilio recording callbacks end
+        `start_recording` waits immediately; polling continues as a fallback.
+
+        Args:
+            bus: The EventBus the webhook server publishes to.
+            recording_status_callback: Public URL of the Twilio webhook route, passed
+                                       to Twilio when a recording is created. Defaults
+                                       to TWILIO_STATUS_CALLBACK_URL.
+
+        Returns:
+            A function that unsubscribes.
+        """
+        self.recording_status_callback = recording_status_callback or os.getenv("TWILIO_STATUS_CALLBACK_URL")
+        unsubscribers = [
+            bus.subscribe(RetellCallEvent, self._on_retell_event),
+            bus.subscribe(TwilioStatusEvent, self._on_twilio_event),
+        ]
+        self._events_subscribed = True
+
+        def unsubscribe():
+            for unsubscribe_one in unsubscribers:
+                unsubscribe_one()
+            self._events_subscribed = False
+
+        return unsubscribe
+
+    def _on_retell_event(self, event: RetellCallEvent):
+        self.call_tracker.update(event.call)
+
+    def _on_twilio_event(self, event: TwilioStatusEvent):
+        waiter = self._recording_waiters.get(event.recording_sid) if event.recording_sid else None
+        if waiter is not None:
+            waiter.set()
+
+    @property
+    def recording_queue(self) -> RecordingQueue:
+        """
+        Durable queue that finishes `start_recording(background=True)` jobs on a
+        background thread. Created on first use at RECORDING_QUEUE_PATH (default
+        `recordings/jobs.sqlite3`) with RECORDING_QUEUE_CONCURRENCY workers (default 4).
+        """
+        if self._recording_queue is None:
+            self._recording_queue = RecordingQueue(
+                os.getenv("RECORDING_QUEUE_PATH", os.path.join("recordings", "jobs.sqlite3")),
+                self._run_recording_job,
+                providers={self.provider_name},
+                concurrency=int(os.getenv("RECORDING_QUEUE_CONCURRENCY", "4")),
+            )
+        return self._recording_queue
+
+    def _call(self, endpoint: str, method: Callable[..., T], *args, idempotent: bool = False, **kwargs) -> T:
+        """Call `method(*args, **kwargs)` through the retry / circuit-breaker policy in `self.resilience`."""
+        return self.resilience.call_sync(endpoint, lambda: method(*args, **kwargs), idempotent=idempotent)
 
-    def import_phone_number(self, termination_uri: str = None, outbound_agent_id: str = None, inbound_agent_id: str = None, nickname: str = None, sip_trunk_auth_username: str = None, sip_trunk_auth_password: str = None):
+    @instrumented
+    def import_phone_number(self, termination_uri: str = None, outbound_agent_id: str = None, inbound_agent_id: str = None, nickname: str = None, sip_trunk_auth_username: str = None, sip_trunk_auth_password: str = None, phone_number: str = None):
         """
         Import/register your Twilio phone number with Retell.
         This is required before you can make outbound calls using the phone number.
@@ -39,121 +241,125 @@ class RetellManager:
             nickname: Optional nickname for the phone number.
             sip_trunk_auth_username: Username for SIP trunk authentication (if using credential list).
             sip_trunk_auth_password: Password for SIP trunk authentication (if using credential list).
+            phone_number: The number to import. Defaults to self.twilio_number
+                          (see retell_lib.bulk_import for importing many at once).
         
         Returns:
             The phone number registration response from Retell.
         """
-        # Build the import kwargs
-        import_kwargs = {
-            "phone_number": self.twilio_number,
-        }
-        
-        # Add termination URI if provided
-        if termination_uri:
-            import_kwargs["termination_uri"] = termination_uri
-        
-        # Add SIP credentials if provided
-        if sip_trunk_auth_username and sip_trunk_auth_password:
-            import_kwargs["sip_trunk_auth_username"] = sip_trunk_auth_username
-            import_kwargs["sip_trunk_auth_password"] = sip_trunk_auth_password
-        
-        # Set outbound agent (required for outbound calls)
-        if outbound_agent_id:
-            import_kwargs["outbound_agent_id"] = outbound_agent_id
-        elif self.retell_agent_id:
-            import_kwargs["outbound_agent_id"] = self.retell_agent_id
-        
-        # Set inbound agent if provided
-        if inbound_agent_id:
-            import_kwargs["inbound_agent_id"] = inbound_agent_id
-        
-        # Add nickname if provided
-        if nickname:
-            import_kwargs["nickname"] = nickname
-        
+        phone_number = phone_number or self.twilio_number
+        import_kwargs = _build_import_kwargs(
+            phone_number,
+            termination_uri=termination_uri,
+            outbound_agent_id=outbound_agent_id or self.retell_agent_id,
+            inbound_agent_id=inbound_agent_id,
+            nickname=nickname,
+            sip_trunk_auth_username=sip_trunk_auth_username,
+            sip_trunk_auth_password=sip_trunk_auth_password,
+        )
+
         try:
-            response = self.retell_client.phone_number.import_(**import_kwargs)
-            print(f"✓ Phone number {self.twilio_number} successfully imported to Retell!")
-            print(f"  Phone Number: {response.phone_number}")
-            print(f"  Type: {response.phone_number_type}")
-            if hasattr(response, 'outbound_agent_id') and response.outbound_agent_id:
-                print(f"  Outbound Agent: {response.outbound_agent_id}")
-            if hasattr(response, 'inbound_agent_id') and response.inbound_agent_id:
-                print(f"  Inbound Agent: {response.inbound_agent_id}")
+            response = self._call("retell.import_phone_number", self.retell_client.phone_number.import_, **import_kwargs)
+            _print_import_result(phone_number, response)
             return response
         except Exception as e:
-            print(f"✗ Error importing phone number: {e}")
-            print(f"\nNote: If you're using Twilio, you may need to:")
-            print(f"  1. Create an Elastic SIP Trunk in Twilio console")
-            print(f"  2. Provide the termination_uri parameter (e.g., 'yourtrunk.pstn.twilio.com')")
-            print(f"  3. Or purchase the number directly through Retell dashboard")
+            _print_import_error(e)
             raise
 
 
+    @instrumented
     def start_outbound_call(self, phone_number: str, prompt_content: str = None, call_id: str = None) -> str:
-        call_kwargs = {
-            "from_number": self.twilio_number,
-            "to_number": phone_number,
-            "override_agent_id": self.retell_agent_id,
-        }
-    
-        if call_id:
-            call_kwargs["metadata"] = {"call_id": call_id}
-    
-    # Only set up dynamic variables if we have a custom prompt
-        if prompt_content:
-            enhanced_prompt = (
-                f"{prompt_content}\n\n"
-                "SYSTEM INSTRUCTION: Continually check the dynamic variable {{force_end}}. "
-                "If {{force_end}} == 'true, you must IMMEDIATELY say goodbye and activate your end_call tool to terminate the call."
-            )
-            call_kwargs["retell_llm_dynamic_variables"] = {
-                "prompt_content": enhanced_prompt,
-                "force_end": "false"
-            }
-    
-        call_response = self.retell_client.call.create_phone_call(**call_kwargs)
-    
-        print(f"Call created successfully!")
-        print(f"Retell Call ID: {call_response.call_id}")
-        print(f"Call Status: {call_response.call_status}")
-    
+        if self.suppression is not None:
+            self.suppression.check(phone_number)
+        call_kwargs = _build_call_kwargs(self.twilio_number, self.retell_agent_id, phone_number, prompt_content, call_id)
+        with self.instrumentation.phase(self.provider_name, "start_outbound_call", "create_phone_call", call_id):
+            call_response = self._call("retell.create_phone_call", self.retell_client.call.create_phone_call, **call_kwargs)
+        _print_call_created(call_response)
+        self.call_tracker.track(call_response.call_id, call_response.call_status, call_response)
         return call_response.call_id
 
+    def _known_call_status(self, call_id: str) -> Optional[str]:
+        # Trusted only while Retell events keep the tracker current
+        if not self._events_subscribed:
+            return None
+        tracked = self.call_tracker.get(call_id)
+        return tracked.call_status if tracked is not None else None
+
+    @instrumented
     def delete_room(self, call_id: str):
         try:
-            call_data = self.retell_client.call.retrieve(call_id)
-            print(f"Current call status: {call_data.call_status}")
+            call_status = self._known_call_status(call_id)
+            if call_status is None:
+                with self.instrumentation.phase(self.provider_name, "delete_room", "retrieve_call", call_id):
+                    call_data = self._call("retell.get_call", self.retell_client.call.retrieve, call_id, idempotent=True)
+                self.call_tracker.update(call_data)
+                call_status = call_data.call_status
+            print(f"Current call status: {call_status}")
 
-            if call_data.call_status in ['registered', 'ongoing', 'dialing']:
+            if call_status in ACTIVE_CALL_STATUSES:
                 print(f"Triggering end for Retell call {call_id}...")
 
-                self.retell_client.call.update(
-                    call_id,
-                    override_dynamic_variables={"force_end": "true"}
-                )
+                with self.instrumentation.phase(self.provider_name, "delete_room", "update_call", call_id):
+                    self._call(
+                        "retell.update_call",
+                        self.retell_client.call.update,
+                        call_id,
+                        idempotent=True,
+                        **FORCE_END_UPDATE
+                    )
 
                 print("✓ force_end override sent to Retell API")
             else:
-                print(f"Call already ended: {call_data.call_status}")
+                print(f"Call already ended: {call_status}")
 
         except Exception as e:
             print(f"Error ending call {call_id}: {e}")
             raise
 
-    def start_stream(self, call_id: str, rtmp_urls: List[str]):
+    @instrumented
+    def end_calls(self, call_ids: Optional[List[str]] = None, refresh: bool = True) -> List[EndCallResult]:
         """
-        Starts a Twilio Media Stream.
-        Note: Twilio streams are WebSocket-based. If rtmp_urls contains a WSS URL, it will work.
+        End many calls at once. Their status is read with batched list-calls
+        requests and force_end is sent concurrently, only to calls still active.
+        See CallTracker.end_calls.
         """
-        if not rtmp_urls:
-            raise ValueError("No stream URLs provided")
-            
-        self.twilio_client.calls(call_id).streams.create(
-            url=rtmp_urls[0]
-        )
+        return self.call_tracker.end_calls(call_ids, refresh=refresh)
 
-    def start_recording(self, call_id: str, output_filepath: Optional[str] = None, upload_to_s3: bool = True, wait_for_completion: bool = True):
+    @instrumented
+    def start_stream(self, call_id: str, rtmp_urls: List[str]) -> Dict[str, str]:
+        """
+        Starts a Twilio Media Stream to each URL.
+        Note: Twilio streams are WebSocket-based, so the URLs must be WSS URLs.
+
+        Twilio forks the call audio to every stream without re-encoding. URLs
+        already streaming are skipped; a call takes at most MAX_STREAMS_PER_CALL.
+
+        Returns:
+            The Stream SID of every URL attached to the call.
+        """
+        attached = self._streams.setdefault(call_id, {})
+        for url in _new_stream_urls(attached, rtmp_urls):
+            stream = self._call(
+                "twilio.create_stream",
+                self.twilio_client.calls(call_id).streams.create,
+                url=url
+            )
+            attached[url] = stream.sid
+        return dict(attached)
+
+    @instrumented
+    def stop_stream(self, call_id: str, rtmp_urls: Optional[List[str]] = None):
+        """Stops the Media Streams to `rtmp_urls` (default: all of the call's streams)."""
+        attached = self._streams.get(call_id, {})
+        for url in list(attached) if rtmp_urls is None else rtmp_urls:
+            sid = attached.pop(url, None)
+            if sid is not None:
+                self._call("twilio.update_stream", self.twilio_client.calls(call_id).streams(sid).update, status="stopped", idempotent=True)
+        if not attached:
+            self._streams.pop(call_id, None)
+
+    @instrumented
+    def start_recording(self, call_id: str, output_filepath: Optional[str] = None, upload_to_s3: bool = True, wait_for_completion: bool = True, buffer_size: int = DEFAULT_BUFFER_SIZE, background: bool = False):
         """
         Triggers a recording on the active Twilio call.
         
@@ -162,85 +368,129 @@ class RetellManager:
             output_filepath: Optional filename for the recording.
             upload_to_s3: If True, uploads to S3.
             wait_for_completion: If True, waits for recording to finish and then uploads.
+            buffer_size: Bytes held in memory while streaming the recording to S3
+                         and the local file (minimum 5 MiB, the S3 part size limit).
+            background: If True (with upload_to_s3), return as soon as the recording has
+                        started. Waiting and uploading are done by `recording_queue`
+                        on a background thread, and survive restarts.
         
         Returns:
-            The Twilio Recording SID.
+            The Twilio Recording SID, or the queued RecordingJob in background mode.
         """
         
         # Start Twilio recording
-        recording = self.twilio_client.calls(call_id).recordings.create()
+        with self.instrumentation.phase(self.provider_name, "start_recording", "create_recording", call_id):
+            recording = self._call("twilio.create_recording", self.twilio_client.calls(call_id).recordings.create, **self._recording_kwargs())
         print(f"Recording started: {recording.sid}")
+
+        if background and upload_to_s3:
+            _, _, bucket, _ = _aws_settings()
+            filename = output_filepath if output_filepath else f"{call_id}-{uuid.uuid4().hex[:6]}.mp3"
+            self.recording_queue.start_thread()
+            job = self.recording_queue.enqueue(call_id, self.provider_name, recording.sid, bucket=bucket, key=filename, local_path=os.path.join("recordings", filename), buffer_size=buffer_size)
+            print(f"Recording job {job.job_id} queued for recording {recording.sid}")
+            return job
         
         if not wait_for_completion:
             return recording.sid
         
-        # Poll for recording completion
-        print("Waiting for recording to complete...")
-        while True:
-            rec_status = self.twilio_client.recordings(recording.sid).fetch()
-            if rec_status.status == 'completed':
-                print("Recording completed.")
-                break
-            elif rec_status.status in ['failed', 'absent']:
-                raise RuntimeError(f"Recording failed with status: {rec_status.status}")
-            time.sleep(5)
+        self._wait_for_recording(call_id, recording.sid)
         
         if not upload_to_s3:
             return recording.sid
         
+        filename = output_filepath if output_filepath else f"{call_id}-{uuid.uuid4().hex[:6]}.mp3"
+        self._transfer_recording(call_id, recording.sid, filename, os.path.join("recordings", filename), buffer_size)
+        
+        return recording.sid
+
+    def _wait_for_recording(self, call_id: str, recording_sid: str):
+        # Poll for recording completion
+        print("Waiting for recording to complete...")
+        waiter = self._recording_waiters.setdefault(recording_sid, threading.Event())
+        try:
+            with self.instrumentation.phase(self.provider_name, "start_recording", "wait_recording", call_id):
+                while True:
+                    waiter.clear()
+                    rec_status = self._call("twilio.fetch_recording", self.twilio_client.recordings(recording_sid).fetch, idempotent=True)
+                    if rec_status.status == 'completed':
+                        print("Recording completed.")
+                        break
+                    elif rec_status.status in ['failed', 'absent']:
+                        raise RuntimeError(f"Recording failed with status: {rec_status.status}")
+                    waiter.wait(5)
+        finally:
+            self._recording_waiters.pop(recording_sid, None)
+
+    def _recording_kwargs(self) -> dict:
+        if not self.recording_status_callback:
+            return {}
+        return {"recording_status_callback": self.recording_status_callback, "recording_status_callback_event": ["completed", "absent"]}
+
+    def _transfer_recording(self, call_id: str, recording_sid: str, filename: str, local_path: str, buffer_size: int = DEFAULT_BUFFER_SIZE, bucket: Optional[str] = None):
         # Download recording from Twilio
-        media_url = f"https://api.twilio.com/2010-04-01/Accounts/{self.twilio_account_sid}/Recordings/{recording.sid}.mp3"
+        media_url = f"{self.twilio_api_base_url}/2010-04-01/Accounts/{self.twilio_account_sid}/Recordings/{recording_sid}.mp3"
         print(f"Downloading recording from: {media_url}")
         
-        response = requests.get(media_url, auth=(self.twilio_account_sid, self.twilio_auth_token))
-        if response.status_code != 200:
-            raise RuntimeError(f"Failed to download recording: {response.status_code} {response.text}")
-        
-        # Upload to S3
-        access_key = os.getenv("AWS_ACCESS_KEY_ID")
-        secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
-        bucket = os.getenv("AWS_S3_BUCKET")
-        region = os.getenv("AWS_REGION")
+        access_key, secret_key, default_bucket, region = _aws_settings()
+        bucket = bucket or default_bucket
         
-        if not access_key or not secret_key or not bucket:
-            raise ValueError("AWS credentials (AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_S3_BUCKET) are required for S3 upload.")
+        s3 = get_s3_client(access_key, secret_key, region)
+        rate_limiter = self.resilience.rate_limiter
         
-        filename = output_filepath if output_filepath else f"{call_id}-{uuid.uuid4().hex[:6]}.mp3"
-        
-        s3 = boto3.client(
-            's3',
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            region_name=region
-        )
-        
-        print(f"Uploading to S3: s3://{bucket}/{filename}")
-        s3.put_object(Bucket=bucket, Key=filename, Body=response.content)
-        print(f"Upload complete: s3://{bucket}/{filename}")
+        import requests
+
+        # Stream the download straight into S3 and the local file instead of buffering it
+        with self.instrumentation.phase(self.provider_name, "start_recording", "transfer", call_id):
+            if rate_limiter is not None:
+                rate_limiter.acquire_sync("twilio.download_recording")
+            with requests.get(media_url, auth=(self.twilio_account_sid, self.twilio_auth_token), stream=True) as response:
+                if response.status_code != 200:
+                    if rate_limiter is not None and response.status_code == 429:
+                        rate_limiter.throttled("twilio.download_recording")
+                    raise RuntimeError(f"Failed to download recording: {response.status_code} {response.text}")
+            
+                print(f"Uploading to S3: s3://{bucket}/{filename}")
+                size = stream_to_s3(response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE), s3, bucket, filename, local_path=local_path, buffer_size=buffer_size, rate_limiter=rate_limiter)
         
-        # Also save locally
-        local_dir = "recordings"
-        os.makedirs(local_dir, exist_ok=True)
-        local_path = os.path.join(local_dir, filename)
-        with open(local_path, 'wb') as f:
-            f.write(response.content)
+        print(f"Upload complete: s3://{bucket}/{filename} ({size} bytes)")
         print(f"Recording saved locally: {local_path}")
-        
-        return recording.sid
 
+    def _run_recording_job(self, job: RecordingJob):
+        self._wait_for_recording(job.call_id, job.source_id)
+        self._transfer_recording(job.call_id, job.source_id, job.key, job.local_path, job.params.get("buffer_size", DEFAULT_BUFFER_SIZE), bucket=job.bucket)
+
+    def resume_recordings(self) -> List[RecordingJob]:
+        """
+        Start the recording queue thread so jobs left unfinished by a previous
+        run are completed. Call once at startup.
+
+        Returns:
+            The unfinished Retell jobs found in the queue.
+        """
+        self.recording_queue.start_thread()
+        return [job for job in self.recording_queue.store.unfinished() if job.provider == self.provider_name]
+
+    def get_recording_status(self, call_id: str) -> List[RecordingJob]:
+        """Background recording jobs for `call_id`, oldest first, with their current status."""
+        return self.recording_queue.status(call_id)
+
+    @instrumented
     def mute_participant(self, call_id: str, identity: str, track_sid: str, muted: bool):
         """
         Mutes the participant on the Twilio call.
         This prevents audio from reaching the Retell AI.
         """
-        self.twilio_client.calls(call_id).update(muted=muted)
+        self._call("twilio.update_call", self.twilio_client.calls(call_id).update, muted=muted, idempotent=True)
 
+    @instrumented
     def kick_participant(self, call_id: str, identity: str):
         """
         Alias for delete_room (hangup).
         """
         self.delete_room(call_id)
 
+    @instrumented
     def send_alert(self, call_id: str, message: str, participant_identity: Optional[str] = None):
         """
         Not fully supported in this hybrid model
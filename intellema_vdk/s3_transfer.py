@@ -0,0 +1,322 @@
+import os
+import json
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Set, Tuple
+
+# S3 rejects multipart parts smaller than 5 MiB (except the last one).
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+def _limit(rate_limiter: Any, operation: str):
+    # S3 requests are made from worker threads, so waiting for a token blocks only the thread
+    if rate_limiter is not None:
+        rate_limiter.acquire_sync(f"s3.{operation}")
+
+
+class S3MultipartWriter:
+    """
+    File-like writer that streams bytes into an S3 object with a multipart upload.
+
+    At most `part_size` bytes are held in memory. Objects smaller than one part
+    are sent with a single put_object instead. Use as a context manager: the
+    upload is completed on a clean exit and aborted if an exception escapes.
+    With a `rate_limiter`, every request first takes a token for
+    `s3.<operation>`, e.g. `s3.upload_part`.
+    """
+
+    def __init__(self, s3, bucket: str, key: str, part_size: int = DEFAULT_BUFFER_SIZE, rate_limiter: Any = None):
+        self.s3 = s3
+        self.rate_limiter = rate_limiter
+        self.bucket = bucket
+        self.key = key
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._parts: List[dict] = []
+
+    def write(self, data: bytes):
+        self._buffer.extend(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+
+    def close(self):
+        if self._upload_id is None:
+            _limit(self.rate_limiter, "put_object")
+            self.s3.put_object(Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer))
+        else:
+            if self._buffer:
+                self._upload_part(bytes(self._buffer))
+            _limit(self.rate_limiter, "complete_multipart_upload")
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._parts},
+            )
+        self._buffer = bytearray()
+
+    def abort(self):
+        if self._upload_id is not None:
+            _limit(self.rate_limiter, "abort_multipart_upload")
+            self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+            self._upload_id = None
+        self._buffer = bytearray()
+
+    def _upload_part(self, body: bytes):
+        if self._upload_id is None:
+            _limit(self.rate_limiter, "create_multipart_upload")
+            self._upload_id = self.s3.create_multipart_upload(Bucket=self.bucket, Key=self.key)["UploadId"]
+        part_number = len(self._parts) + 1
+        _limit(self.rate_limiter, "upload_part")
+        response = self.s3.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    def __enter__(self) -> "S3MultipartWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class _Tee:
+    def __init__(self, s3, bucket: str, key: str, local_path: Optional[str], buffer_size: int, rate_limiter: Any = None):
+        self.writer = S3MultipartWriter(s3, bucket, key, part_size=buffer_size, rate_limiter=rate_limiter)
+        self.local_file = None
+        self.local_path = local_path
+        self.size = 0
+
+    def open(self):
+        if self.local_path:
+            os.makedirs(os.path.dirname(self.local_path) or ".", exist_ok=True)
+            self.local_file = open(self.local_path, "wb")
+
+    def write(self, data: bytes):
+        self.writer.write(data)
+        if self.local_file is not None:
+            self.local_file.write(data)
+        self.size += len(data)
+
+    def finish(self, failed: bool):
+        try:
+            if failed:
+                self.writer.abort()
+            else:
+                self.writer.close()
+        finally:
+            if self.local_file is not None:
+                self.local_file.close()
+                if failed:
+                    os.remove(self.local_path)
+
+
+def stream_to_s3(chunks: Iterable[bytes], s3, bucket: str, key: str, local_path: Optional[str] = None, buffer_size: int = DEFAULT_BUFFER_SIZE, rate_limiter: Any = None) -> int:
+    """
+    Copy `chunks` to s3://bucket/key and, optionally, to `local_path` in one pass.
+
+    Memory use is bounded by `buffer_size` (one multipart part), whatever the
+    total length of the stream. S3 requests are subject to `rate_limiter`
+    (see S3MultipartWriter).
+
+    Returns:
+        The number of bytes transferred.
+    """
+    tee = _Tee(s3, bucket, key, local_path, buffer_size, rate_limiter)
+    tee.open()
+    failed = True
+    try:
+        for chunk in chunks:
+            if chunk:
+                tee.write(chunk)
+        failed = False
+    finally:
+        tee.finish(failed)
+    return tee.size
+
+
+async def stream_to_s3_async(chunks: AsyncIterable[bytes], s3, bucket: str, key: str, local_path: Optional[str] = None, buffer_size: int = DEFAULT_BUFFER_SIZE, rate_limiter: Any = None) -> int:
+    """
+    asyncio variant of `stream_to_s3`.
+
+    Chunks are gathered into blocks of `buffer_size` bytes and each block is
+    written from the default executor, so S3 and disk I/O never block the loop.
+    """
+    loop = asyncio.get_running_loop()
+    tee = _Tee(s3, bucket, key, local_path, buffer_size, rate_limiter)
+    await loop.run_in_executor(None, tee.open)
+    block = bytearray()
+    failed = True
+    try:
+        async for chunk in chunks:
+            block.extend(chunk)
+            if len(block) >= tee.writer.part_size:
+                await loop.run_in_executor(None, tee.write, bytes(block))
+                block = bytearray()
+        if block:
+            await loop.run_in_executor(None, tee.write, bytes(block))
+        failed = False
+    finally:
+        await loop.run_in_executor(None, tee.finish, failed)
+    return tee.size
+
+
+_s3_clients: Dict[Tuple, Any] = {}
+_s3_clients_lock = threading.Lock()
+_download_executor: Optional[ThreadPoolExecutor] = None
+
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_DOWNLOAD_WORKERS = 8
+_READ_SIZE = 1024 * 1024
+
+
+def get_s3_client(access_key: Optional[str] = None, secret_key: Optional[str] = None, region: Optional[str] = None):
+    """
+    Return the process-wide boto3 S3 client for these credentials.
+
+    boto3 clients are thread-safe, so one instance (and its connection pool) is
+    shared by every manager and download thread in the process.
+    """
+    key = (access_key, secret_key, region)
+    with _s3_clients_lock:
+        client = _s3_clients.get(key)
+        if client is None:
+            import boto3
+            from botocore.config import Config
+
+            client = boto3.client(
+                's3',
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                region_name=region,
+                config=Config(max_pool_connections=DEFAULT_DOWNLOAD_WORKERS * 4),
+            )
+            _s3_clients[key] = client
+        return client
+
+
+def _get_download_executor() -> ThreadPoolExecutor:
+    global _download_executor
+    with _s3_clients_lock:
+        if _download_executor is None:
+            _download_executor = ThreadPoolExecutor(max_workers=DEFAULT_DOWNLOAD_WORKERS, thread_name_prefix="s3-download")
+        return _download_executor
+
+
+class RecordingFetcher:
+    """
+    Downloads S3 objects with parallel ranged GETs from a thread pool.
+
+    The object is written to `<local_path>.part` and progress is kept in
+    `<local_path>.part.json`, so a download interrupted by a crash resumes with
+    only the missing ranges. The object's ETag is stored next to the finished
+    file in `<local_path>.etag`; a later fetch of the same object is skipped
+    when the local size and ETag still match.
+    With a `rate_limiter`, each S3 request first takes a token for
+    `s3.head_object` or `s3.get_object`.
+    """
+
+    def __init__(self, s3, chunk_size: int = DEFAULT_DOWNLOAD_CHUNK_SIZE, executor: Optional[ThreadPoolExecutor] = None, rate_limiter: Any = None):
+        self.s3 = s3
+        self.rate_limiter = rate_limiter
+        self.chunk_size = chunk_size
+        self.executor = executor or _get_download_executor()
+
+    async def fetch(self, bucket: str, key: str, local_path: str) -> str:
+        """
+        Download s3://bucket/key to `local_path` without blocking the event loop.
+
+        Returns:
+            `local_path`.
+        """
+        loop = asyncio.get_running_loop()
+        def head_object():
+            _limit(self.rate_limiter, "head_object")
+            return self.s3.head_object(Bucket=bucket, Key=key)
+
+        head = await loop.run_in_executor(self.executor, head_object)
+        size = head["ContentLength"]
+        etag = head["ETag"]
+
+        if self._is_current(local_path, size, etag):
+            print(f"Recording already downloaded: {local_path}")
+            return local_path
+
+        os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+        part_path = local_path + ".part"
+        state_path = local_path + ".part.json"
+        done = self._load_progress(state_path, part_path, size, etag)
+        if not done:
+            with open(part_path, "wb") as f:
+                f.truncate(size)
+
+        ranges = [
+            (index, index * self.chunk_size, min(size, (index + 1) * self.chunk_size) - 1)
+            for index in range(-(-size // self.chunk_size))
+            if index not in done
+        ]
+        progress_lock = threading.Lock()
+
+        def download_range(index: int, start: int, end: int):
+            _limit(self.rate_limiter, "get_object")
+            response = self.s3.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}", IfMatch=etag)
+            body = response["Body"]
+            with open(part_path, "r+b") as f:
+                f.seek(start)
+                for block in iter(lambda: body.read(_READ_SIZE), b""):
+                    f.write(block)
+                f.flush()
+                os.fsync(f.fileno())
+            with progress_lock:
+                done.add(index)
+                self._save_progress(state_path, size, etag, done)
+
+        await asyncio.gather(*(
+            loop.run_in_executor(self.executor, download_range, index, start, end)
+            for index, start, end in ranges
+        ))
+
+        os.replace(part_path, local_path)
+        with open(local_path + ".etag", "w") as f:
+            f.write(etag)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        return local_path
+
+    def _is_current(self, local_path: str, size: int, etag: str) -> bool:
+        if not os.path.exists(local_path) or os.path.getsize(local_path) != size:
+            return False
+        try:
+            with open(local_path + ".etag") as f:
+                return f.read().strip() == etag
+        except FileNotFoundError:
+            return False
+
+    def _load_progress(self, state_path: str, part_path: str, size: int, etag: str) -> Set[int]:
+        if not os.path.exists(part_path):
+            return set()
+        try:
+            with open(state_path) as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return set()
+        if state.get("etag") != etag or state.get("size") != size or state.get("chunk_size") != self.chunk_size:
+            return set()
+        return set(state.get("done", []))
+
+    def _save_progress(self, state_path: str, size: int, etag: str, done: Set[int]):
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"etag": etag, "size": size, "chunk_size": self.chunk_size, "done": sorted(done)}, f)
+        os.replace(tmp_path, state_path)
@@ -0,0 +1,282 @@
+"""
+Do-not-call / opt-out suppression index.
+
+Numbers are normalized to E.164 and stored as sorted unsigned 64-bit integers in
+a flat file that is memory-mapped and searched with bisect, so a list of tens
+of millions of numbers costs only the pages a lookup touches and each lookup
+takes a few microseconds. Build an index from text or CSV files (first column
+is the number) with:
+
+    python -m intellema_vdk.suppression build dnc.idx dnc_national.csv opt_outs.txt
+"""
+import array
+import bisect
+import csv
+import heapq
+import mmap
+import os
+import re
+import sys
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+MAGIC = b"VDKSUP1\0"
+HEADER_SIZE = 16  # magic + uint64 entry count
+_ITEM_SIZE = 8
+_DEFAULT_CHUNK = 4_000_000
+
+_NON_DIGITS = re.compile(r"[^\d+]")
+
+
+class SuppressedNumberError(ValueError):
+    """Raised instead of dialing a number found on a suppression list."""
+
+    def __init__(self, phone_number: str):
+        super().__init__(f"{phone_number} is on a suppression list")
+        self.phone_number = phone_number
+
+
+def normalize_e164(phone_number: str, default_country_code: str = "1") -> Optional[str]:
+    """
+    Normalize a phone number to E.164 ("+15551234567").
+
+    Separators are dropped, a leading "00" is read as "+", and a national
+    number without "+" gets `default_country_code` unless it already starts
+    with it. Returns None if the result is not 8 to 15 digits long.
+    """
+    cleaned = _NON_DIGITS.sub("", phone_number.strip())
+    if cleaned.startswith("+"):
+        digits = cleaned[1:]
+    elif cleaned.startswith("00"):
+        digits = cleaned[2:]
+    elif len(cleaned) == 10 + len(default_country_code) and cleaned.startswith(default_country_code):
+        digits = cleaned
+    else:
+        digits = default_country_code + cleaned
+    if "+" in digits or not 8 <= len(digits) <= 15 or digits[0] == "0":
+        return None
+    return "+" + digits
+
+
+def _to_key(phone_number: str, default_country_code: str = "1") -> Optional[int]:
+    normalized = normalize_e164(phone_number, default_country_code)
+    return int(normalized[1:]) if normalized else None
+
+
+def _read_numbers(path: str) -> Iterator[str]:
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if row and row[0].strip() and not row[0].lstrip().startswith("#"):
+                yield row[0]
+
+
+def _write_index(path: str, keys: Iterable[int]):
+    tmp_path = f"{path}.tmp"
+    count = 0
+    buffer = array.array("Q")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + bytes(8))
+        previous = None
+        for key in keys:
+            if key == previous:
+                continue
+            previous = key
+            buffer.append(key)
+            if len(buffer) >= 65536:
+                buffer.tofile(f)
+                count += len(buffer)
+                del buffer[:]
+        buffer.tofile(f)
+        count += len(buffer)
+        f.seek(len(MAGIC))
+        f.write(count.to_bytes(8, sys.byteorder))
+    # Readers holding the old file keep their mapping; new opens see the new file.
+    os.replace(tmp_path, path)
+
+
+def _iter_chunk_file(path: str) -> Iterator[int]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = array.array("Q")
+            chunk.frombytes(f.read(_ITEM_SIZE * 65536))
+            if not chunk:
+                return
+            yield from chunk
+
+
+def build_index(output_path: str, sources: Sequence[str], default_country_code: str = "1", chunk_size: int = _DEFAULT_CHUNK) -> int:
+    """
+    Build a suppression index file from text/CSV files with one number per row.
+
+    Numbers are sorted in chunks of `chunk_size` and merged, so memory stays
+    bounded however long the lists are. Rows that do not normalize are skipped.
+
+    Returns:
+        The number of distinct numbers written.
+    """
+    import tempfile
+
+    chunk_paths: List[str] = []
+    chunk = array.array("Q")
+
+    def flush():
+        if not chunk:
+            return
+        fd, chunk_path = tempfile.mkstemp(suffix=".sup", dir=os.path.dirname(os.path.abspath(output_path)))
+        with os.fdopen(fd, "wb") as f:
+            array.array("Q", sorted(chunk)).tofile(f)
+        chunk_paths.append(chunk_path)
+        del chunk[:]
+
+    try:
+        for source in sources:
+            for number in _read_numbers(source):
+                key = _to_key(number, default_country_code)
+                if key is not None:
+                    chunk.append(key)
+                    if len(chunk) >= chunk_size:
+                        flush()
+        flush()
+        _write_index(output_path, heapq.merge(*(_iter_chunk_file(p) for p in chunk_paths)))
+    finally:
+        for chunk_path in chunk_paths:
+            os.unlink(chunk_path)
+
+    return SuppressionIndex(output_path).count
+
+
+class SuppressionIndex:
+    """A read-only, memory-mapped index file written by `build_index`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        stat = os.stat(path)
+        self.signature: Tuple[float, int] = (stat.st_mtime, stat.st_size)
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a suppression index")
+            self.count = int.from_bytes(f.read(8), sys.byteorder)
+            if HEADER_SIZE + self.count * _ITEM_SIZE != stat.st_size:
+                raise ValueError(f"{path} is truncated or corrupt")
+            if self.count:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._keys = memoryview(self._mmap)[HEADER_SIZE:].cast("Q")
+            else:
+                self._mmap = None
+                self._keys = ()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, key: int) -> bool:
+        keys = self._keys
+        i = bisect.bisect_left(keys, key)
+        return i < len(keys) and keys[i] == key
+
+
+class SuppressionList:
+    """
+    One or more suppression index files plus numbers added at runtime.
+
+    `reload()` re-opens only the files that changed on disk and swaps them in
+    with a single assignment, so lookups running in other tasks or threads
+    are never blocked. A rebuilt file is picked up on the next reload. Extra
+    files, e.g. a daily opt-out delta, can be attached with `add_index()`.
+    """
+
+    def __init__(self, paths: Sequence[str] = (), default_country_code: str = "1"):
+        self.default_country_code = default_country_code
+        self._indexes: Dict[str, SuppressionIndex] = {path: SuppressionIndex(path) for path in paths}
+        self._extra: Set[int] = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["SuppressionList"]:
+        """Build from SUPPRESSION_INDEX_PATHS (os.pathsep-separated), or None if unset."""
+        value = os.getenv("SUPPRESSION_INDEX_PATHS")
+        if not value:
+            return None
+        return cls([p for p in value.split(os.pathsep) if p], default_country_code=os.getenv("SUPPRESSION_DEFAULT_COUNTRY_CODE", "1"))
+
+    def __len__(self) -> int:
+        return sum(index.count for index in self._indexes.values()) + len(self._extra)
+
+    def add_index(self, path: str):
+        index = SuppressionIndex(path)
+        with self._lock:
+            self._indexes = {**self._indexes, path: index}
+
+    def add(self, phone_number: str):
+        """Suppress one number immediately, e.g. after a live opt-out."""
+        key = _to_key(phone_number, self.default_country_code)
+        if key is None:
+            raise ValueError(f"Invalid phone number: {phone_number}")
+        with self._lock:
+            self._extra = self._extra | {key}
+
+    def reload(self) -> int:
+        """
+        Re-open index files that changed on disk.
+
+        Returns:
+            The number of files reloaded.
+        """
+        reloaded = 0
+        with self._lock:
+            indexes = dict(self._indexes)
+            for path, index in indexes.items():
+                stat = os.stat(path)
+                if (stat.st_mtime, stat.st_size) != index.signature:
+                    indexes[path] = SuppressionIndex(path)
+                    reloaded += 1
+            if reloaded:
+                self._indexes = indexes
+        return reloaded
+
+    def is_suppressed(self, phone_number: str) -> bool:
+        """
+        True if `phone_number` is on any list.
+
+        Raises:
+            ValueError: The number cannot be normalized, so it cannot be checked.
+        """
+        key = _to_key(phone_number, self.default_country_code)
+        if key is None:
+            raise ValueError(f"Invalid phone number: {phone_number}")
+        if key in self._extra:
+            return True
+        return any(key in index for index in self._indexes.values())
+
+    def check(self, phone_number: str):
+        """Raise SuppressedNumberError if `phone_number` must not be dialed."""
+        if self.is_suppressed(phone_number):
+            raise SuppressedNumberError(phone_number)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or query a suppression index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Build an index from text/CSV files")
+    build.add_argument("output")
+    build.add_argument("sources", nargs="+")
+    build.add_argument("--country-code", default="1", help="Country code for numbers without one")
+    check = commands.add_parser("check", help="Look numbers up in one or more indexes")
+    check.add_argument("--index", action="append", required=True)
+    check.add_argument("numbers", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        count = build_index(args.output, args.sources, default_country_code=args.country_code)
+        print(f"Wrote {count} numbers to {args.output}")
+        return 0
+
+    suppression = SuppressionList(args.index)
+    for number in args.numbers:
+        print(f"{number}: {'suppressed' if suppression.is_suppressed(number) else 'ok'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
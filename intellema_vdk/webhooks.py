@@ -0,0 +1,191 @@
+import hashlib
+import hmac
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .events import EventBus, LiveKitEvent, RetellCallEvent, TwilioStatusEvent
+
+RETELL_SIGNATURE_HEADER = "x-retell-signature"
+TWILIO_SIGNATURE_HEADER = "X-Twilio-Signature"
+
+_RETELL_SIGNATURE = re.compile(r"v=(\d+),d=([0-9a-f]{64})")
+
+
+class WebhookAuthError(ValueError):
+    """Raised when a webhook's signature is missing or invalid."""
+
+
+class LiveKitWebhookVerifier:
+    """
+    Verifies LiveKit webhooks against one or more API key/secret pairs.
+
+    The key is chosen from the token's issuer, so rotated keys can be accepted
+    side by side. One `WebhookReceiver` (and its TokenVerifier) is built per key
+    and reused for every request.
+    """
+
+    def __init__(self, keys: Optional[Dict[str, str]] = None):
+        if keys is None:
+            api_key, api_secret = os.getenv("LIVEKIT_API_KEY"), os.getenv("LIVEKIT_API_SECRET")
+            keys = {api_key: api_secret} if api_key and api_secret else {}
+        self.keys = dict(keys)
+        self._receivers: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _receiver(self, api_key: str):
+        receiver = self._receivers.get(api_key)
+        if receiver is None:
+            from livekit import api
+
+            with self._lock:
+                receiver = self._receivers.get(api_key)
+                if receiver is None:
+                    receiver = api.WebhookReceiver(api.TokenVerifier(api_key, self.keys[api_key]))
+                    self._receivers[api_key] = receiver
+        return receiver
+
+    def verify(self, body: str, auth_header: Optional[str]) -> Any:
+        """
+        Returns:
+            The parsed livekit.api.WebhookEvent.
+
+        Raises:
+            WebhookAuthError: The token is missing, signed with an unknown key, or
+                              does not match the body.
+        """
+        if not auth_header:
+            raise WebhookAuthError("Missing Authorization header")
+        token = auth_header[7:] if auth_header.lower().startswith("bearer ") else auth_header
+
+        import jwt
+
+        try:
+            issuer = jwt.decode(token, options={"verify_signature": False}).get("iss")
+        except jwt.PyJWTError as e:
+            raise WebhookAuthError(f"Malformed LiveKit webhook token: {e}") from e
+        if issuer not in self.keys:
+            raise WebhookAuthError(f"Unknown LiveKit API key: {issuer}")
+        try:
+            return self._receiver(issuer).receive(body, token)
+        except Exception as e:
+            raise WebhookAuthError(f"Invalid LiveKit webhook: {e}") from e
+
+
+def verify_retell_signature(body: str, api_key: str, signature: Optional[str], tolerance: float = 300.0) -> bool:
+    """Check Retell's `v=<ms timestamp>,d=<hex HMAC-SHA256(body + timestamp)>` signature."""
+    match = _RETELL_SIGNATURE.fullmatch(signature or "")
+    if not match:
+        return False
+    timestamp, digest = match.group(1), match.group(2)
+    if abs(time.time() * 1000 - int(timestamp)) > tolerance * 1000:
+        return False
+    expected = hmac.new(api_key.encode(), (body + timestamp).encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, digest)
+
+
+class WebhookServer:
+    """
+    Embeddable aiohttp server that turns provider webhooks into EventBus events.
+
+    Routes (POST):
+        /webhooks/livekit  LiveKit webhooks, verified with `LiveKitWebhookVerifier`.
+        /webhooks/twilio   Twilio call and recording status callbacks, verified
+                           with the account auth token (X-Twilio-Signature).
+        /webhooks/retell   Retell call events, verified with the Retell API key.
+
+    A provider whose credentials are not configured is not routed. Twilio signs
+    the public URL it called; set `public_url` when running behind a proxy.
+
+    Use `start()`/`stop()` to run a standalone server, or add `app()`'s routes
+    to an existing aiohttp application.
+    """
+
+    def __init__(self, bus: EventBus, host: str = "0.0.0.0", port: int = 8080, public_url: Optional[str] = None, livekit: Optional[LiveKitWebhookVerifier] = None, twilio_auth_token: Optional[str] = None, retell_api_key: Optional[str] = None, path_prefix: str = "/webhooks"):
+        self.bus = bus
+        self.host = host
+        self.port = port
+        self.public_url = (public_url or os.getenv("WEBHOOK_PUBLIC_URL") or "").rstrip("/") or None
+        self.livekit = livekit or LiveKitWebhookVerifier()
+        self.twilio_auth_token = twilio_auth_token or os.getenv("TWILIO_AUTH_TOKEN")
+        self.retell_api_key = retell_api_key or os.getenv("RETELL_API_KEY")
+        self.path_prefix = path_prefix.rstrip("/")
+        self._twilio_validator = None
+        self._runner = None
+
+    def app(self):
+        from aiohttp import web
+
+        app = web.Application()
+        if self.livekit.keys:
+            app.router.add_post(f"{self.path_prefix}/livekit", self.handle_livekit)
+        if self.twilio_auth_token:
+            from twilio.request_validator import RequestValidator
+
+            self._twilio_validator = RequestValidator(self.twilio_auth_token)
+            app.router.add_post(f"{self.path_prefix}/twilio", self.handle_twilio)
+        if self.retell_api_key:
+            app.router.add_post(f"{self.path_prefix}/retell", self.handle_retell)
+        return app
+
+    async def start(self):
+        from aiohttp import web
+
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        print(f"Webhook server listening on {self.host}:{self.port}{self.path_prefix}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle_livekit(self, request):
+        from aiohttp import web
+
+        body = await request.text()
+        try:
+            event = self.livekit.verify(body, request.headers.get("Authorization"))
+        except WebhookAuthError as e:
+            print(f"Rejected LiveKit webhook: {e}")
+            return web.Response(status=401)
+        await self.bus.publish(LiveKitEvent(event.event, event))
+        return web.Response()
+
+    async def handle_twilio(self, request):
+        from aiohttp import web
+
+        params = {k: v for k, v in (await request.post()).items()}
+        url = f"{self.public_url}{request.path_qs}" if self.public_url else str(request.url)
+        if not self._twilio_validator.validate(url, params, request.headers.get(TWILIO_SIGNATURE_HEADER, "")):
+            print("Rejected Twilio webhook: invalid signature")
+            return web.Response(status=403)
+        await self.bus.publish(TwilioStatusEvent(
+            call_sid=params.get("CallSid"),
+            call_status=params.get("CallStatus"),
+            recording_sid=params.get("RecordingSid"),
+            recording_status=params.get("RecordingStatus"),
+            params=params,
+        ))
+        return web.Response()
+
+    async def handle_retell(self, request):
+        from aiohttp import web
+
+        body = await request.text()
+        if not verify_retell_signature(body, self.retell_api_key, request.headers.get(RETELL_SIGNATURE_HEADER)):
+            print("Rejected Retell webhook: invalid signature")
+            return web.Response(status=401)
+        try:
+            payload = json.loads(body)
+            call = payload["call"]
+            event = RetellCallEvent(payload["event"], call["call_id"], call.get("call_status"), call)
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Rejected Retell webhook: malformed body ({e})")
+            return web.Response(status=400)
+        await self.bus.publish(event)
+        return web.Response(status=204)
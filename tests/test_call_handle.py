@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from livekit.api.twirp_client import TwirpError
+
+from intellema_vdk.livekit_lib.call_handle import (
+    REASON_ERROR,
+    REASON_NO_ANSWER,
+    REASON_TRUNK_FAILURE,
+    CallFailedError,
+    is_trunk_failure,
+)
+from intellema_vdk.livekit_lib.campaign import CallBusyError
+from intellema_vdk.rate_limit import RateLimitExceeded
+from intellema_vdk.resilience import CircuitOpenError
+
+
+def _sip_error(status: str, reason: str = "") -> TwirpError:
+    return TwirpError(
+        "unknown",
+        f"twirp error unknown: INVITE failed: sip status: {status}: {reason}",
+        status=500,
+        metadata={"sip_status_code": status, "sip_status": reason},
+    )
+
+
+def test_trunk_failure_disconnect_counts():
+    assert is_trunk_failure(CallFailedError(REASON_TRUNK_FAILURE))
+
+
+def test_callee_disconnect_does_not_count():
+    assert not is_trunk_failure(CallFailedError(REASON_NO_ANSWER))
+
+
+@pytest.mark.parametrize("status", ["500", "503", "403", "404"])
+def test_trunk_side_sip_status_counts(status):
+    assert is_trunk_failure(_sip_error(status))
+
+
+def test_sip_status_named_only_in_message_counts():
+    error = TwirpError("internal", "twirp error unknown: INVITE failed: sip status: 503: Service Unavailable", status=500)
+    assert is_trunk_failure(error)
+
+
+def test_failed_dial_wrapping_trunk_error_counts():
+    assert is_trunk_failure(CallFailedError(REASON_ERROR, _sip_error("503")))
+
+
+@pytest.mark.parametrize("status", ["408", "480", "486", "487", "603"])
+def test_callee_sip_status_does_not_count(status):
+    assert not is_trunk_failure(_sip_error(status))
+
+
+def test_busy_does_not_count():
+    assert not is_trunk_failure(CallBusyError("User is busy"))
+
+
+def test_livekit_server_error_does_not_count():
+    assert not is_trunk_failure(TwirpError("unavailable", "service unavailable", status=503))
+
+
+def test_open_circuit_does_not_count():
+    assert not is_trunk_failure(CircuitOpenError("livekit.SIPService.create_sip_participant", 12.0))
+
+
+def test_rate_limit_does_not_count():
+    assert not is_trunk_failure(RateLimitExceeded("livekit.SIPService.create_sip_participant", 486.0))
+
+
+@pytest.mark.parametrize("error", [ConnectionResetError(), asyncio.TimeoutError(), OSError("Network is unreachable")])
+def test_network_error_does_not_count(error):
+    assert not is_trunk_failure(error)
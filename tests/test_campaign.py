@@ -0,0 +1,25 @@
+import asyncio
+from types import SimpleNamespace
+
+from intellema_vdk.livekit_lib.campaign import STATUS_ANSWERED, STATUS_FAILED, run_campaign
+
+
+class _Manager:
+    trunk_router = SimpleNamespace(capacity=4)
+    warm_pool = None
+
+    async def start_outbound_call(self, phone_number, prompt_content, call_id=None, timeout=600):
+        if phone_number == "+15550000001":
+            raise asyncio.CancelledError()
+        return SimpleNamespace(name=call_id)
+
+
+def test_cancelled_dial_is_reported_as_failed():
+    async def run():
+        return [r async for r in run_campaign(_Manager(), [("+15550000001", "p"), ("+15550000002", "p")])]
+
+    results = asyncio.run(asyncio.wait_for(run(), timeout=5))
+    statuses = {r.phone_number: r.status for r in results}
+    assert statuses == {"+15550000001": STATUS_FAILED, "+15550000002": STATUS_ANSWERED}
+    failed = next(r for r in results if r.status == STATUS_FAILED)
+    assert isinstance(failed.error, asyncio.CancelledError)
@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+import pytest
+
+from intellema_vdk.resilience import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    Resilience,
+    RetryPolicy,
+)
+
+
+class _Unavailable(Exception):
+    status_code = 503
+
+
+def _expire(breaker: CircuitBreaker):
+    breaker._opened_at = time.monotonic() - breaker.reset_timeout - 1
+
+
+def _resilience(**kwargs) -> Resilience:
+    resilience = Resilience(RetryPolicy(max_attempts=3, base_delay=0), **kwargs)
+    resilience.rate_limiter = None
+    return resilience
+
+
+def _outcomes(breaker: CircuitBreaker, failures: int, successes: int = 0):
+    for _ in range(successes):
+        breaker.record_success()
+    for _ in range(failures):
+        breaker.record_failure()
+
+
+def test_does_not_trip_below_min_requests():
+    breaker = CircuitBreaker("ep", failure_rate=0.5, min_requests=10)
+    _outcomes(breaker, failures=9)
+    assert breaker.state == CIRCUIT_CLOSED
+    breaker.before_call()
+
+
+def test_does_not_trip_below_failure_rate():
+    breaker = CircuitBreaker("ep", failure_rate=0.5, min_requests=10)
+    _outcomes(breaker, failures=9, successes=11)
+    assert breaker.state == CIRCUIT_CLOSED
+
+
+def test_trips_once_failure_rate_is_reached():
+    breaker = CircuitBreaker("ep", failure_rate=0.5, min_requests=10)
+    _outcomes(breaker, failures=5, successes=5)
+    assert breaker.state == CIRCUIT_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_outcomes_older_than_window_are_forgotten():
+    breaker = CircuitBreaker("ep", failure_rate=0.5, min_requests=4, window=0.05)
+    _outcomes(breaker, failures=3)
+    time.sleep(0.1)
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED
+
+
+def test_half_open_lets_one_probe_through_and_success_closes():
+    breaker = CircuitBreaker("ep", min_requests=1)
+    breaker.record_failure()
+    _expire(breaker)
+
+    breaker.before_call()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CIRCUIT_CLOSED
+    breaker.before_call()
+
+
+def test_half_open_probe_failure_reopens():
+    breaker = CircuitBreaker("ep", min_requests=1)
+    breaker.record_failure()
+    _expire(breaker)
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_released_probe_lets_the_next_call_probe():
+    breaker = CircuitBreaker("ep", min_requests=1)
+    breaker.record_failure()
+    _expire(breaker)
+
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+
+
+def test_retries_of_one_call_count_once():
+    resilience = _resilience(min_requests=2)
+
+    def fail():
+        raise _Unavailable()
+
+    with pytest.raises(_Unavailable):
+        resilience.call_sync("ep", fail, idempotent=True)
+    breaker = resilience.breaker("ep")
+    assert breaker.state == CIRCUIT_CLOSED
+    assert len(breaker._outcomes) == 1
+
+
+def test_retry_that_succeeds_counts_as_success():
+    resilience = _resilience(min_requests=1)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _Unavailable()
+        return "ok"
+
+    assert asyncio.run(resilience.call("ep", flaky, idempotent=True)) == "ok"
+    assert resilience.breaker("ep").state == CIRCUIT_CLOSED
+
+
+def test_cancelled_probe_is_released():
+    resilience = _resilience(min_requests=1)
+    breaker = resilience.breaker("ep")
+    breaker.record_failure()
+    _expire(breaker)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(resilience.call("ep", hang), timeout=0.05)
+
+    asyncio.run(run())
+    breaker.before_call()
+    assert breaker.state == CIRCUIT_HALF_OPEN
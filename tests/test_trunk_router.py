@@ -0,0 +1,123 @@
+import asyncio
+import time
+
+import pytest
+
+from intellema_vdk.livekit_lib.trunk_router import Trunk, TrunkRouter
+
+
+def _dial(router: TrunkRouter, failed: bool) -> Trunk:
+    async def run():
+        lease = await router.acquire()
+        lease.release(failed=failed)
+        return lease.trunk
+
+    return asyncio.run(run())
+
+
+def _expire(trunk: Trunk):
+    trunk.ejected_until = time.monotonic() - 1
+
+
+def _ejected_for(trunk: Trunk) -> float:
+    return trunk.ejected_until - time.monotonic()
+
+
+def test_ejected_after_failure_threshold_consecutive_failures():
+    trunk = Trunk("ST_a")
+    router = TrunkRouter([trunk], failure_threshold=3, ejection_time=30.0)
+
+    for _ in range(2):
+        _dial(router, failed=True)
+    assert not trunk.ejected()
+
+    _dial(router, failed=True)
+    assert trunk.ejected()
+    assert trunk.ejections == 1
+    assert _ejected_for(trunk) == pytest.approx(30.0, abs=1.0)
+
+
+def test_ejected_trunk_is_skipped_while_another_is_healthy():
+    bad, good = Trunk("ST_bad"), Trunk("ST_good")
+    router = TrunkRouter([bad, good], failure_threshold=1)
+    bad.ejected_until = time.monotonic() + 60
+
+    assert {_dial(router, failed=False).trunk_id for _ in range(5)} == {"ST_good"}
+
+
+def test_ejection_time_doubles_up_to_max():
+    trunk = Trunk("ST_a")
+    router = TrunkRouter([trunk], failure_threshold=2, ejection_time=10.0, max_ejection_time=25.0)
+
+    for _ in range(2):
+        _dial(router, failed=True)
+    assert _ejected_for(trunk) == pytest.approx(10.0, abs=1.0)
+
+    # Once the ejection expires, one more failure ejects it again for twice as long
+    _expire(trunk)
+    _dial(router, failed=True)
+    assert trunk.ejections == 2
+    assert _ejected_for(trunk) == pytest.approx(20.0, abs=1.0)
+
+    _expire(trunk)
+    _dial(router, failed=True)
+    assert trunk.ejections == 3
+    assert _ejected_for(trunk) == pytest.approx(25.0, abs=1.0)
+
+
+def test_success_resets_failures_and_backoff():
+    trunk = Trunk("ST_a")
+    router = TrunkRouter([trunk], failure_threshold=3, ejection_time=10.0)
+
+    _dial(router, failed=True)
+    _dial(router, failed=True)
+    _dial(router, failed=False)
+    assert trunk.failures == 0
+    _dial(router, failed=True)
+    _dial(router, failed=True)
+    assert not trunk.ejected()
+
+    _dial(router, failed=True)
+    _expire(trunk)
+    _dial(router, failed=False)
+    assert trunk.failures == 0
+    assert trunk.ejections == 0
+
+    # The next ejection starts again from ejection_time
+    for _ in range(3):
+        _dial(router, failed=True)
+    assert _ejected_for(trunk) == pytest.approx(10.0, abs=1.0)
+
+
+def test_all_trunks_ejected_falls_back_to_least_loaded():
+    a, b = Trunk("ST_a", capacity=2), Trunk("ST_b", capacity=2)
+    router = TrunkRouter([a, b])
+    a.ejected_until = b.ejected_until = time.monotonic() + 60
+    a.in_flight = 1
+
+    assert _dial(router, failed=False).trunk_id == "ST_b"
+
+
+def test_ejected_trunk_is_not_used_while_healthy_trunk_is_full():
+    ejected, full = Trunk("ST_ejected"), Trunk("ST_full", capacity=1)
+    router = TrunkRouter([ejected, full])
+    ejected.ejected_until = time.monotonic() + 60
+    full.in_flight = 1
+
+    async def run():
+        return await asyncio.wait_for(router.acquire(), timeout=0.1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+
+
+def test_waiter_takes_ejected_trunk_once_its_ejection_expires():
+    ejected, full = Trunk("ST_ejected"), Trunk("ST_full", capacity=1)
+    router = TrunkRouter([ejected, full])
+    ejected.ejected_until = time.monotonic() + 0.05
+    full.in_flight = 1
+
+    async def run():
+        return await asyncio.wait_for(router.acquire(), timeout=1.0)
+
+    assert asyncio.run(run()).trunk_id == "ST_ejected"